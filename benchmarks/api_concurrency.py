@@ -0,0 +1,95 @@
+"""
+Measures the throughput of concurrent metadata calls for different HTTP transport configurations,
+against a local stub server with simulated latency.
+
+Usage:
+    python -m benchmarks.api_concurrency [--threads 32] [--calls 2000] [--latency 0.02] [--output results.json]
+"""
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from cirro_api_client import CirroApiClient, TokenAuth
+
+from cirro.config import TransportConfig
+from cirro.services import MetadataService
+
+from benchmarks.stub_server import StubApiServer
+
+SCENARIOS = {
+    'default': TransportConfig(),
+    'small pool (4)': TransportConfig(max_connections=4, max_keepalive_connections=4),
+    'large pool (64)': TransportConfig(max_connections=64, max_keepalive_connections=64, keepalive_expiry=30),
+    'no keep-alive': TransportConfig(max_keepalive_connections=0),
+}
+
+
+def _build_service(server: StubApiServer, transport_config: TransportConfig) -> MetadataService:
+    api_client = CirroApiClient(
+        base_url=server.base_url,
+        auth_method=TokenAuth(token='benchmark'),
+        client_name='Cirro SDK Benchmark',
+        package_name='cirro',
+        timeout=transport_config.httpx_timeout(),
+        httpx_args=transport_config.httpx_args()
+    )
+    return MetadataService(api_client)
+
+
+def run_scenario(server: StubApiServer, transport_config: TransportConfig, threads: int, calls: int) -> Dict:
+    service = _build_service(server, transport_config)
+    latencies: List[float] = []
+
+    def call(i: int):
+        start = time.perf_counter()
+        service.get_project_schema(project_id=f'project-{i % 10}')
+        latencies.append(time.perf_counter() - start)
+
+    # Warm up the connection pool
+    call(0)
+    latencies.clear()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, range(calls)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'calls': calls,
+        'threads': threads,
+        'elapsed_s': elapsed,
+        'calls_per_s': calls / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure concurrent API call throughput')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated server latency (seconds)')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = {}
+    with StubApiServer(latency=args.latency) as server:
+        server.add_route('GET', r'/projects/(?P<project_id>[^/]+)/schema',
+                         lambda match, query, body: (200, {'form': {}, 'ui': {}}))
+        for name, transport_config in SCENARIOS.items():
+            results[name] = run_scenario(server, transport_config, args.threads, args.calls)
+            result = results[name]
+            print(f"{name:<16} {result['calls_per_s']:8.1f} calls/s  "
+                  f"p50 {result['p50_ms']:6.1f} ms  p99 {result['p99_ms']:6.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
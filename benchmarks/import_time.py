@@ -0,0 +1,100 @@
+"""
+Tracks the import time of the package and the CLI entry point using `python -X importtime`
+
+Usage:
+    python -m benchmarks.import_time [--repeat 5] [--output results.json] [--max-ms 500]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+TARGETS = {
+    'import cirro': 'import cirro',
+    'cli entry point': 'import cirro.cli.cli',
+    'sdk': 'from cirro import DataPortal',
+}
+
+HEAVY_MODULES = ['boto3', 'pandas', 'jsonschema', 'awscrt', 'questionary']
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[int, str, int]]:
+    """
+    Parses the output of `-X importtime` into (depth, module name, cumulative microseconds) entries
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, module = line[len('import time:'):].split('|')
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        entries.append((depth, module.strip(), int(cumulative_us)))
+    return entries
+
+
+def measure(statement: str) -> Dict:
+    code = f'{statement}; import sys; print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, check=True)
+    entries = _parse_importtime(proc.stderr)
+
+    # Skip the interpreter start-up, everything imported after `site` is caused by the statement
+    site_index = next((i for i, entry in enumerate(entries) if entry[0] == 0 and entry[1] == 'site'), -1)
+    entries = entries[site_index + 1:]
+
+    total_us = sum(cumulative_us for depth, _, cumulative_us in entries if depth == 0)
+    slowest = sorted(entries, key=lambda entry: entry[2], reverse=True)[:10]
+    return {
+        'total_ms': total_us / 1000,
+        'heavy_modules_loaded': [m for m in proc.stdout.strip().split(',') if m],
+        'slowest_modules_ms': {name: cumulative_us / 1000 for _, name, cumulative_us in slowest}
+    }
+
+
+def run(repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for name, statement in TARGETS.items():
+        runs: List[Dict] = [measure(statement) for _ in range(repeat)]
+        totals = [r['total_ms'] for r in runs]
+        results[name] = {
+            'statement': statement,
+            'median_ms': statistics.median(totals),
+            'min_ms': min(totals),
+            'max_ms': max(totals),
+            'heavy_modules_loaded': runs[-1]['heavy_modules_loaded'],
+            'slowest_modules_ms': runs[-1]['slowest_modules_ms']
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the import time of cirro')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of fresh interpreters per target')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--max-ms', type=float,
+                        help='Fail if the median import time of `import cirro` or the CLI exceeds this value')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+
+    for name, result in results.items():
+        print(f"{name:<16} median {result['median_ms']:8.1f} ms "
+              f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}) "
+              f"heavy modules: {', '.join(result['heavy_modules_loaded']) or 'none'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.max_ms is not None:
+        regressions = [name for name in ['import cirro', 'cli entry point']
+                       if results[name]['median_ms'] > args.max_ms]
+        if regressions:
+            print(f"Import time regression (> {args.max_ms} ms): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
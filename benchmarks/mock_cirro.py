@@ -0,0 +1,298 @@
+"""
+Mock Cirro REST API serving synthetic projects, datasets, shares, manifests and samples at a configurable scale.
+
+Records are generated on request from their index, so large projects do not need to be held in memory.
+"""
+import multiprocessing
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+from attrs import define
+from cirro_api_client import TokenAuth
+
+from cirro.auth.base import AuthInfo
+from cirro.cirro_client import CirroApi
+from cirro.config import AppConfig
+
+from benchmarks.stub_server import StubApiServer
+
+TIMESTAMP = '2024-01-01T00:00:00Z'
+
+SYSTEM_INFO = {
+    'auth': {'sdkAppId': 'benchmark', 'userPoolId': 'benchmark'},
+    'referencesBucket': 'benchmark-references',
+    'resourcesBucket': 'benchmark-resources',
+    'region': 'us-west-2'
+}
+
+
+@define
+class MockScale:
+    """
+    Size of the synthetic data served by the mock API
+    """
+    projects: int = 10
+    datasets: int = 10000
+    " Datasets in each project"
+    shares: int = 2
+    " Subscribed shares in each project"
+    shared_datasets: int = 1000
+    " Datasets in each share"
+    files: int = 100000
+    " Files in each dataset"
+    samples: int = 10000
+    " Samples in each project"
+    manifest_page_size: int = 10000
+    " Maximum files returned by a single manifest call"
+
+
+def _id(kind: str, *indexes: int) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f'{kind}/{"/".join(str(i) for i in indexes)}'))
+
+
+class MockCirroServer(StubApiServer):
+    """
+    Stub API server with the routes used by the SDK navigation flows, e.g.
+
+    ```python
+    with MockCirroServer(MockScale(datasets=100)) as server:
+        with server.client() as cirro:
+            cirro.datasets.list(server.project_id(0))
+    ```
+    """
+    def __init__(self, scale: MockScale, latency: float = 0.0):
+        super().__init__(latency=latency)
+        self.scale = scale
+        self._project_index = {self.project_id(i): i for i in range(scale.projects)}
+        self._share_index = {self.share_id(i): i for i in range(scale.shares)}
+        self._dataset_indexes: Dict[int, Dict[str, int]] = {}
+        self.add_route('GET', r'/projects', self._list_projects)
+        self.add_route('GET', r'/projects/(?P<project_id>[^/]+)', self._get_project)
+        self.add_route('GET', r'/projects/(?P<project_id>[^/]+)/datasets', self._list_datasets)
+        self.add_route('GET', r'/projects/(?P<project_id>[^/]+)/datasets/(?P<dataset_id>[^/]+)', self._get_dataset)
+        self.add_route('GET', r'/projects/(?P<project_id>[^/]+)/datasets/(?P<dataset_id>[^/]+)/files',
+                       self._get_manifest)
+        self.add_route('GET', r'/projects/(?P<project_id>[^/]+)/shares', self._list_shares)
+        self.add_route('GET', r'/projects/(?P<project_id>[^/]+)/shares/(?P<share_id>[^/]+)/datasets',
+                       self._list_shared_datasets)
+        self.add_route('GET', r'/projects/(?P<project_id>[^/]+)/samples', self._list_samples)
+
+    @staticmethod
+    def project_id(index: int) -> str:
+        return _id('project', index)
+
+    @staticmethod
+    def project_name(index: int) -> str:
+        return f'Project {index}'
+
+    @staticmethod
+    def dataset_id(project_index: int, index: int) -> str:
+        return _id('dataset', project_index, index)
+
+    @staticmethod
+    def dataset_name(index: int) -> str:
+        return f'Dataset {index:06d}'
+
+    @staticmethod
+    def share_id(index: int) -> str:
+        return _id('share', index)
+
+    @staticmethod
+    def file_path(index: int) -> str:
+        return f'data/sample{index // 4:06d}/reads_R{index % 4}.fastq.gz'
+
+    def client(self):
+        """
+        Creates a `CirroApi` client which sends its requests to this server
+        """
+        return mock_client(self.base_url)
+
+    def _project(self, index: int) -> Dict:
+        return {
+            'id': self.project_id(index),
+            'name': self.project_name(index),
+            'description': '',
+            'status': 'COMPLETED',
+            'tags': [],
+            'organization': 'Benchmark',
+            'classificationIds': [],
+            'billingAccountId': 'benchmark'
+        }
+
+    def _dataset(self, dataset_id: str, project_index: int, index: int) -> Dict:
+        return {
+            'id': dataset_id,
+            'name': self.dataset_name(index),
+            'description': '',
+            'projectId': self.project_id(project_index),
+            'processId': 'paired_dnaseq',
+            'sourceDatasetIds': [],
+            'status': 'COMPLETED',
+            'tags': [],
+            'createdBy': 'benchmark',
+            'createdAt': TIMESTAMP,
+            'updatedAt': TIMESTAMP
+        }
+
+    def _list_projects(self, match, query, body):
+        return 200, [self._project(i) for i in range(self.scale.projects)]
+
+    def _get_project(self, match, query, body):
+        index = self._project_index.get(match['project_id'])
+        if index is None:
+            return _not_found('Project not found')
+        return 200, {
+            **self._project(index),
+            'contacts': [],
+            'settings': {'budgetAmount': 1000, 'budgetPeriod': 'MONTHLY'},
+            'statusMessage': '',
+            'createdBy': 'benchmark',
+            'createdAt': TIMESTAMP,
+            'updatedAt': TIMESTAMP
+        }
+
+    def _list_datasets(self, match, query, body):
+        project_index = self._project_index.get(match['project_id'], 0)
+        return 200, self._page(query, self.scale.datasets,
+                               lambda i: self._dataset(self.dataset_id(project_index, i), project_index, i))
+
+    def _list_shared_datasets(self, match, query, body):
+        share_index = self._share_index.get(match['share_id'], 0)
+        return 200, self._page(query, self.scale.shared_datasets,
+                               lambda i: self._dataset(_id('shared-dataset', share_index, i), 0, i))
+
+    def _get_dataset(self, match, query, body):
+        project_index = self._project_index.get(match['project_id'], 0)
+        dataset_id = match['dataset_id']
+        dataset_index = self._find_dataset_index(project_index, dataset_id)
+        if dataset_index is None:
+            return _not_found('Dataset not found')
+        project_id = self.project_id(project_index)
+        return 200, {
+            **self._dataset(dataset_id, project_index, dataset_index),
+            's3': f's3://project-{project_id}/datasets/{dataset_id}',
+            'sourceDatasets': [],
+            'sourceSampleIds': [],
+            'statusMessage': '',
+            'params': {},
+            'info': {},
+            'isViewRestricted': False,
+            'share': None
+        }
+
+    def _find_dataset_index(self, project_index: int, dataset_id: str) -> Optional[int]:
+        # Dataset IDs are derived from their index, the reverse lookup is built once per project
+        with self._lock:
+            if project_index not in self._dataset_indexes:
+                self._dataset_indexes[project_index] = {
+                    self.dataset_id(project_index, i): i for i in range(self.scale.datasets)
+                }
+            return self._dataset_indexes[project_index].get(dataset_id)
+
+    def _get_manifest(self, match, query, body):
+        offset = int(query.get('fileOffset', ['0'])[0])
+        limit = min(int(query.get('fileLimit', [str(self.scale.manifest_page_size)])[0]),
+                    self.scale.manifest_page_size)
+        end = min(offset + limit, self.scale.files)
+        return 200, {
+            'domain': f's3://project-{match["project_id"]}/datasets/{match["dataset_id"]}',
+            'files': [{'path': self.file_path(i), 'size': 1024 * (i % 1000 + 1), 'metadata': {}}
+                      for i in range(offset, end)],
+            'totalFiles': self.scale.files,
+            'viz': [],
+            'tables': [],
+            'artifacts': []
+        }
+
+    def _list_shares(self, match, query, body):
+        return 200, [{
+            'id': self.share_id(i),
+            'name': f'Share {i}',
+            'description': '',
+            'originatingProjectId': self.project_id(0),
+            'shareType': 'SUBSCRIBER',
+            'conditions': [],
+            'classificationIds': [],
+            'keywords': [],
+            'createdBy': 'benchmark',
+            'createdAt': TIMESTAMP,
+            'updatedAt': TIMESTAMP
+        } for i in range(self.scale.shares)]
+
+    def _list_samples(self, match, query, body):
+        return 200, self._page(query, self.scale.samples, lambda i: {
+            'id': _id('sample', i),
+            'name': f'sample{i:06d}',
+            'metadata': {'group': f'group{i % 10}', 'replicate': i % 3},
+            'datasetIds': [],
+            'createdAt': TIMESTAMP,
+            'updatedAt': TIMESTAMP
+        })
+
+    @staticmethod
+    def _page(query: Dict[str, List[str]], total: int, build_record) -> Dict:
+        # The next token is the offset of the next page
+        offset = int(query.get('nextToken', ['0'])[0] or 0)
+        limit = int(query.get('limit', ['5000'])[0])
+        end = min(offset + limit, total)
+        return {
+            'data': [build_record(i) for i in range(offset, end)],
+            'nextToken': str(end) if end < total else ''
+        }
+
+
+@contextmanager
+def mock_client(base_url: str) -> CirroApi:
+    """
+    Creates a `CirroApi` client which sends its requests to a mock server running at the base URL
+    """
+    class MockAppConfig(AppConfig):
+        def _init_config(self):
+            self.rest_endpoint = base_url
+            self.auth_endpoint = f'{base_url}/auth'
+            self._apply_system_info(SYSTEM_INFO)
+
+    with patch('cirro.cirro_client.AppConfig', MockAppConfig):
+        cirro = CirroApi(auth_info=_MockAuth(), base_url='mock-cirro')
+    try:
+        yield cirro
+    finally:
+        cirro.api_client.get_httpx_client().close()
+
+
+@contextmanager
+def serve_in_subprocess(scale: MockScale, latency: float = 0.0) -> str:
+    """
+    Runs a mock server in a separate process and yields its base URL,
+    so that the server does not compete for the GIL or memory with the code being measured
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    stop = context.Event()
+    process = context.Process(target=_serve, args=(scale, latency, queue, stop), daemon=True)
+    process.start()
+    try:
+        yield queue.get(timeout=60)
+    finally:
+        stop.set()
+        process.join(timeout=10)
+
+
+def _serve(scale: MockScale, latency: float, queue, stop):
+    with MockCirroServer(scale, latency=latency) as server:
+        queue.put(server.base_url)
+        stop.wait()
+
+
+def _not_found(message: str):
+    return 404, {'statusCode': 404, 'errorCode': 'NOT_FOUND', 'errorDetail': message, 'errors': [], 'message': message}
+
+
+class _MockAuth(AuthInfo):
+    def get_current_user(self) -> str:
+        return 'benchmark'
+
+    def get_auth_method(self):
+        return TokenAuth(token='benchmark')
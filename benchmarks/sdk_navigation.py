@@ -0,0 +1,125 @@
+"""
+Measures how listing and SDK navigation flows scale with the size of a project,
+against a mock Cirro API serving synthetic projects, datasets, manifests and samples.
+
+The mock server runs in a separate process. Each flow runs twice with a new client:
+once for the wall time and API call counts, then under tracemalloc for the peak memory of the SDK objects.
+
+Usage:
+    python -m benchmarks.sdk_navigation [--datasets 10000] [--files 100000] [--samples 10000] \
+        [--latency 0.0] [--flow list_datasets] [--output results.json]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+from attrs import asdict
+
+from cirro import DataPortal
+from cirro.cirro_client import CirroApi
+from cirro.instrumentation import MetricsHook
+from cirro.services.service_helpers import list_all_datasets
+from cirro.sdk.dataset import DataPortalDatasets, DataPortalDataset
+
+from benchmarks.mock_cirro import MockCirroServer, MockScale, mock_client, serve_in_subprocess
+
+
+def _flows(scale: MockScale) -> Dict[str, Callable[[CirroApi], object]]:
+    server = MockCirroServer
+    project_id = server.project_id(0)
+    project_name = server.project_name(scale.projects - 1)
+    dataset_id = server.dataset_id(0, scale.datasets - 1)
+    dataset_name = server.dataset_name(scale.datasets - 1)
+    last_file = server.file_path(scale.files - 1)
+
+    def dataset_list(cirro: CirroApi) -> DataPortalDatasets:
+        return DataPortalDatasets([DataPortalDataset(d, cirro) for d in cirro.datasets.list(project_id)])
+
+    return {
+        'datasets.list': lambda cirro: cirro.datasets.list(project_id),
+        'list_all_datasets': lambda cirro: list_all_datasets(project_id, cirro),
+        'metadata.get_project_samples': lambda cirro: cirro.metadata.get_project_samples(project_id),
+        'datasets.get_assets_listing': lambda cirro: cirro.datasets.get_assets_listing(project_id, dataset_id),
+        'DataPortal.get_project (id)': lambda cirro: DataPortal(client=cirro).get_project(project_id),
+        'DataPortal.get_project (name)': lambda cirro: DataPortal(client=cirro).get_project(project_name),
+        'DataPortal.get_dataset (id)': lambda cirro: DataPortal(client=cirro).get_dataset(project_id, dataset_id),
+        'DataPortal.get_dataset (name)':
+            lambda cirro: DataPortal(client=cirro).get_dataset(project_name, dataset_name),
+        'DataPortalDataset.list_files':
+            lambda cirro: DataPortal(client=cirro).get_dataset(project_id, dataset_id).list_files(),
+        'DataPortalDataset.get_file':
+            lambda cirro: DataPortal(client=cirro).get_dataset(project_id, dataset_id).get_file(last_file),
+        'DataPortalAssets.get_by_name': lambda cirro: dataset_list(cirro).get_by_name(dataset_name),
+        'DataPortalAssets.get_by_id': lambda cirro: dataset_list(cirro).get_by_id(dataset_id),
+        'DataPortalAssets.filter_by_pattern': lambda cirro: dataset_list(cirro).filter_by_pattern('Dataset 00*1'),
+    }
+
+
+def run_flow(base_url: str, flow: Callable[[CirroApi], object]) -> Dict:
+    with mock_client(base_url) as cirro:
+        metrics = MetricsHook()
+        cirro.add_hook(metrics)
+        start = time.perf_counter()
+        try:
+            flow(cirro)
+        except Exception as e:
+            # Record the failure of a flow without stopping the others
+            return {'error': f'{e.__class__.__name__}: {e}'}
+        elapsed = time.perf_counter() - start
+        api_calls = {name: stats['count'] for name, stats in metrics.summary()['api'].items()}
+
+    with mock_client(base_url) as cirro:
+        tracemalloc.start()
+        try:
+            flow(cirro)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'elapsed_s': elapsed,
+        'api_calls': sum(api_calls.values()),
+        'api_calls_by_endpoint': api_calls,
+        'peak_memory_mb': peak / 1024 / 1024
+    }
+
+
+def main():
+    defaults = MockScale()
+    parser = argparse.ArgumentParser(description='Measure SDK listing and navigation flows against a mock API')
+    parser.add_argument('--projects', type=int, default=defaults.projects)
+    parser.add_argument('--datasets', type=int, default=defaults.datasets, help='Datasets per project')
+    parser.add_argument('--shares', type=int, default=defaults.shares, help='Subscribed shares per project')
+    parser.add_argument('--shared-datasets', type=int, default=defaults.shared_datasets, help='Datasets per share')
+    parser.add_argument('--files', type=int, default=defaults.files, help='Files per dataset')
+    parser.add_argument('--samples', type=int, default=defaults.samples, help='Samples per project')
+    parser.add_argument('--manifest-page-size', type=int, default=defaults.manifest_page_size)
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated server latency (seconds)')
+    parser.add_argument('--flow', action='append', help='Flow to run, may be repeated (default: all)')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    scale = MockScale(projects=args.projects, datasets=args.datasets, shares=args.shares,
+                      shared_datasets=args.shared_datasets, files=args.files, samples=args.samples,
+                      manifest_page_size=args.manifest_page_size)
+    results = {'scale': asdict(scale), 'flows': {}}
+    flows = _flows(scale)
+    with serve_in_subprocess(scale, latency=args.latency) as base_url:
+        for name in args.flow or flows.keys():
+            result = run_flow(base_url, flows[name])
+            results['flows'][name] = result
+            if 'error' in result:
+                print(f"{name:<36} failed: {result['error']}")
+                continue
+            print(f"{name:<36} {result['elapsed_s'] * 1000:9.1f} ms  {result['api_calls']:5d} API calls  "
+                  f"peak {result['peak_memory_mb']:8.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Minimal local HTTP server used by the benchmarks to stand in for the Cirro REST API
+"""
+import json
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Dict, List, Tuple, Optional, Pattern
+from urllib.parse import urlparse, parse_qs
+
+# Handler receives (path match, query params, request body) and returns (status code, JSON body)
+RouteHandler = Callable[[re.Match, Dict[str, List[str]], Optional[dict]], Tuple[int, object]]
+
+
+class StubApiServer:
+    """
+    Serves JSON responses for registered routes on a random local port, e.g.
+
+    ```python
+    with StubApiServer(latency=0.02) as server:
+        server.add_route('GET', r'/projects/(?P<project_id>[^/]+)/schema', lambda m, q, b: (200, {}))
+        client = CirroApiClient(base_url=server.base_url, ...)
+    ```
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._routes: List[Tuple[str, Pattern, RouteHandler]] = []
+        self._request_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._build_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def request_counts(self) -> Dict[str, int]:
+        """ Number of requests served per route pattern """
+        with self._lock:
+            return dict(self._request_counts)
+
+    def reset_counts(self):
+        with self._lock:
+            self._request_counts.clear()
+
+    def add_route(self, method: str, pattern: str, handler: RouteHandler):
+        self._routes.append((method, re.compile(f'^{pattern}$'), handler))
+
+    def __enter__(self) -> 'StubApiServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _dispatch(self, method: str, raw_path: str, body: Optional[dict]) -> Tuple[int, object]:
+        url = urlparse(raw_path)
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(url.path)
+            if route_method == method and match:
+                with self._lock:
+                    self._request_counts[pattern.pattern] = self._request_counts.get(pattern.pattern, 0) + 1
+                if self.latency:
+                    time.sleep(self.latency)
+                return handler(match, parse_qs(url.query), body)
+        return 404, {'message': f'No route for {method} {url.path}'}
+
+    def _build_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self, method: str):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, payload = server._dispatch(method, self.path, body)
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_PUT(self):
+                self._handle('PUT')
+
+            def do_DELETE(self):
+                self._handle('DELETE')
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,207 @@
+"""
+Measures upload, download and checksum throughput of the file transfer path
+(`FileService.upload_files` / `download_files`, `S3Client` and `get_checksum`)
+against a local S3-compatible server, with the file access token endpoint served by a stub API.
+
+By default an in-process moto server is started (`pip install "moto[server]"`),
+pass `--endpoint-url` to use another S3-compatible server instead, such as MinIO.
+
+Each transfer runs in a fresh process, so that the reported peak RSS belongs to that transfer alone.
+
+Usage:
+    python -m benchmarks.transfer_throughput [--scale 1.0] [--workload mixed] [--output results.json]
+    python -m benchmarks.transfer_throughput --endpoint-url http://localhost:9000 \
+        --access-key minioadmin --secret-key minioadmin
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.stub_server import StubApiServer
+
+PROJECT_ID = 'benchmark-project'
+BUCKET = 'benchmark-project-bucket'
+REGION = 'us-west-2'
+
+KB = 1024
+MB = 1024 * KB
+
+# Workload name -> list of (number of files, file size in bytes)
+WORKLOADS: Dict[str, List[Tuple[int, int]]] = {
+    'many-small-files': [(500, 16 * KB)],
+    'few-huge-files': [(3, 96 * MB)],
+    'mixed': [(200, 16 * KB), (20, 2 * MB), (2, 48 * MB)],
+}
+
+
+def _create_files(directory: Path, spec: List[Tuple[int, int]], scale: float) -> List[str]:
+    files = []
+    for group, (count, size) in enumerate(spec):
+        scaled_size = max(1, int(size * scale))
+        block = os.urandom(min(scaled_size, MB))
+        for i in range(count):
+            relative_path = f'group{group}/file{i:05d}.bin'
+            path = directory / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open('wb') as f:
+                remaining = scaled_size
+                while remaining > 0:
+                    f.write(block[:remaining])
+                    remaining -= len(block)
+            files.append(relative_path)
+    return files
+
+
+def _peak_rss_mb() -> float:
+    # On Linux ru_maxrss is inherited from the parent process across exec, the high water mark is not
+    status = Path('/proc/self/status')
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / KB
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, kilobytes on Linux
+    return peak / MB if sys.platform == 'darwin' else peak / KB
+
+
+def _run_transfer(direction: str, api_url: str, s3_endpoint: str, checksum_method: str,
+                  directory: str, files: List[str]) -> Dict:
+    """
+    Runs in a child process, returns the timings and S3 request counts of a single transfer
+    """
+    os.environ['AWS_ENDPOINT_URL_S3'] = s3_endpoint
+    os.environ['TQDM_DISABLE'] = '1'
+
+    from cirro_api_client import CirroApiClient, TokenAuth
+    from cirro.file_utils import get_checksum
+    from cirro.instrumentation import HookDispatcher, MetricsHook
+    from cirro.models.file import FileAccessContext
+    from cirro.services import FileService
+
+    api_client = CirroApiClient(base_url=api_url, auth_method=TokenAuth(token='benchmark'),
+                                client_name='Cirro SDK Benchmark', package_name='cirro')
+    hooks = HookDispatcher()
+    metrics = MetricsHook()
+    hooks.add(metrics)
+    file_service = FileService(api_client, checksum_method=checksum_method, transfer_retries=1, hooks=hooks)
+    base_url = f's3://{BUCKET}/datasets/benchmark'
+    paths = [Path(directory, file) for file in files]
+
+    start = time.perf_counter()
+    if direction == 'upload':
+        file_service.upload_files(FileAccessContext.upload_dataset(PROJECT_ID, 'benchmark', base_url),
+                                  Path(directory), paths, {})
+    elif direction == 'download':
+        file_service.download_files(FileAccessContext.download(PROJECT_ID, f'{base_url}/data'), directory, files)
+    else:
+        for path in paths:
+            get_checksum(path, checksum_method)
+    elapsed = time.perf_counter() - start
+
+    s3_requests = {name: stats['count'] for name, stats in metrics.summary()['s3'].items()}
+    return {
+        'elapsed_s': elapsed,
+        'requests': s3_requests,
+        'peak_rss_mb': _peak_rss_mb()
+    }
+
+
+def run_workload(name: str, api_url: str, s3_endpoint: str, checksum_method: str, scale: float) -> Dict:
+    spec = WORKLOADS[name]
+    results = {}
+    with tempfile.TemporaryDirectory() as source, tempfile.TemporaryDirectory() as target:
+        files = _create_files(Path(source), spec, scale)
+        total_bytes = sum(Path(source, file).stat().st_size for file in files)
+
+        for direction, directory in [('checksum', source), ('upload', source), ('download', target)]:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                result = executor.submit(_run_transfer, direction, api_url, s3_endpoint,
+                                         checksum_method, directory, files).result()
+            total_requests = sum(result['requests'].values())
+            results[direction] = {
+                **result,
+                'files': len(files),
+                'bytes': total_bytes,
+                'mb_per_s': total_bytes / MB / result['elapsed_s'],
+                'requests_per_file': total_requests / len(files) if direction != 'checksum' else 0
+            }
+    return results
+
+
+def _start_moto() -> Tuple[object, str]:
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        sys.exit('moto is not installed, install it with pip install "moto[server]" or pass --endpoint-url')
+    server = ThreadedMotoServer(ip_address='127.0.0.1', port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    return server, f'http://{host}:{port}'
+
+
+def _create_bucket(s3_endpoint: str, access_key: str, secret_key: str):
+    import boto3
+    s3_client = boto3.client('s3', endpoint_url=s3_endpoint, region_name=REGION,
+                             aws_access_key_id=access_key, aws_secret_access_key=secret_key)
+    existing = [bucket['Name'] for bucket in s3_client.list_buckets().get('Buckets', [])]
+    if BUCKET not in existing:
+        s3_client.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={'LocationConstraint': REGION})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure file transfer throughput against a local S3 server')
+    parser.add_argument('--workload', action='append', choices=list(WORKLOADS.keys()),
+                        help='Workload to run, may be repeated (default: all)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier applied to every file size')
+    parser.add_argument('--checksum', default='CRC64NVME', help='Checksum algorithm used for transfers')
+    parser.add_argument('--endpoint-url', help='Use an existing S3-compatible server instead of moto')
+    parser.add_argument('--access-key', default='benchmark')
+    parser.add_argument('--secret-key', default='benchmark')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    moto_server = None
+    s3_endpoint = args.endpoint_url
+    if not s3_endpoint:
+        moto_server, s3_endpoint = _start_moto()
+    _create_bucket(s3_endpoint, args.access_key, args.secret_key)
+
+    def generate_token(match, query, body):
+        return 200, {
+            'accessKeyId': args.access_key,
+            'secretAccessKey': args.secret_key,
+            'sessionToken': 'benchmark',
+            'expiration': (datetime.now(tz=timezone.utc) + timedelta(hours=1)).isoformat(),
+            'region': REGION
+        }
+
+    results = {}
+    try:
+        with StubApiServer() as api_server:
+            api_server.add_route('POST', r'/projects/(?P<project_id>[^/]+)/s3-token', generate_token)
+            for name in args.workload or WORKLOADS.keys():
+                results[name] = run_workload(name, api_server.base_url, s3_endpoint, args.checksum, args.scale)
+                for direction, result in results[name].items():
+                    print(f"{name:<17} {direction:<9} {result['mb_per_s']:8.1f} MB/s  "
+                          f"{result['requests_per_file']:5.2f} requests/file  "
+                          f"peak RSS {result['peak_rss_mb']:7.1f} MB")
+    finally:
+        if moto_server is not None:
+            moto_server.stop()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
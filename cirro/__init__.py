@@ -1,11 +1,30 @@
-import cirro.file_utils  # noqa
-from cirro.cirro_client import CirroApi
-from cirro.sdk.dataset import DataPortalDataset
-from cirro.sdk.login import DataPortalLogin
-from cirro.sdk.portal import DataPortal
-from cirro.sdk.process import DataPortalProcess
-from cirro.sdk.project import DataPortalProject
-from cirro.sdk.reference import DataPortalReference
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from cirro import file_utils
+    from cirro.cirro_client import CirroApi
+    from cirro.sdk.dataset import DataPortalDataset
+    from cirro.sdk.login import DataPortalLogin
+    from cirro.sdk.portal import DataPortal
+    from cirro.sdk.process import DataPortalProcess
+    from cirro.sdk.project import DataPortalProject
+    from cirro.sdk.reference import DataPortalReference
+
+# The public API is loaded on first access (PEP 562),
+# so that `import cirro` and the CLI do not pay for the API client and boto3 upfront
+_lazy_attributes = {
+    'DataPortal': 'cirro.sdk.portal',
+    'DataPortalLogin': 'cirro.sdk.login',
+    'DataPortalProject': 'cirro.sdk.project',
+    'DataPortalProcess': 'cirro.sdk.process',
+    'DataPortalDataset': 'cirro.sdk.dataset',
+    'DataPortalReference': 'cirro.sdk.reference',
+    'CirroApi': 'cirro.cirro_client'
+}
+_lazy_modules = {
+    'file_utils': 'cirro.file_utils'
+}
 
 __all__ = [
     'DataPortal',
@@ -17,3 +36,20 @@ __all__ = [
     'CirroApi',
     'file_utils'
 ]
+
+
+def __getattr__(name: str):
+    if name in _lazy_modules:
+        value = importlib.import_module(_lazy_modules[name])
+    elif name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Cache on the module so that __getattr__ is only called once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__))
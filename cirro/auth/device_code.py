@@ -9,10 +9,8 @@ from pathlib import Path
 from typing import Optional
 from typing import TYPE_CHECKING
 
-import boto3
 import jwt
 import requests
-from botocore.exceptions import ClientError
 from cirro_api_client.cirro_auth import AuthMethod, RefreshableTokenAuth
 
 if TYPE_CHECKING:
@@ -205,6 +203,9 @@ class DeviceCodeAuth(AuthInfo):
         return self._token_info
 
     def _refresh_access_token(self):
+        import boto3
+        from botocore.exceptions import ClientError
+
         try:
             cognito = boto3.client('cognito-idp', region_name=self.region)
             resp = cognito.initiate_auth(
@@ -1,18 +1,30 @@
+import re
+from pathlib import Path
+from typing import Optional
+
 from cirro_api_client import CirroApiClient
 
 from cirro.auth import get_auth_info_from_config
 from cirro.auth.base import AuthInfo
-from cirro.config import AppConfig
+from cirro.config import AppConfig, TransportConfig, CacheConfig, Constants
+from cirro.instrumentation.base import HookDispatcher, InstrumentationHook
+from cirro.instrumentation.http import InstrumentedTransport
+from cirro.profiling import profile_phase, get_active_profiler
 from cirro.services import FileService, DatasetService, ProjectService, ProcessService, ExecutionService, \
     MetricsService, MetadataService, BillingService, ReferenceService, UserService, ComputeEnvironmentService, \
     ShareService
+from cirro.services.cache import MetadataCache
+from cirro.services.file_credentials import FileCredentialManager
 
 
 class CirroApi:
     """
     Client for interacting directly with the Cirro API
     """
-    def __init__(self, auth_info: AuthInfo = None, base_url: str = None):
+    def __init__(self, auth_info: AuthInfo = None, base_url: str = None,
+                 file_credential_manager: FileCredentialManager = None,
+                 transport_config: TransportConfig = None,
+                 cache_config: CacheConfig = None):
         """
         Instantiates the Cirro API object
 
@@ -20,6 +32,12 @@ class CirroApi:
             auth_info (cirro.auth.base.AuthInfo):
             base_url (str): Optional base URL of the Cirro instance
              (if not provided, it uses the `CIRRO_BASE_URL` environment variable, or the config file)
+            file_credential_manager (cirro.services.file_credentials.FileCredentialManager): Optional cache of
+             file access credentials, pass the same manager to several clients of the same user to share tokens
+            transport_config (cirro.config.TransportConfig): Optional connection pool, keep-alive,
+             HTTP/2 and timeout settings for API calls (if not provided, it uses the config file)
+            cache_config (cirro.config.CacheConfig): Optional settings of the cache of processes, projects
+             and reference types, which is disabled by default (if not provided, it uses the config file)
 
         Returns:
             Authenticated Cirro API object, which can be used to call endpoint functions.
@@ -27,39 +45,107 @@ class CirroApi:
         Example:
         ```python
         from cirro.cirro_client import CirroApi
+        from cirro.config import TransportConfig, CacheConfig
 
         cirro = CirroApi(base_url="app.cirro.bio")
         print(cirro.projects.list())
+
+        # Allow more concurrent API calls from worker threads
+        cirro = CirroApi(transport_config=TransportConfig(max_connections=200, max_keepalive_connections=50,
+                                                          connect_timeout=10, read_timeout=60))
+
+        # Re-use the lists of processes, projects and reference types for 10 minutes
+        cirro = CirroApi(cache_config=CacheConfig(ttl=600))
         ```
         """
 
-        self._configuration = AppConfig(base_url=base_url)
+        self._hooks = HookDispatcher()
+        with profile_phase('config fetch'):
+            self._configuration = AppConfig(base_url=base_url, transport_config=transport_config,
+                                            cache_config=cache_config)
         if not auth_info:
-            auth_info = get_auth_info_from_config(self._configuration, auth_io=None)
+            with profile_phase('auth'):
+                auth_info = get_auth_info_from_config(self._configuration, auth_io=None)
 
         self._api_client = CirroApiClient(
             base_url=self._configuration.rest_endpoint,
             auth_method=auth_info.get_auth_method(),
             client_name='Cirro SDK',
-            package_name='cirro'
+            package_name='cirro',
+            timeout=self._configuration.transport_config.httpx_timeout(),
+            httpx_args={
+                # Connection pool and HTTP/2 settings must be set on the transport when it is provided
+                'transport': InstrumentedTransport(self._hooks, **self._configuration.transport_config.httpx_args())
+            }
         )
 
+        self._metadata_cache = self._create_metadata_cache(auth_info)
+
         # Init services
         self._file_service = FileService(self._api_client,
                                          checksum_method=self._configuration.checksum_method,
-                                         transfer_retries=self._configuration.transfer_max_retries)
+                                         transfer_retries=self._configuration.transfer_max_retries,
+                                         credential_manager=file_credential_manager,
+                                         hooks=self._hooks)
         self._dataset_service = DatasetService(self._api_client, file_service=self._file_service)
-        self._project_service = ProjectService(self._api_client)
-        self._process_service = ProcessService(self._api_client)
-        self._execution_service = ExecutionService(self._api_client)
+        self._project_service = ProjectService(self._api_client, cache=self._metadata_cache)
+        self._process_service = ProcessService(self._api_client, cache=self._metadata_cache)
+        self._execution_service = ExecutionService(self._api_client, cache=self._metadata_cache)
         self._compute_environment_service = ComputeEnvironmentService(self._api_client)
         self._metrics_service = MetricsService(self._api_client)
         self._metadata_service = MetadataService(self._api_client)
         self._billing_service = BillingService(self._api_client)
-        self._references_service = ReferenceService(self._api_client, file_service=self._file_service)
+        self._references_service = ReferenceService(self._api_client, file_service=self._file_service,
+                                                    cache=self._metadata_cache)
         self._shares_service = ShareService(self._api_client)
         self._users_service = UserService(self._api_client)
 
+        profiler = get_active_profiler()
+        if profiler is not None:
+            self.add_hook(profiler.metrics)
+
+    def _create_metadata_cache(self, auth_info: AuthInfo) -> Optional[MetadataCache]:
+        cache_config = self._configuration.cache_config
+        if not cache_config.ttl or cache_config.ttl <= 0:
+            return None
+        cache_dir = None
+        if cache_config.persist:
+            # The projects listed depend on the user, the values are kept apart for each instance and user
+            try:
+                user = auth_info.get_current_user()
+            except NotImplementedError:
+                user = 'default'
+            cache_dir = Path(Constants.metadata_cache_dir,
+                             re.sub(r'[^A-Za-z0-9._-]', '_', self._configuration.base_url),
+                             re.sub(r'[^A-Za-z0-9._-]', '_', user or 'default'))
+        return MetadataCache(ttl=cache_config.ttl, cache_dir=cache_dir)
+
+    def add_hook(self, hook: InstrumentationHook):
+        """
+        Registers a hook which receives an event for every API call and S3 operation made by this client
+
+        Args:
+            hook (cirro.instrumentation.InstrumentationHook): Hook, such as
+             `cirro.instrumentation.MetricsHook` or `cirro.instrumentation.OpenTelemetryHook`
+
+        Example:
+        ```python
+        from cirro.instrumentation import MetricsHook
+
+        metrics = MetricsHook()
+        cirro.add_hook(metrics)
+        cirro.projects.list()
+        print(metrics.summary()['api'])
+        ```
+        """
+        self._hooks.add(hook)
+
+    def remove_hook(self, hook: InstrumentationHook):
+        """
+        Unregisters a hook added with `add_hook`
+        """
+        self._hooks.remove(hook)
+
     @property
     def datasets(self) -> DatasetService:
         """
@@ -144,6 +230,13 @@ class CirroApi:
         """
         return self._file_service
 
+    @property
+    def metadata_cache(self) -> Optional[MetadataCache]:
+        """
+        Gets the cache of processes, projects and reference types, if enabled
+        """
+        return self._metadata_cache
+
     @property
     def api_client(self) -> CirroApiClient:
         """
@@ -1,9 +1,24 @@
-from cirro.cli.controller import run_ingest, run_download, run_configure, run_list_datasets, run_create_pipeline_config
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from cirro.cli.controller import run_ingest, run_download, run_configure, run_list_datasets, \
+        run_create_pipeline_config, run_watch, run_logs, run_upload_batch
 
 __all__ = [
     'run_ingest',
     'run_download',
     'run_configure',
     'run_list_datasets',
-    'run_create_pipeline_config'
+    'run_create_pipeline_config',
+    'run_watch',
+    'run_logs',
+    'run_upload_batch'
 ]
+
+
+def __getattr__(name: str):
+    # The controller pulls in the whole client, load it only when a command runs
+    if name in __all__:
+        return getattr(importlib.import_module('cirro.cli.controller'), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
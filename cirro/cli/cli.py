@@ -1,9 +1,10 @@
+import os
+from pathlib import Path
+
 import click
-from cirro_api_client.v1.errors import CirroException
 
-from cirro.cli import run_ingest, run_download, run_configure, run_list_datasets, run_create_pipeline_config
-from cirro.cli.controller import handle_error, run_upload_reference
-from cirro.cli.interactive.utils import InputError
+# Command implementations are imported inside each command,
+# so that `cirro --help` does not load the API client
 
 
 def check_required_args(args):
@@ -15,10 +16,46 @@ def check_required_args(args):
         ctx.exit()
 
 
+def _get_profile_output(profile: bool, profile_output: str):
+    """
+    Gets the path of the profile report, or None when profiling is disabled.
+    `CIRRO_PROFILE` may be set to true to enable profiling, or to the path of the report.
+    """
+    env_value = os.environ.get('CIRRO_PROFILE', '').strip()
+    if profile_output:
+        return Path(profile_output)
+    if env_value.lower() in ('', '0', 'false', 'no'):
+        env_value = None
+    if env_value and env_value.lower() not in ('1', 'true', 'yes'):
+        return Path(env_value)
+    if profile or env_value:
+        from cirro.profiling import default_profile_path
+        return default_profile_path()
+    return None
+
+
 @click.group(help="Cirro CLI - Tool for interacting with datasets")
 @click.version_option()
-def run():
-    pass  # Print out help text, nothing to do
+@click.option('--profile',
+              help='Profile the command and write a report which can be attached to a support ticket',
+              is_flag=True, default=False)
+@click.option('--profile-output',
+              metavar='FILE',
+              help='File to write the profile report to (default: cirro-profile-<timestamp>.txt)')
+@click.pass_context
+def run(ctx: click.Context, profile: bool, profile_output: str):
+    output_path = _get_profile_output(profile, profile_output)
+    if output_path is None:
+        return
+
+    from cirro.profiling import Profiler
+    profiler = Profiler(output_path)
+    profiler.start()
+
+    def write_profile():
+        click.echo(f'Profile written to {profiler.stop()}', err=True)
+
+    ctx.call_on_close(write_profile)
 
 
 @run.command(help='List datasets', no_args_is_help=True)
@@ -28,6 +65,7 @@ def run():
               help='Gather arguments interactively',
               is_flag=True, default=False)
 def list_datasets(**kwargs):
+    from cirro.cli.controller import run_list_datasets
     check_required_args(kwargs)
     run_list_datasets(kwargs, interactive=kwargs.get('interactive'))
 
@@ -47,6 +85,7 @@ def list_datasets(**kwargs):
               help='Gather arguments interactively',
               is_flag=True, default=False)
 def download(**kwargs):
+    from cirro.cli.controller import run_download
     check_required_args(kwargs)
     run_download(kwargs, interactive=kwargs.get('interactive'))
 
@@ -70,10 +109,34 @@ def download(**kwargs):
               help='Include hidden files in the upload (e.g., files starting with .)',
               is_flag=True, default=False)
 def upload(**kwargs):
+    from cirro.cli.controller import run_ingest
     check_required_args(kwargs)
     run_ingest(kwargs, interactive=kwargs.get('interactive'))
 
 
+@run.command(help='Upload and create many datasets, one per directory listed in a manifest', no_args_is_help=True)
+@click.option('--project',
+              help='Name or ID of the project')
+@click.option('--process',
+              help='Name or ID of the ingest process (optional if the manifest has a process column)')
+@click.option('--manifest',
+              help='CSV file with the columns name, directory and optionally description, process '
+                   'and tags (separated by ;)')
+@click.option('--max-workers',
+              help='Number of datasets uploaded at the same time',
+              type=int, default=4, show_default=True)
+@click.option('--max-in-flight-mb',
+              help='Maximum megabytes uploaded at the same time across all datasets',
+              type=int, default=2048, show_default=True)
+@click.option('--state-file',
+              help='File the status of each dataset is saved to, run the command again to resume the batch '
+                   '(default: <manifest>.state.json)')
+def upload_batch(**kwargs):
+    from cirro.cli.controller import run_upload_batch
+    check_required_args({'project': kwargs['project'], 'manifest': kwargs['manifest']})
+    run_upload_batch(kwargs)
+
+
 @run.command(help='Upload a reference to a project', no_args_is_help=True)
 @click.option('--name',
               help='Name of the reference')
@@ -88,12 +151,45 @@ def upload(**kwargs):
               help='Gather arguments interactively',
               is_flag=True, default=False)
 def upload_reference(**kwargs):
+    from cirro.cli.controller import run_upload_reference
     check_required_args(kwargs)
     run_upload_reference(kwargs, interactive=kwargs.get('interactive'))
 
 
+@run.command(help='Wait for analyses to finish, printing each change of status', no_args_is_help=True)
+@click.option('--project',
+              help='Name or ID of the project')
+@click.option('--dataset',
+              help='ID of the dataset created by the analysis (can specify multiple datasets)',
+              multiple=True)
+@click.option('--timeout',
+              help='Stop waiting after this many seconds (optional)',
+              type=float)
+def watch(**kwargs):
+    from cirro.cli.controller import run_watch
+    check_required_args({'project': kwargs['project'], 'dataset': kwargs['dataset'] or None})
+    run_watch(kwargs)
+
+
+@run.command(help='Print the logs of an analysis', no_args_is_help=True)
+@click.option('--project',
+              help='Name or ID of the project')
+@click.option('--dataset',
+              help='ID of the dataset created by the analysis')
+@click.option('--task',
+              help='ID of a task of the analysis, to print its logs instead of the main execution log (optional)')
+@click.option('-f', '--follow',
+              help='Keep printing new log events until the analysis has finished',
+              is_flag=True, default=False)
+def logs(**kwargs):
+    from cirro.cli.controller import run_logs
+    check_required_args({'project': kwargs['project'], 'dataset': kwargs['dataset']})
+    run_logs(kwargs)
+
+
 @run.command(help='Configure authentication')
 def configure():
+    from cirro.cli.controller import run_configure
     run_configure()
 
 
@@ -117,6 +213,7 @@ def configure():
               help='Gather arguments interactively',
               is_flag=True, default=False)
 def create_pipeline_config(**kwargs):
+    from cirro.cli.controller import run_create_pipeline_config
     check_required_args(kwargs)
     run_create_pipeline_config(kwargs, interactive=kwargs.get('interactive'))
 
@@ -124,12 +221,16 @@ def create_pipeline_config(**kwargs):
 def main():
     try:
         run()
-    except InputError as e:
-        handle_error(e)
-    except CirroException as e:
-        handle_error(e)
     except KeyboardInterrupt:
         pass
+    except Exception as e:
+        from cirro_api_client.v1.errors import CirroException
+        from cirro.cli.controller import handle_error
+        from cirro.cli.interactive.utils import InputError
+
+        if isinstance(e, (InputError, CirroException)):
+            handle_error(e)
+        raise
 
 
 if __name__ == "__main__":
@@ -3,10 +3,13 @@ import json
 import logging
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 
 import requests
 from cirro_api_client.v1.models import UploadDatasetRequest, Status, Executor
+from packaging.version import Version
 
 from cirro.cirro_client import CirroApi
 from cirro.cli.interactive.auth_args import gather_auth_config
@@ -18,10 +21,14 @@ from cirro.cli.interactive.upload_args import gather_upload_arguments
 from cirro.cli.interactive.upload_reference_args import gather_reference_upload_arguments
 from cirro.cli.interactive.utils import get_id_from_name, get_item_from_name_or_id, InputError
 from cirro.cli.models import ListArguments, UploadArguments, DownloadArguments, CreatePipelineConfigArguments, \
-    UploadReferenceArguments
-from cirro.config import UserConfig, save_user_config, load_user_config
+    UploadReferenceArguments, WatchArguments, LogsArguments, UploadBatchArguments
+from cirro.config import UserConfig, save_user_config, load_user_config, Constants, _env_flag
 from cirro.file_utils import get_files_in_directory
+from cirro.models.dataset import DatasetUploadStatus
 from cirro.models.process import PipelineDefinition, ConfigAppStatus, CONFIG_APP_URL
+from cirro.profiling import profile_phase
+from cirro.services.batch_upload import BatchUploader
+from cirro.services.execution_watcher import ExecutionWatcher
 from cirro.services.service_helpers import list_all_datasets
 
 NO_PROJECTS = "No projects available"
@@ -42,7 +49,8 @@ def run_list_datasets(input_params: ListArguments, interactive=False):
     _check_version()
     cirro = CirroApi()
     logger.info(f"Collecting data from {cirro.configuration.base_url}")
-    projects = cirro.projects.list()
+    with profile_phase('project listing'):
+        projects = cirro.projects.list()
 
     if len(projects) == 0:
         raise InputError(NO_PROJECTS)
@@ -54,7 +62,8 @@ def run_list_datasets(input_params: ListArguments, interactive=False):
         input_params['project'] = get_id_from_name(projects, input_params['project'])
 
     # List the datasets available in that project
-    datasets = cirro.datasets.list(input_params['project'])
+    with profile_phase('dataset listing'):
+        datasets = cirro.datasets.list(input_params['project'])
 
     sorted_datasets = sorted(datasets, key=lambda d: d.created_at, reverse=True)
 
@@ -69,10 +78,12 @@ def run_ingest(input_params: UploadArguments, interactive=False):
     _check_version()
     cirro = CirroApi()
     logger.info(f"Collecting data from {cirro.configuration.base_url}")
-    processes = cirro.processes.list(process_type=Executor.INGEST)
+    with profile_phase('process listing'):
+        processes = cirro.processes.list(process_type=Executor.INGEST)
 
     logger.info("Listing available projects")
-    projects = cirro.projects.list()
+    with profile_phase('project listing'):
+        projects = cirro.projects.list()
 
     if len(projects) == 0:
         raise InputError(NO_PROJECTS)
@@ -84,7 +95,8 @@ def run_ingest(input_params: UploadArguments, interactive=False):
         input_params['project'] = get_id_from_name(projects, input_params['project'])
         input_params['process'] = get_id_from_name(processes, input_params['process'])
         directory = input_params['data_directory']
-        files = get_files_in_directory(directory)
+        with profile_phase('file scan'):
+            files = get_files_in_directory(directory)
 
     if len(files) == 0:
         raise InputError("No files to upload")
@@ -92,7 +104,8 @@ def run_ingest(input_params: UploadArguments, interactive=False):
     process = get_item_from_name_or_id(processes, input_params['process'])
     logger.info(f"Validating expected files: {process.name}")
     try:
-        cirro.processes.check_dataset_files(process_id=process.id, files=files, directory=directory)
+        with profile_phase('validation'):
+            cirro.processes.check_dataset_files(process_id=process.id, files=files, directory=directory)
     except ValueError as e:
         raise InputError(e)
     logger.info("Creating new dataset")
@@ -105,14 +118,16 @@ def run_ingest(input_params: UploadArguments, interactive=False):
     )
 
     project_id = get_id_from_name(projects, input_params['project'])
-    create_resp = cirro.datasets.create(project_id=project_id,
-                                        upload_request=upload_dataset_request)
+    with profile_phase('dataset creation'):
+        create_resp = cirro.datasets.create(project_id=project_id,
+                                            upload_request=upload_dataset_request)
 
     logger.info("Uploading files")
-    cirro.datasets.upload_files(project_id=project_id,
-                                dataset_id=create_resp.id,
-                                directory=directory,
-                                files=files)
+    with profile_phase('transfer'):
+        cirro.datasets.upload_files(project_id=project_id,
+                                    dataset_id=create_resp.id,
+                                    directory=directory,
+                                    files=files)
     logger.info(f"File content validated by {cirro.configuration.checksum_method_display}")
 
 
@@ -123,7 +138,8 @@ def run_download(input_params: DownloadArguments, interactive=False):
     logger.info(f"Collecting data from {cirro.configuration.base_url}")
 
     logger.info("Listing available projects")
-    projects = cirro.projects.list()
+    with profile_phase('project listing'):
+        projects = cirro.projects.list()
 
     if len(projects) == 0:
         raise InputError(NO_PROJECTS)
@@ -133,11 +149,13 @@ def run_download(input_params: DownloadArguments, interactive=False):
         input_params = gather_download_arguments(input_params, projects)
 
         input_params['project'] = get_id_from_name(projects, input_params['project'])
-        datasets = list_all_datasets(project_id=input_params['project'], client=cirro)
+        with profile_phase('dataset listing'):
+            datasets = list_all_datasets(project_id=input_params['project'], client=cirro)
         # Filter out datasets that are not complete
         datasets = [d for d in datasets if d.status == Status.COMPLETED]
         input_params = gather_download_arguments_dataset(input_params, datasets)
-        files = cirro.datasets.get_assets_listing(input_params['project'], input_params['dataset']).files
+        with profile_phase('manifest listing'):
+            files = cirro.datasets.get_assets_listing(input_params['project'], input_params['dataset']).files
 
         if len(files) == 0:
             raise InputError('There are no files in this dataset to download')
@@ -148,11 +166,13 @@ def run_download(input_params: DownloadArguments, interactive=False):
 
     else:
         project_id = get_id_from_name(projects, input_params['project'])
-        datasets = cirro.datasets.list(project_id)
+        with profile_phase('dataset listing'):
+            datasets = cirro.datasets.list(project_id)
         dataset_id = get_id_from_name(datasets, input_params['dataset'])
 
         if input_params['file']:
-            all_files = cirro.datasets.get_assets_listing(project_id, dataset_id).files
+            with profile_phase('manifest listing'):
+                all_files = cirro.datasets.get_assets_listing(project_id, dataset_id).files
             files_to_download = []
 
             for filepath in input_params['file']:
@@ -167,10 +187,53 @@ def run_download(input_params: DownloadArguments, interactive=False):
     logger.info("Downloading files")
     logger.info(f"File content validated by {cirro.configuration.checksum_method_display}")
 
-    cirro.datasets.download_files(project_id=project_id,
-                                  dataset_id=dataset_id,
-                                  download_location=input_params['data_directory'],
-                                  files=files_to_download)
+    with profile_phase('transfer'):
+        cirro.datasets.download_files(project_id=project_id,
+                                      dataset_id=dataset_id,
+                                      download_location=input_params['data_directory'],
+                                      files=files_to_download)
+
+
+def run_upload_batch(input_params: UploadBatchArguments):
+    _check_configure()
+    _check_version()
+    cirro = CirroApi()
+    logger.info(f"Collecting data from {cirro.configuration.base_url}")
+    with profile_phase('project listing'):
+        projects = cirro.projects.list()
+
+    if len(projects) == 0:
+        raise InputError(NO_PROJECTS)
+    project_id = get_id_from_name(projects, input_params['project'])
+
+    try:
+        uploads = BatchUploader.read_manifest(input_params['manifest'])
+    except (OSError, ValueError) as e:
+        raise InputError(e)
+    if len(uploads) == 0:
+        raise InputError("No datasets to upload")
+
+    uploader = BatchUploader(
+        cirro, project_id,
+        process=input_params.get('process'),
+        max_workers=input_params['max_workers'],
+        max_bytes_in_flight=input_params['max_in_flight_mb'] * 1024 ** 2,
+        state_file=input_params.get('state_file') or f"{input_params['manifest']}.state.json"
+    )
+    try:
+        with profile_phase('transfer'):
+            uploads = uploader.upload(uploads)
+    except ValueError as e:
+        raise InputError(e)
+
+    for upload in uploads:
+        logger.info(f"{upload.name}: {upload.status.value} {upload.dataset_id or ''} {upload.error or ''}".rstrip())
+    failed = [upload for upload in uploads if upload.status != DatasetUploadStatus.UPLOADED]
+    if failed:
+        logger.error(f"{len(failed)} of {len(uploads)} datasets were not uploaded, "
+                     f"run the command again to resume the batch")
+        sys.exit(1)
+    logger.info(f"All {len(uploads)} datasets uploaded")
 
 
 def run_upload_reference(input_params: UploadReferenceArguments, interactive=False):
@@ -180,7 +243,8 @@ def run_upload_reference(input_params: UploadReferenceArguments, interactive=Fal
     logger.info(f"Collecting data from {cirro.configuration.base_url}")
 
     reference_types = cirro.references.get_types()
-    projects = cirro.projects.list()
+    with profile_phase('project listing'):
+        projects = cirro.projects.list()
 
     if len(projects) == 0:
         raise InputError(NO_PROJECTS)
@@ -193,10 +257,63 @@ def run_upload_reference(input_params: UploadReferenceArguments, interactive=Fal
     project_id = get_id_from_name(projects, input_params['project'])
     reference_type = next((rt for rt in reference_types if rt.name == input_params['reference_type']), None)
 
-    cirro.references.upload_reference(project_id=project_id,
-                                      ref_type=reference_type,
-                                      name=input_params['name'],
-                                      reference_files=files)
+    with profile_phase('transfer'):
+        cirro.references.upload_reference(project_id=project_id,
+                                          ref_type=reference_type,
+                                          name=input_params['name'],
+                                          reference_files=files)
+
+
+def run_watch(input_params: WatchArguments):
+    _check_configure()
+    _check_version()
+    cirro = CirroApi()
+    logger.info(f"Collecting data from {cirro.configuration.base_url}")
+    with profile_phase('project listing'):
+        projects = cirro.projects.list()
+
+    if len(projects) == 0:
+        raise InputError(NO_PROJECTS)
+    project_id = get_id_from_name(projects, input_params['project'])
+
+    def log_change(change):
+        previous = change.previous_status.value if change.previous_status else 'watching'
+        logger.info(f"{change.dataset_id}: {previous} -> {change.status.value}")
+
+    watcher = ExecutionWatcher(cirro, on_change=log_change)
+    watcher.add_many(project_id, list(input_params['dataset']))
+    with profile_phase('watch'):
+        statuses = watcher.wait(timeout=input_params.get('timeout'))
+
+    if watcher.pending:
+        logger.warning(f"Timed out with {len(watcher.pending)} analyses still running")
+        sys.exit(2)
+    failed = [dataset_id for dataset_id, status in statuses.items() if status != Status.COMPLETED]
+    if failed:
+        logger.error(f"{len(failed)} of {len(statuses)} analyses did not complete: {', '.join(failed)}")
+        sys.exit(1)
+    logger.info(f"All {len(statuses)} analyses completed")
+
+
+def run_logs(input_params: LogsArguments):
+    _check_configure()
+    _check_version()
+    cirro = CirroApi()
+    with profile_phase('project listing'):
+        projects = cirro.projects.list()
+
+    if len(projects) == 0:
+        raise InputError(NO_PROJECTS)
+    project_id = get_id_from_name(projects, input_params['project'])
+
+    if input_params.get('task'):
+        events = cirro.execution.tail_task_logs(project_id, input_params['dataset'], input_params['task'],
+                                                follow=input_params['follow'])
+    else:
+        events = cirro.execution.tail_execution_logs(project_id, input_params['dataset'],
+                                                     follow=input_params['follow'])
+    for event in events:
+        print(event.message, flush=True)
 
 
 def run_configure():
@@ -273,17 +390,28 @@ def _check_configure():
 def _check_version():
     """
     Prompts the user to update their package version if needed
+
+    The latest version is read from a cache in `CIRRO_HOME` and refreshed from PyPI
+    in the background once a day, so this never blocks the command.
+    A failed lookup is cached for as long, so PyPI is not contacted on every command without network access.
+    Set `CIRRO_DISABLE_VERSION_CHECK` (or `CIRRO_OFFLINE`) to skip the check entirely.
     """
+    if _env_flag('CIRRO_DISABLE_VERSION_CHECK') or _env_flag('CIRRO_OFFLINE'):
+        return
+
     yellow_color = '\033[93m'
     reset_color = '\033[0m'
 
     try:
         current_version = importlib.metadata.version('cirro')
-        response = requests.get("https://pypi.org/pypi/cirro/json")
-        response.raise_for_status()
-        latest_version = response.json()["info"]["version"]
+        cached = _load_version_check()
 
-        if current_version != latest_version:
+        if not cached or time.time() - cached['checked_at'] > Constants.version_check_ttl:
+            threading.Thread(target=_refresh_version_check, daemon=True).start()
+
+        latest_version = cached['latest_version'] if cached else None
+        # The cache may be older than the installed version, only a newer release is reported
+        if latest_version and Version(latest_version) > Version(current_version):
             print(f"{yellow_color}Warning:{reset_color} Cirro version {current_version} "
                   f"is out of date. Update to {latest_version} with 'pip install cirro --upgrade'.")
 
@@ -291,6 +419,33 @@ def _check_version():
         return
 
 
+def _load_version_check():
+    try:
+        cached = json.loads(Constants.version_check_path.read_text())
+        return cached if 'checked_at' in cached and 'latest_version' in cached else None
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _refresh_version_check():
+    try:
+        response = requests.get("https://pypi.org/pypi/cirro/json", timeout=Constants.version_check_timeout)
+        response.raise_for_status()
+        latest_version = response.json()["info"]["version"]
+    except Exception:
+        # Recorded as a check without a version, so that it is not retried until the cache expires
+        latest_version = None
+
+    try:
+        Constants.version_check_path.parent.mkdir(parents=True, exist_ok=True)
+        Constants.version_check_path.write_text(json.dumps({
+            'checked_at': time.time(),
+            'latest_version': latest_version
+        }))
+    except OSError:
+        return
+
+
 def handle_error(e: Exception):
     logger.error(f"{e.__class__.__name__}: {e}")
     sys.exit(1)
@@ -2,8 +2,6 @@ from pathlib import Path
 from typing import List, Union, Callable, TypeVar, Optional
 
 from prompt_toolkit.validation import Validator, ValidationError
-import questionary
-from questionary import prompt
 
 
 class InputError(Exception):
@@ -22,6 +20,8 @@ class DirectoryValidator(Validator):
 
 
 def prompt_wrapper(questions):
+    from questionary import prompt
+
     answers = prompt(questions)
     # Prompt catches KeyboardInterrupt and sends back an empty dictionary
     # We want to catch this exception
@@ -49,6 +49,8 @@ def ask(function_name: str,
     function_name: https://questionary.readthedocs.io/en/stable/pages/types.html#
     """
 
+    import questionary
+
     # Get the questionary function
     questionary_f = questionary.__dict__.get(function_name)
 
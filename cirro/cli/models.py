@@ -24,6 +24,28 @@ class ListArguments(TypedDict):
     interactive: bool
 
 
+class UploadBatchArguments(TypedDict):
+    project: str
+    process: Optional[str]
+    manifest: str
+    max_workers: int
+    max_in_flight_mb: int
+    state_file: Optional[str]
+
+
+class WatchArguments(TypedDict):
+    project: str
+    dataset: List[str]
+    timeout: Optional[float]
+
+
+class LogsArguments(TypedDict):
+    project: str
+    dataset: str
+    task: Optional[str]
+    follow: bool
+
+
 class CreatePipelineConfigArguments(TypedDict):
     pipeline_dir: str
     output_dir: str
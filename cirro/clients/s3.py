@@ -9,9 +9,16 @@ from botocore.session import get_session
 from cirro_api_client.v1.models import AWSCredentials
 from tqdm import tqdm
 
+from cirro.instrumentation.base import HookDispatcher
+from cirro.instrumentation.s3 import register_s3_instrumentation
 from cirro.utils import convert_size
 
 
+COPY_MULTIPART_THRESHOLD = 1024 ** 3
+" Objects larger than this (in bytes) are copied in parts"
+COPY_MULTIPART_CHUNKSIZE = 256 * 1024 ** 2
+
+
 def format_creds_for_session(creds: AWSCredentials):
     return {
         'access_key': creds.access_key_id,
@@ -32,8 +39,10 @@ class ProgressPercentage:
 
 
 class S3Client:
-    def __init__(self, creds_getter: Callable[[], AWSCredentials], checksum_method: str = None):
+    def __init__(self, creds_getter: Callable[[], AWSCredentials], checksum_method: str = None,
+                 hooks: HookDispatcher = None):
         self._creds_getter = creds_getter
+        self._hooks = hooks
         self._client = self._build_session_client()
         self._upload_args = dict(ChecksumAlgorithm=checksum_method)
         self._download_args = dict(ChecksumMode='ENABLED') if checksum_method else dict()
@@ -69,6 +78,30 @@ class S3Client:
                                        Callback=ProgressPercentage(progress),
                                        ExtraArgs=self._download_args)
 
+    def copy_file(self, source_bucket: str, source_key: str, bucket: str, key: str,
+                  source_client: 'S3Client' = None):
+        """
+        Copies an object within S3, without transferring its contents through this machine.
+        Objects larger than `COPY_MULTIPART_THRESHOLD` are copied in parts concurrently (required above 5 GB).
+
+        Args:
+            source_bucket (str): Bucket of the object to copy
+            source_key (str): Key of the object to copy
+            bucket (str): Destination bucket
+            key (str): Destination key
+            source_client (S3Client): Client with access to the source object, used to read its size
+        """
+        from boto3.s3.transfer import TransferConfig
+
+        config = TransferConfig(multipart_threshold=COPY_MULTIPART_THRESHOLD,
+                                multipart_chunksize=COPY_MULTIPART_CHUNKSIZE,
+                                max_concurrency=10)
+        extra_args = {k: v for k, v in self._upload_args.items() if v is not None}
+        self._client.copy({'Bucket': source_bucket, 'Key': source_key}, bucket, key,
+                          ExtraArgs=extra_args,
+                          SourceClient=source_client.get_aws_client() if source_client else None,
+                          Config=config)
+
     def create_object(self, bucket: str, key: str, contents: str, content_type: str):
         self._client.put_object(
             Bucket=bucket,
@@ -110,7 +143,10 @@ class S3Client:
         s3_config = Config(
             use_dualstack_endpoint=True
         )
-        return session.client('s3', region_name=creds.region, config=s3_config)
+        client = session.client('s3', region_name=creds.region, config=s3_config)
+        if self._hooks is not None:
+            register_s3_instrumentation(client, self._hooks)
+        return client
 
     def _refresh_credentials(self):
         new_creds = self._creds_getter()
@@ -1,18 +1,110 @@
 import configparser
+import json
+import logging
 import os
 import re
+import threading
+import time
 from pathlib import Path
-from typing import NamedTuple, Dict, Optional
+from typing import NamedTuple, Dict, Optional, Any
 
 import requests
 from requests import RequestException
 
+logger = logging.getLogger(__name__)
+
 
 class Constants:
     home = os.environ.get('CIRRO_HOME', '~/.cirro')
     config_path = Path(home, 'config.ini').expanduser()
     default_base_url = 'cirro.bio'
     default_max_retries = 10
+    system_info_cache_dir = Path(home, 'system_info').expanduser()
+    metadata_cache_dir = Path(home, 'metadata_cache').expanduser()
+    default_system_info_ttl = 24 * 60 * 60
+    system_info_timeout = 10
+    version_check_path = Path(home, 'version_check.json').expanduser()
+    version_check_ttl = 24 * 60 * 60
+    version_check_timeout = 2
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f'Ignoring invalid value of {name}: {value!r}, using {default}')
+        return default
+
+
+class TransportConfig(NamedTuple):
+    """
+    Connection pool, keep-alive and timeout settings of the HTTP client used for API calls.
+    Values left as None use the defaults of httpx (except timeouts, which are disabled by default).
+    """
+    max_connections: Optional[int] = None
+    " Maximum number of concurrent connections"
+    max_keepalive_connections: Optional[int] = None
+    " Maximum number of idle connections kept open"
+    keepalive_expiry: Optional[float] = None
+    " Seconds an idle connection is kept open"
+    http2: bool = False
+    " Use HTTP/2 (requires the `h2` package, `pip install httpx[http2]`)"
+    connect_timeout: Optional[float] = None
+    " Seconds to wait for a connection to be established"
+    read_timeout: Optional[float] = None
+    " Seconds to wait for a response"
+
+    def httpx_timeout(self):
+        """
+        Gets the timeout to pass to the httpx client
+        """
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        import httpx
+        return httpx.Timeout(None, connect=self.connect_timeout, read=self.read_timeout)
+
+    def httpx_args(self) -> Dict[str, Any]:
+        """
+        Gets the additional arguments to pass to the httpx client
+        """
+        import httpx
+        args = {}
+        limits = {
+            'max_connections': self.max_connections,
+            'max_keepalive_connections': self.max_keepalive_connections,
+            'keepalive_expiry': self.keepalive_expiry
+        }
+        if any(value is not None for value in limits.values()):
+            default_limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            args['limits'] = httpx.Limits(**{
+                name: value if value is not None else getattr(default_limits, name)
+                for name, value in limits.items()
+            })
+        if self.http2:
+            try:
+                import h2  # noqa
+            except ImportError:
+                raise RuntimeError('HTTP/2 requires the h2 package, install it with pip install httpx[http2]')
+            args['http2'] = True
+        return args
+
+
+class CacheConfig(NamedTuple):
+    """
+    Settings of the cache of rarely changing metadata (processes, projects and reference types),
+    see `cirro.services.cache.MetadataCache`. The cache is disabled by default.
+    """
+    ttl: float = 0
+    " Seconds a value is re-used before fetching it again (0 disables the cache)"
+    persist: bool = False
+    " Also save the values in `CIRRO_HOME`, so that they are re-used by later sessions"
 
 
 class UserConfig(NamedTuple):
@@ -21,6 +113,8 @@ class UserConfig(NamedTuple):
     base_url: Optional[str]
     transfer_max_retries: Optional[int]
     enable_additional_checksum: Optional[bool]
+    transport_config: Optional[TransportConfig] = None
+    cache_config: Optional[CacheConfig] = None
 
 
 def extract_base_url(base_url: str):
@@ -31,6 +125,40 @@ def extract_base_url(base_url: str):
     return base_url
 
 
+_transport_config_keys = {
+    'max_connections': 'http_max_connections',
+    'max_keepalive_connections': 'http_max_keepalive_connections',
+    'keepalive_expiry': 'http_keepalive_expiry',
+    'http2': 'http2',
+    'connect_timeout': 'http_connect_timeout',
+    'read_timeout': 'http_read_timeout'
+}
+
+
+def _load_transport_config(main_config: configparser.SectionProxy) -> TransportConfig:
+    return TransportConfig(
+        max_connections=main_config.getint(_transport_config_keys['max_connections']),
+        max_keepalive_connections=main_config.getint(_transport_config_keys['max_keepalive_connections']),
+        keepalive_expiry=main_config.getfloat(_transport_config_keys['keepalive_expiry']),
+        http2=main_config.getboolean(_transport_config_keys['http2'], False),
+        connect_timeout=main_config.getfloat(_transport_config_keys['connect_timeout']),
+        read_timeout=main_config.getfloat(_transport_config_keys['read_timeout'])
+    )
+
+
+_cache_config_keys = {
+    'ttl': 'metadata_cache_ttl',
+    'persist': 'metadata_cache_persist'
+}
+
+
+def _load_cache_config(main_config: configparser.SectionProxy) -> CacheConfig:
+    return CacheConfig(
+        ttl=main_config.getfloat(_cache_config_keys['ttl'], 0),
+        persist=main_config.getboolean(_cache_config_keys['persist'], False)
+    )
+
+
 def save_user_config(user_config: UserConfig):
     original_user_config = load_user_config()
     ini_config = configparser.ConfigParser()
@@ -41,6 +169,13 @@ def save_user_config(user_config: UserConfig):
     }
     if original_user_config:
         ini_config['General']['transfer_max_retries'] = str(original_user_config.transfer_max_retries)
+        if original_user_config.transport_config:
+            for key, value in original_user_config.transport_config._asdict().items():
+                if value is not None:
+                    ini_config['General'][_transport_config_keys[key]] = str(value)
+        if original_user_config.cache_config and original_user_config.cache_config.ttl:
+            for key, value in original_user_config.cache_config._asdict().items():
+                ini_config['General'][_cache_config_keys[key]] = str(value)
 
     ini_config[user_config.auth_method] = user_config.auth_method_config
     Constants.config_path.parent.mkdir(exist_ok=True)
@@ -60,6 +195,8 @@ def load_user_config() -> Optional[UserConfig]:
         base_url = main_config.get('base_url')
         transfer_max_retries = main_config.getint('transfer_max_retries', Constants.default_max_retries)
         enable_additional_checksum = main_config.getboolean('enable_additional_checksum', False)
+        transport_config = _load_transport_config(main_config)
+        cache_config = _load_cache_config(main_config)
 
         if auth_method and ini_config.has_section(auth_method):
             auth_method_config = dict(ini_config[auth_method])
@@ -71,14 +208,81 @@ def load_user_config() -> Optional[UserConfig]:
             auth_method_config=auth_method_config,
             base_url=base_url,
             transfer_max_retries=transfer_max_retries,
-            enable_additional_checksum=enable_additional_checksum
+            enable_additional_checksum=enable_additional_checksum,
+            transport_config=transport_config,
+            cache_config=cache_config
         )
     except Exception:
         raise RuntimeError('Configuration load error, please re-run configuration')
 
 
+def _system_info_cache_path(base_url: str) -> Path:
+    file_name = re.sub(r'[^A-Za-z0-9._-]', '_', base_url)
+    return Path(Constants.system_info_cache_dir, f'{file_name}.json')
+
+
+def load_cached_system_info(base_url: str) -> Optional[Dict]:
+    """
+    Loads the system info for the given base URL from the local cache, along with the time it was saved
+    """
+    cache_path = _system_info_cache_path(base_url)
+    if not cache_path.exists():
+        return None
+    try:
+        cached = json.loads(cache_path.read_text())
+        # A truncated or outdated file is ignored, the system info is fetched again
+        if not isinstance(cached, dict) or not isinstance(cached.get('info'), dict) or \
+                not isinstance(cached.get('saved_at'), (int, float)):
+            return None
+        return cached
+    except (OSError, ValueError):
+        logger.debug(f'Ignoring unreadable system info cache {cache_path}')
+        return None
+
+
+def save_cached_system_info(base_url: str, info: Dict):
+    """
+    Saves the system info for the given base URL to the local cache
+    """
+    cache_path = _system_info_cache_path(base_url)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see a partial file
+        tmp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp_path.write_text(json.dumps({'saved_at': time.time(), 'info': info}))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        logger.debug(f'Unable to write system info cache {cache_path}')
+
+
+def fetch_system_info(rest_endpoint: str) -> Dict:
+    """
+    Retrieves the system info (client ID, user pool, buckets, region) from the Cirro instance
+    """
+    info_resp = requests.get(f'{rest_endpoint}/info/system', timeout=Constants.system_info_timeout)
+    info_resp.raise_for_status()
+    return info_resp.json()
+
+
 class AppConfig:
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, offline: bool = None, transport_config: TransportConfig = None,
+                 cache_config: CacheConfig = None):
+        """
+        Loads the configuration for a Cirro instance
+
+        The system info of the instance is cached in `CIRRO_HOME`, fresh entries are used without a network call
+        and stale entries are used immediately while being revalidated in the background.
+
+        Args:
+            base_url (str): Optional base URL of the Cirro instance
+             (if not provided, it uses the `CIRRO_BASE_URL` environment variable, or the config file)
+            offline (bool): Never fetch the system info from the network, requires a cached entry
+             (if not provided, it uses the `CIRRO_OFFLINE` environment variable)
+            transport_config (cirro.config.TransportConfig): Optional HTTP client settings for API calls
+             (if not provided, it uses the config file)
+            cache_config (cirro.config.CacheConfig): Optional metadata cache settings
+             (if not provided, it uses the config file)
+        """
         self.user_config = load_user_config()
         self.base_url = (base_url or
                          os.environ.get('CIRRO_BASE_URL') or
@@ -92,6 +296,12 @@ class AppConfig:
             if self.user_config else Constants.default_max_retries
         self.enable_additional_checksum = self.user_config.enable_additional_checksum\
             if self.user_config else False
+        self.transport_config = transport_config or \
+            (self.user_config.transport_config if self.user_config else None) or TransportConfig()
+        self.cache_config = cache_config or \
+            (self.user_config.cache_config if self.user_config else None) or CacheConfig()
+        self.offline = offline if offline is not None else _env_flag('CIRRO_OFFLINE')
+        self.system_info_ttl = _env_int('CIRRO_SYSTEM_INFO_TTL', Constants.default_system_info_ttl)
         self._init_config()
 
     @property
@@ -106,15 +316,43 @@ class AppConfig:
         self.rest_endpoint = f'https://{self.base_url}/api'
         self.auth_endpoint = f'https://{self.base_url}/api/auth'
 
+        cached = load_cached_system_info(self.base_url) if self.system_info_ttl > 0 or self.offline else None
+
+        if cached:
+            try:
+                self._apply_system_info(cached['info'])
+            except (KeyError, TypeError):
+                logger.debug(f'Ignoring incomplete system info cache for {self.base_url}')
+                cached = None
+
+        if cached:
+            is_stale = time.time() - cached['saved_at'] > self.system_info_ttl
+            if is_stale and not self.offline:
+                threading.Thread(target=self._revalidate_system_info, daemon=True).start()
+            return
+
+        if self.offline:
+            raise RuntimeError(f'No cached configuration for {self.base_url} is available in offline mode, '
+                               'please connect once without CIRRO_OFFLINE set')
+
         try:
-            info_resp = requests.get(f'{self.rest_endpoint}/info/system')
-            info_resp.raise_for_status()
-
-            info = info_resp.json()
-            self.client_id = info['auth']['sdkAppId']
-            self.user_pool_id = info['auth']['userPoolId']
-            self.references_bucket = info['referencesBucket']
-            self.resources_bucket = info['resourcesBucket']
-            self.region = info['region']
+            info = fetch_system_info(self.rest_endpoint)
         except RequestException:
             raise RuntimeError(f'Failed connecting to {self.base_url}, please check your configuration')
+
+        self._apply_system_info(info)
+        save_cached_system_info(self.base_url, info)
+
+    def _revalidate_system_info(self):
+        try:
+            info = fetch_system_info(self.rest_endpoint)
+            save_cached_system_info(self.base_url, info)
+        except (RequestException, ValueError):
+            logger.debug(f'Failed to revalidate system info for {self.base_url}')
+
+    def _apply_system_info(self, info: Dict):
+        self.client_id = info['auth']['sdkAppId']
+        self.user_pool_id = info['auth']['userPoolId']
+        self.references_bucket = info['referencesBucket']
+        self.resources_bucket = info['resourcesBucket']
+        self.region = info['region']
@@ -2,14 +2,15 @@ import base64
 import os
 import random
 import time
+from contextlib import nullcontext
 from pathlib import Path, PurePath
-from typing import List, Union, Dict
+from typing import List, Union, Dict, TYPE_CHECKING
 
-from boto3.exceptions import S3UploadFailedError
-from botocore.exceptions import ConnectionError
-
-from cirro.clients import S3Client
 from cirro.models.file import DirectoryStatistics, File, PathLike
+from cirro.utils import TransferLimiter
+
+if TYPE_CHECKING:
+    from cirro.clients import S3Client
 
 if os.name == 'nt':
     import win32api
@@ -124,10 +125,11 @@ def get_files_stats(files: List[PathLike]) -> DirectoryStatistics:
 def upload_directory(directory: PathLike,
                      files: List[PathLike],
                      file_path_map: Dict[PathLike, str],
-                     s3_client: S3Client,
+                     s3_client: 'S3Client',
                      bucket: str,
                      prefix: str,
-                     max_retries=10):
+                     max_retries=10,
+                     transfer_limiter: TransferLimiter = None):
     """
     @private
 
@@ -141,7 +143,12 @@ def upload_directory(directory: PathLike,
         bucket (str): S3 bucket
         prefix (str): S3 prefix
         max_retries (int): Number of retries
+        transfer_limiter (cirro.utils.TransferLimiter): Limit on the bytes uploaded at the same time,
+            shared with other uploads
     """
+    from boto3.exceptions import S3UploadFailedError
+    from botocore.exceptions import ConnectionError
+
     # Ensure all files are of the same type as the directory
     if not all(isinstance(file, type(directory)) for file in files):
         raise ValueError("All files must be of the same type as the directory (str or Path)")
@@ -167,11 +174,13 @@ def upload_directory(directory: PathLike,
 
             # Try the upload
             try:
-                s3_client.upload_file(
-                    file_path=file_path,
-                    bucket=bucket,
-                    key=key
-                )
+                reservation = transfer_limiter.reserve(file_path.stat().st_size) if transfer_limiter else nullcontext()
+                with reservation:
+                    s3_client.upload_file(
+                        file_path=file_path,
+                        bucket=bucket,
+                        key=key
+                    )
 
                 success = True
 
@@ -187,7 +196,7 @@ def upload_directory(directory: PathLike,
                 break
 
 
-def download_directory(directory: str, files: List[str], s3_client: S3Client, bucket: str, prefix: str):
+def download_directory(directory: str, files: List[str], s3_client: 'S3Client', bucket: str, prefix: str):
     """
     @private
     """
@@ -4,8 +4,6 @@ import os
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-import boto3
-
 if TYPE_CHECKING:
     from pandas import DataFrame
 
@@ -88,6 +86,7 @@ class PreprocessDataset:
         s3_path = S3Path(path)
 
         if s3_path.valid:
+            import boto3
             s3 = boto3.client('s3')
             retr = s3.get_object(Bucket=s3_path.bucket, Key=s3_path.key)
             text = retr['Body'].read().decode()
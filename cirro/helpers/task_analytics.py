@@ -0,0 +1,121 @@
+from typing import List, TYPE_CHECKING
+
+from cirro_api_client.v1.models import Task
+from cirro_api_client.v1.types import Unset
+
+if TYPE_CHECKING:
+    from pandas import DataFrame, Series
+
+_TIMESTAMP_COLUMNS = ['requested_at', 'started_at', 'stopped_at']
+_TASK_COLUMNS = ['name', 'native_job_id', 'status', *_TIMESTAMP_COLUMNS,
+                 'container_image', 'command_line', 'log_location']
+# Nextflow task names are the process name followed by the tag of the task in brackets
+_TASK_NAME_PATTERN = r'^(?P<process>.*?)(?: \((?P<tag>.*)\))?$'
+
+
+def tasks_to_dataframe(tasks: List[Task]) -> 'DataFrame':
+    """
+    Converts the tasks of an execution to a table, with one row per task.
+
+    Besides the fields of the task, it has the columns:
+
+    - `process` and `tag`: parsed from the task name (e.g. `ALIGN (sample1)`)
+    - `queue_wait`: seconds between the task being requested and started
+    - `duration`: seconds between the task being started and stopped
+
+    Timestamps are parsed to (UTC) datetimes, missing values are `NaT` / `NaN`.
+    Any other fields returned by the API (e.g. `cpus`, `memory`) are included as extra columns.
+    Use `DataFrame.to_parquet` to save it in a columnar (Arrow) format.
+
+    Args:
+        tasks (List[cirro_api_client.v1.models.Task]): Tasks of an execution,
+         see `cirro.services.ExecutionService.get_tasks_for_execution`
+    """
+    import pandas as pd
+
+    columns = {column: [] for column in _TASK_COLUMNS}
+    for task in tasks:
+        for column in _TASK_COLUMNS:
+            value = getattr(task, column)
+            columns[column].append(None if isinstance(value, Unset) else value)
+    df = pd.DataFrame(columns)
+
+    extra = pd.DataFrame.from_records([task.additional_properties for task in tasks], index=df.index)
+    if not extra.empty:
+        df = df.join(extra[[column for column in extra.columns if column not in columns]])
+    for column in _TIMESTAMP_COLUMNS:
+        df[column] = pd.to_datetime(df[column], utc=True)
+
+    names = df['name'].astype('string').str.extract(_TASK_NAME_PATTERN)
+    df.insert(1, 'process', names['process'])
+    df.insert(2, 'tag', names['tag'])
+    df['queue_wait'] = (df['started_at'] - df['requested_at']).dt.total_seconds()
+    df['duration'] = (df['stopped_at'] - df['started_at']).dt.total_seconds()
+    return df
+
+
+def summarize_by_process(df: 'DataFrame') -> 'DataFrame':
+    """
+    Totals for each process of an execution, sorted by the total time its tasks ran for
+
+    Columns are the number of `tasks` and `failed` tasks, `total_hours` of task run time,
+    `mean_duration` and `max_duration` of the tasks, `mean_queue_wait` and `max_queue_wait` (seconds),
+    and `cpu_hours` if the tasks have a `cpus` column.
+
+    Args:
+        df (DataFrame): Tasks table, see `tasks_to_dataframe`
+    """
+    df = df.assign(
+        failed=df['status'].astype(str).str.upper() == 'FAILED',
+        hours=df['duration'] / 3600
+    )
+    aggregations = dict(
+        tasks=('name', 'size'),
+        failed=('failed', 'sum'),
+        total_hours=('hours', 'sum'),
+        mean_duration=('duration', 'mean'),
+        max_duration=('duration', 'max'),
+        mean_queue_wait=('queue_wait', 'mean'),
+        max_queue_wait=('queue_wait', 'max')
+    )
+    if 'cpus' in df.columns:
+        df['cpu_hours'] = df['hours'] * df['cpus'].astype(float)
+        aggregations['cpu_hours'] = ('cpu_hours', 'sum')
+
+    return (
+        df.groupby('process', dropna=False)
+        .agg(**aggregations)
+        .sort_values('total_hours', ascending=False)
+    )
+
+
+def queue_wait_statistics(df: 'DataFrame') -> 'Series':
+    """
+    Statistics of the time tasks waited to be started (in seconds):
+    `count`, `mean`, `median`, `p90`, `p99` and `max`
+
+    Args:
+        df (DataFrame): Tasks table, see `tasks_to_dataframe`
+    """
+    import pandas as pd
+
+    wait = df['queue_wait'].dropna()
+    return pd.Series({
+        'count': len(wait),
+        'mean': wait.mean(),
+        'median': wait.median(),
+        'p90': wait.quantile(0.9),
+        'p99': wait.quantile(0.99),
+        'max': wait.max()
+    })
+
+
+def longest_tasks(df: 'DataFrame', n=10) -> 'DataFrame':
+    """
+    The tasks which ran for the longest time
+
+    Args:
+        df (DataFrame): Tasks table, see `tasks_to_dataframe`
+        n (int): Number of tasks
+    """
+    return df.nlargest(n, 'duration')[['name', 'process', 'status', 'queue_wait', 'duration', 'native_job_id']]
@@ -0,0 +1,12 @@
+from cirro.instrumentation.base import InstrumentationHook, ApiCallEvent, S3OperationEvent, HookDispatcher
+from cirro.instrumentation.metrics import MetricsHook
+from cirro.instrumentation.otel import OpenTelemetryHook
+
+__all__ = [
+    'InstrumentationHook',
+    'ApiCallEvent',
+    'S3OperationEvent',
+    'HookDispatcher',
+    'MetricsHook',
+    'OpenTelemetryHook'
+]
@@ -0,0 +1,130 @@
+import logging
+import re
+import threading
+from abc import ABC
+from typing import List, Optional
+
+from attrs import define
+
+logger = logging.getLogger(__name__)
+
+_ID_SEGMENT = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+
+def normalize_endpoint(path: str) -> str:
+    """
+    Replaces IDs in a URL path with a placeholder so that calls to the same endpoint can be grouped,
+    e.g. `/api/projects/8b6e.../datasets` becomes `/api/projects/{id}/datasets`
+    """
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+@define
+class ApiCallEvent:
+    """
+    A call to the Cirro REST API
+    """
+    method: str
+    path: str
+    endpoint: str
+    " Path with IDs replaced by a placeholder"
+    start_time: float
+    " Start time, in seconds since the epoch"
+    status_code: Optional[int] = None
+    duration: Optional[float] = None
+    " Duration in seconds, until the response body was read"
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    error: Optional[BaseException] = None
+
+    @property
+    def name(self) -> str:
+        return f'{self.method} {self.endpoint}'
+
+
+@define
+class S3OperationEvent:
+    """
+    An operation performed against S3 (a part of a multipart transfer is an individual operation)
+    """
+    operation: str
+    bucket: Optional[str]
+    key: Optional[str]
+    start_time: float
+    " Start time, in seconds since the epoch"
+    duration: Optional[float] = None
+    " Duration in seconds, for a download until its body was read"
+    time_to_first_byte: Optional[float] = None
+    " Seconds until the response was received (before the body of a download was read)"
+    bytes: int = 0
+    " Bytes uploaded or downloaded"
+    retries: int = 0
+    status_code: Optional[int] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def name(self) -> str:
+        return self.operation
+
+
+class InstrumentationHook(ABC):
+    """
+    Receives events for every REST API call and S3 operation made by a `cirro.cirro_client.CirroApi` client.
+
+    Override the methods you are interested in, and register the hook with `CirroApi.add_hook`.
+    Hooks are called from the thread making the request, so they must be thread-safe and fast.
+    """
+    def on_api_call_start(self, event: ApiCallEvent):
+        pass
+
+    def on_api_call_end(self, event: ApiCallEvent):
+        pass
+
+    def on_s3_operation_start(self, event: S3OperationEvent):
+        pass
+
+    def on_s3_operation_end(self, event: S3OperationEvent):
+        pass
+
+
+class HookDispatcher(InstrumentationHook):
+    """
+    Forwards events to all registered hooks, errors raised by a hook are logged and ignored
+    """
+    def __init__(self):
+        self._hooks: List[InstrumentationHook] = []
+        self._lock = threading.Lock()
+
+    @property
+    def hooks(self) -> List[InstrumentationHook]:
+        return list(self._hooks)
+
+    def add(self, hook: InstrumentationHook):
+        with self._lock:
+            self._hooks = [*self._hooks, hook]
+
+    def remove(self, hook: InstrumentationHook):
+        with self._lock:
+            self._hooks = [h for h in self._hooks if h is not hook]
+
+    def __bool__(self):
+        return len(self._hooks) > 0
+
+    def _dispatch(self, method_name: str, event):
+        for hook in self._hooks:
+            try:
+                getattr(hook, method_name)(event)
+            except Exception as e:
+                logger.warning(f'Instrumentation hook {hook.__class__.__name__} failed: {e}')
+
+    def on_api_call_start(self, event: ApiCallEvent):
+        self._dispatch('on_api_call_start', event)
+
+    def on_api_call_end(self, event: ApiCallEvent):
+        self._dispatch('on_api_call_end', event)
+
+    def on_s3_operation_start(self, event: S3OperationEvent):
+        self._dispatch('on_s3_operation_start', event)
+
+    def on_s3_operation_end(self, event: S3OperationEvent):
+        self._dispatch('on_s3_operation_end', event)
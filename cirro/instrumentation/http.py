@@ -0,0 +1,139 @@
+import time
+from typing import Callable, Iterator, AsyncIterator
+
+import httpx
+
+from cirro.instrumentation.base import HookDispatcher, ApiCallEvent, normalize_endpoint
+
+
+class _InstrumentedStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, on_close: Callable[[int], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._bytes = 0
+        self._closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._stream:
+            self._bytes += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close(self._bytes)
+
+
+class _InstrumentedAsyncStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[int], None]):
+        self._stream = stream
+        self._on_close = on_close
+        self._bytes = 0
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._bytes += len(chunk)
+            yield chunk
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close(self._bytes)
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """
+    HTTP transport which reports every request made through it to the instrumentation hooks
+
+    The same instance can be given to `httpx.Client` and `httpx.AsyncClient`,
+    async requests are sent through an `httpx.AsyncHTTPTransport` with the same settings.
+    """
+    def __init__(self, dispatcher: HookDispatcher, **kwargs):
+        super().__init__(**kwargs)
+        self._dispatcher = dispatcher
+        self._transport_kwargs = kwargs
+        self._async_transport = None
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self._dispatcher:
+            return super().handle_request(request)
+
+        event, on_close = self._start(request)
+        try:
+            response = super().handle_request(request)
+        except Exception as e:
+            event.error = e
+            on_close(0)
+            raise
+
+        event.status_code = response.status_code
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_InstrumentedStream(response.stream, on_close),
+            extensions=response.extensions
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._async_transport is None:
+            self._async_transport = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+        if not self._dispatcher:
+            return await self._async_transport.handle_async_request(request)
+
+        event, on_close = self._start(request)
+        try:
+            response = await self._async_transport.handle_async_request(request)
+        except Exception as e:
+            event.error = e
+            on_close(0)
+            raise
+
+        event.status_code = response.status_code
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_InstrumentedAsyncStream(response.stream, on_close),
+            extensions=response.extensions
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._async_transport is not None:
+            await self._async_transport.aclose()
+
+    def _start(self, request: httpx.Request):
+        event = ApiCallEvent(
+            method=request.method,
+            path=request.url.path,
+            endpoint=normalize_endpoint(request.url.path),
+            start_time=time.time(),
+            bytes_sent=int(request.headers.get('Content-Length') or 0)
+        )
+        self._dispatcher.on_api_call_start(event)
+        start = time.perf_counter()
+
+        # The call ends once the response body has been read, or the request failed
+        def on_close(bytes_received: int):
+            event.bytes_received = bytes_received
+            event.duration = time.perf_counter() - start
+            self._dispatcher.on_api_call_end(event)
+
+        return event, on_close
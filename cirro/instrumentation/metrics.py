@@ -0,0 +1,99 @@
+import statistics
+import threading
+from collections import deque
+from typing import Dict, Deque
+
+from cirro.instrumentation.base import InstrumentationHook, ApiCallEvent, S3OperationEvent
+
+
+class _OperationStats:
+    def __init__(self, max_samples: int):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.retries = 0
+        self.total_duration = 0.0
+        self.durations: Deque[float] = deque(maxlen=max_samples)
+
+    def record(self, duration: float, num_bytes: int, is_error: bool, retries: int = 0):
+        self.count += 1
+        self.errors += int(is_error)
+        self.bytes += num_bytes
+        self.retries += retries
+        self.total_duration += duration
+        self.durations.append(duration)
+
+    def summary(self) -> Dict:
+        durations = sorted(self.durations)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'bytes': self.bytes,
+            'retries': self.retries,
+            'mean_ms': self.total_duration / self.count * 1000 if self.count else 0,
+            'p50_ms': statistics.median(durations) * 1000 if durations else 0,
+            'p99_ms': _percentile(durations, 0.99) * 1000,
+            'max_ms': durations[-1] * 1000 if durations else 0
+        }
+
+
+def _percentile(sorted_values, percentile: float) -> float:
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(percentile * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class MetricsHook(InstrumentationHook):
+    """
+    Aggregates latency, throughput and error counts in memory, per API endpoint and S3 operation
+
+    ```python
+    from cirro import CirroApi
+    from cirro.instrumentation import MetricsHook
+
+    cirro = CirroApi()
+    metrics = MetricsHook()
+    cirro.add_hook(metrics)
+
+    cirro.datasets.download_files(...)
+    print(metrics.summary())
+    ```
+    """
+    def __init__(self, max_samples: int = 10000):
+        """
+        Args:
+            max_samples (int): Number of most recent durations kept per endpoint to compute percentiles
+        """
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+        self._api_stats: Dict[str, _OperationStats] = {}
+        self._s3_stats: Dict[str, _OperationStats] = {}
+
+    def on_api_call_end(self, event: ApiCallEvent):
+        is_error = event.error is not None or (event.status_code or 0) >= 400
+        with self._lock:
+            stats = self._api_stats.setdefault(event.name, _OperationStats(self._max_samples))
+            stats.record(event.duration or 0, event.bytes_received + event.bytes_sent, is_error)
+
+    def on_s3_operation_end(self, event: S3OperationEvent):
+        is_error = event.error is not None or (event.status_code or 0) >= 400
+        with self._lock:
+            stats = self._s3_stats.setdefault(event.name, _OperationStats(self._max_samples))
+            stats.record(event.duration or 0, event.bytes, is_error, event.retries)
+
+    def summary(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        Returns the count, errors, bytes, retries and mean/p50/p99/max latency
+        of each API endpoint (`api`) and S3 operation (`s3`)
+        """
+        with self._lock:
+            return {
+                'api': {name: stats.summary() for name, stats in self._api_stats.items()},
+                's3': {name: stats.summary() for name, stats in self._s3_stats.items()}
+            }
+
+    def reset(self):
+        with self._lock:
+            self._api_stats.clear()
+            self._s3_stats.clear()
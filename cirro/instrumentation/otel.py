@@ -0,0 +1,62 @@
+from typing import Union
+
+from cirro.instrumentation.base import InstrumentationHook, ApiCallEvent, S3OperationEvent
+
+
+class OpenTelemetryHook(InstrumentationHook):
+    """
+    Exports each API call and S3 operation as an OpenTelemetry span.
+
+    Requires the `opentelemetry-api` package, spans are sent to whichever tracer provider is configured.
+
+    ```python
+    from cirro import CirroApi
+    from cirro.instrumentation import OpenTelemetryHook
+
+    cirro = CirroApi()
+    cirro.add_hook(OpenTelemetryHook())
+    ```
+    """
+    def __init__(self, tracer=None):
+        """
+        Args:
+            tracer (opentelemetry.trace.Tracer): Optional tracer, by default it uses the global tracer provider
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise RuntimeError('OpenTelemetryHook requires the opentelemetry-api package, '
+                               'install it with pip install opentelemetry-api')
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer('cirro')
+
+    def on_api_call_end(self, event: ApiCallEvent):
+        self._export(f'cirro.api {event.name}', event, {
+            'http.request.method': event.method,
+            'url.path': event.path,
+            'http.route': event.endpoint,
+            'http.response.status_code': event.status_code or 0,
+            'http.request.body.size': event.bytes_sent,
+            'http.response.body.size': event.bytes_received
+        })
+
+    def on_s3_operation_end(self, event: S3OperationEvent):
+        self._export(f'cirro.s3 {event.name}', event, {
+            'rpc.system': 'aws-api',
+            'rpc.service': 'S3',
+            'rpc.method': event.operation,
+            'aws.s3.bucket': event.bucket or '',
+            'aws.s3.key': event.key or '',
+            'cirro.s3.bytes': event.bytes,
+            'cirro.s3.retries': event.retries,
+            'cirro.s3.time_to_first_byte': event.time_to_first_byte or 0,
+            'http.response.status_code': event.status_code or 0
+        })
+
+    def _export(self, name: str, event: Union[ApiCallEvent, S3OperationEvent], attributes: dict):
+        start_ns = int(event.start_time * 1e9)
+        span = self._tracer.start_span(name, start_time=start_ns, attributes=attributes)
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(event.error)))
+        span.end(end_time=start_ns + int((event.duration or 0) * 1e9))
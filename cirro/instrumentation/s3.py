@@ -0,0 +1,142 @@
+import time
+from typing import Callable, Optional
+
+from botocore.response import StreamingBody
+
+from cirro.instrumentation.base import HookDispatcher, S3OperationEvent
+
+_EVENT_KEY = 'cirro_instrumentation_event'
+_START_KEY = 'cirro_instrumentation_start'
+
+
+def _get_body_size(params: dict) -> int:
+    if params.get('ContentLength'):
+        return int(params['ContentLength'])
+    body = params.get('Body')
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    # botocore wraps bytes in a file object, and s3transfer passes each part as a file chunk
+    if hasattr(body, '__len__'):
+        return len(body)
+    if hasattr(body, 'seek') and hasattr(body, 'tell'):
+        try:
+            position = body.tell()
+            size = body.seek(0, 2) - position
+            body.seek(position)
+            return size
+        except (OSError, ValueError):
+            return 0
+    return 0
+
+
+class _TimedStreamingBody(StreamingBody):
+    """
+    Wraps the body of a download, so that the operation ends once the body has been read (or closed)
+    rather than when the response headers are received
+    """
+    def __init__(self, body: StreamingBody, content_length: Optional[int],
+                 on_done: Callable[[int, Optional[BaseException]], None]):
+        # The wrapped body is used as the raw stream, it verifies the content length itself
+        super().__init__(body, None)
+        self._expected_length = content_length
+        self._on_done = on_done
+        self._done = False
+
+    def _finish(self, error: Optional[BaseException] = None):
+        if not self._done:
+            self._done = True
+            self._on_done(self._amount_read, error)
+
+    def read(self, amt=None):
+        try:
+            chunk = super().read(amt)
+        except Exception as e:
+            self._finish(e)
+            raise
+        if amt is None or not chunk or \
+                (self._expected_length is not None and self._amount_read >= self._expected_length):
+            self._finish()
+        return chunk
+
+    def readinto(self, b):
+        try:
+            amount_read = super().readinto(b)
+        except Exception as e:
+            self._finish(e)
+            raise
+        if amount_read == 0 or (self._expected_length is not None and self._amount_read >= self._expected_length):
+            self._finish()
+        return amount_read
+
+    def set_socket_timeout(self, timeout):
+        self._raw_stream.set_socket_timeout(timeout)
+
+    def __enter__(self):
+        return self
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # A body which is never read nor closed is reported when it is garbage collected
+        self._finish()
+
+
+def register_s3_instrumentation(s3_client, dispatcher: HookDispatcher):
+    """
+    Registers handlers on a boto3 S3 client so that each operation is reported to the instrumentation hooks
+    """
+    # Parameters are read before they are serialized, the context is shared by all events of a call
+    def before_call(params, model, context, **kwargs):
+        if not dispatcher:
+            return
+        event = S3OperationEvent(
+            operation=model.name,
+            bucket=params.get('Bucket'),
+            key=params.get('Key'),
+            start_time=time.time(),
+            bytes=_get_body_size(params)
+        )
+        context[_EVENT_KEY] = event
+        context[_START_KEY] = time.perf_counter()
+        dispatcher.on_s3_operation_start(event)
+
+    def after_call(http_response, parsed, context, **kwargs):
+        event: S3OperationEvent = context.pop(_EVENT_KEY, None)
+        if event is None:
+            return
+        start = context.pop(_START_KEY)
+        event.time_to_first_byte = time.perf_counter() - start
+        event.duration = event.time_to_first_byte
+        event.status_code = http_response.status_code if http_response is not None else None
+        metadata = parsed.get('ResponseMetadata', {}) if isinstance(parsed, dict) else {}
+        event.retries = metadata.get('RetryAttempts', 0)
+
+        # The body of a download is streamed after this event, it is timed as the caller reads it
+        body = parsed.get('Body') if isinstance(parsed, dict) else None
+        if event.operation == 'GetObject' and isinstance(body, StreamingBody):
+            def on_body_read(bytes_read: int, error: Optional[BaseException]):
+                event.duration = time.perf_counter() - start
+                event.bytes = bytes_read
+                event.error = error
+                dispatcher.on_s3_operation_end(event)
+
+            parsed['Body'] = _TimedStreamingBody(body, parsed.get('ContentLength'), on_body_read)
+            return
+        if event.operation == 'GetObject' and isinstance(parsed, dict):
+            event.bytes = parsed.get('ContentLength') or 0
+        dispatcher.on_s3_operation_end(event)
+
+    def after_call_error(exception, context, **kwargs):
+        event: S3OperationEvent = context.pop(_EVENT_KEY, None)
+        if event is None:
+            return
+        event.duration = time.perf_counter() - context.pop(_START_KEY)
+        event.error = exception
+        dispatcher.on_s3_operation_end(event)
+
+    events = s3_client.meta.events
+    events.register('before-parameter-build.s3', before_call)
+    events.register('after-call.s3', after_call)
+    events.register('after-call-error.s3', after_call_error)
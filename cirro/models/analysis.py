@@ -0,0 +1,61 @@
+from pathlib import Path
+from typing import Optional
+
+from attrs import define
+from cirro_api_client.v1.models import RunAnalysisRequest, Status, Task
+
+TERMINAL_STATUSES = {Status.COMPLETED, Status.FAILED, Status.ARCHIVED, Status.DELETE, Status.DELETING, Status.DELETED}
+""" Statuses of a dataset after which its analysis is no longer running """
+
+
+@define
+class AnalysisSubmission:
+    """
+    Outcome of submitting one analysis of a batch, see `cirro.services.ExecutionService.run_analyses`
+    """
+    request: Optional[RunAnalysisRequest]
+    " Request of the analysis, None if it could not be built (e.g. its name or parameters raised an error)"
+    dataset_id: Optional[str] = None
+    " ID of the newly created dataset, if the analysis was submitted"
+    error: Optional[Exception] = None
+    " Reason the analysis was not submitted (invalid request or parameters, or an error returned by the API)"
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+@define
+class ExecutionStatusChange:
+    """
+    Change of status of an analysis execution, see `cirro.services.execution_watcher.ExecutionWatcher`
+    """
+    project_id: str
+    dataset_id: str
+    previous_status: Optional[Status]
+    " Status before the change, None when the execution is first checked"
+    status: Status
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+
+@define
+class TaskLogs:
+    """
+    Logs of a task of an analysis, see `cirro.services.ExecutionService.collect_task_logs`
+    """
+    task: Task
+    logs: Optional[str] = None
+    " Log output of the task, unless it was written to a file"
+    path: Optional[Path] = None
+    " File the log output was written to"
+    elapsed: float = 0
+    " Seconds taken to fetch the logs"
+    error: Optional[Exception] = None
+    " Reason the logs could not be fetched"
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
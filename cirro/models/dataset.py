@@ -1,24 +1,56 @@
-from attrs import define as _attrs_define
+from enum import Enum
+from typing import Optional, List
+
+import attrs
 from cirro_api_client.v1.models import Share, Dataset
 
 
-@_attrs_define
+# Fields of a dataset set by its constructor (additional_properties is assigned afterward)
+_DATASET_FIELDS = [f for f in attrs.fields(Dataset) if f.init]
+
+
+@attrs.define
 class DatasetWithShare(Dataset):
-    share: Share
+    """
+    Dataset along with the share it was received from (if any)
+    """
+    share: Optional[Share]
 
     @classmethod
-    def from_dataset(cls, dataset: Dataset, share: Share) -> 'DatasetWithShare':
-        return cls(
-            id=dataset.id,
-            name=dataset.name,
-            description=dataset.description,
-            project_id=dataset.project_id,
-            process_id=dataset.process_id,
-            source_dataset_ids=dataset.source_dataset_ids,
-            status=dataset.status,
-            tags=dataset.tags,
-            created_by=dataset.created_by,
-            created_at=dataset.created_at,
-            updated_at=dataset.updated_at,
-            share=share
-        )
+    def from_dataset(cls, dataset: Dataset, share: Optional[Share]) -> 'DatasetWithShare':
+        with_share = cls(**{f.name: getattr(dataset, f.name) for f in _DATASET_FIELDS}, share=share)
+        with_share.additional_properties = dict(dataset.additional_properties)
+        return with_share
+
+
+class DatasetUploadStatus(Enum):
+    PENDING = 'PENDING'
+    CREATED = 'CREATED'
+    " The dataset was created, but its files are not all uploaded"
+    UPLOADED = 'UPLOADED'
+    FAILED = 'FAILED'
+
+
+@attrs.define
+class DatasetUpload:
+    """
+    A dataset to create from a directory of files, see `cirro.services.batch_upload.BatchUploader`
+    """
+    name: str
+    directory: str
+    " Directory containing the files of the dataset"
+    description: str = ''
+    process: Optional[str] = None
+    " Name or ID of the ingest process, if different from the default process of the batch"
+    tags: List[str] = attrs.field(factory=list)
+    files: Optional[List[str]] = None
+    " Files to upload, relative to the directory (default: all the files in the directory)"
+    dataset_id: Optional[str] = None
+    " ID of the dataset, once created"
+    status: DatasetUploadStatus = DatasetUploadStatus.PENDING
+    error: Optional[Exception] = None
+    " Reason the dataset was not uploaded"
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == DatasetUploadStatus.UPLOADED
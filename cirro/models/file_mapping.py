@@ -0,0 +1,126 @@
+import logging
+import re
+from typing import Dict, List, Match, Optional, Pattern
+
+from attrs import define, field
+from cirro_api_client.v1.models import FileMappingRule
+from cirro_api_client.v1.types import Unset
+
+logger = logging.getLogger(__name__)
+
+# The patterns use the JavaScript syntax for named groups, (?<name>...)
+_NAMED_GROUP = re.compile(r'\(\?<(?![=!])')
+
+
+@define
+class FileMappingReport:
+    """
+    Outcome of checking a list of files against the file mapping rules of a process,
+    see `FileMappingValidator`
+    """
+    files_by_rule: Dict[str, List[str]] = field(factory=dict)
+    " Files matched by each rule, by the rule's description"
+    samples: Dict[str, List[str]] = field(factory=dict)
+    " Files of each sample, by the sample name inferred from the file name"
+    unmatched_files: List[str] = field(factory=list)
+    " Files which do not match any rule"
+    errors: List[str] = field(factory=list)
+    " Rules which are not met by the files (e.g. too few or too many files)"
+    unchecked_rules: List[str] = field(factory=list)
+    " Rules whose patterns could not be checked locally, they are only checked by the server"
+
+    @property
+    def valid(self) -> bool:
+        return len(self.errors) == 0
+
+
+@define
+class _CompiledRule:
+    rule: FileMappingRule
+    patterns: List[Pattern]
+    checkable: bool
+
+
+class FileMappingValidator:
+    """
+    Checks file names against the file mapping rules of a process without calling the server.
+
+    The rules are compiled once, so the validator can be re-used to check the files again after fixing them.
+    The server remains the final authority on whether a dataset is valid
+    (e.g. it also checks the sample sheet), the report is an early indication of problems
+    which may differ from the server's in edge cases.
+
+    ```python
+    validator = cirro.processes.get_file_mapping_validator("process-id")
+    report = validator.validate(files)
+    print(report.unmatched_files, list(report.samples))
+    ```
+    """
+    def __init__(self, rules: Optional[List[FileMappingRule]]):
+        """
+        Args:
+            rules (List[cirro_api_client.v1.models.FileMappingRule]): File mapping rules of the process
+        """
+        self._rules = [self._compile(rule) for rule in (rules or [])]
+
+    @staticmethod
+    def _compile(rule: FileMappingRule) -> _CompiledRule:
+        patterns = []
+        for file_name_pattern in rule.file_name_patterns:
+            try:
+                patterns.append(re.compile(_NAMED_GROUP.sub('(?P<', file_name_pattern.sample_matching_pattern)))
+            except re.error as e:
+                logger.debug(f"Cannot check the pattern {file_name_pattern.sample_matching_pattern} locally: {e}")
+                return _CompiledRule(rule=rule, patterns=[], checkable=False)
+        return _CompiledRule(rule=rule, patterns=patterns, checkable=True)
+
+    def validate(self, files: List[str]) -> FileMappingReport:
+        """
+        Matches each file against the rules, in a single pass over the files
+
+        Args:
+            files (List[str]): Relative paths of the files
+        """
+        report = FileMappingReport(
+            files_by_rule={compiled.rule.description: [] for compiled in self._rules if compiled.checkable},
+            unchecked_rules=[compiled.rule.description for compiled in self._rules if not compiled.checkable]
+        )
+        checkable = [compiled for compiled in self._rules if compiled.checkable]
+
+        for file in files:
+            # A file counts toward every rule it matches, as rules may overlap
+            sample_name = None
+            matched = False
+            for compiled in checkable:
+                match = self._match(file.replace('\\', '/'), compiled)
+                if match is None:
+                    continue
+                matched = True
+                report.files_by_rule[compiled.rule.description].append(file)
+                if sample_name is None and compiled.rule.is_sample is not False:
+                    sample_name = match.groupdict().get('sampleName')
+            if not matched:
+                report.unmatched_files.append(file)
+            elif sample_name is not None:
+                report.samples.setdefault(sample_name, []).append(file)
+
+        for compiled in checkable:
+            rule = compiled.rule
+            count = len(report.files_by_rule[rule.description])
+            min_files = rule.min_ if not isinstance(rule.min_, Unset) else None
+            max_files = rule.max_ if not isinstance(rule.max_, Unset) else None
+            examples = ', '.join(pattern.example_name for pattern in rule.file_name_patterns)
+            if min_files is not None and count < min_files:
+                report.errors.append(f"{rule.description}: expected at least {min_files} file(s), found {count}. "
+                                     f"We accept any of the following naming conventions: {examples}")
+            elif max_files is not None and count > max_files:
+                report.errors.append(f"{rule.description}: expected at most {max_files} file(s), found {count}")
+        return report
+
+    @staticmethod
+    def _match(file: str, compiled: _CompiledRule) -> Optional[Match]:
+        for pattern in compiled.patterns:
+            match = pattern.fullmatch(file)
+            if match is not None:
+                return match
+        return None
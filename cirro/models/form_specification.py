@@ -1,8 +1,10 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, TYPE_CHECKING
 
-import jsonschema
 from cirro_api_client.v1.models import FormSchema
 
+if TYPE_CHECKING:
+    from jsonschema.protocols import Validator
+
 
 def _get_fields_in_schema(schema: Dict, parent_path='') -> List['Parameter']:
     # This breaks for more advanced json schema usages such as the if/then
@@ -27,6 +29,7 @@ class ParameterSpecification:
         self._form_spec_raw: Dict = form_schema.form.additional_properties
         self._form_spec_ui: Dict = form_schema.ui.additional_properties
         self.form_spec = _get_fields_in_schema(self._form_spec_raw.get('properties') or {})
+        self._validator = None
 
     @property
     def form_spec_json(self) -> dict:
@@ -35,14 +38,50 @@ class ParameterSpecification:
         """
         return self._form_spec_raw
 
+    @property
+    def validator(self) -> 'Validator':
+        """
+        JSON schema validator of the parameters, the schema is checked once and the validator re-used
+        """
+        if self._validator is None:
+            from jsonschema.validators import validator_for
+
+            validator_cls = validator_for(self._form_spec_raw)
+            validator_cls.check_schema(self._form_spec_raw)
+            self._validator = validator_cls(self._form_spec_raw)
+        return self._validator
+
     def validate_params(self, params: Dict):
         """
         Validates that the given parameters conforms to the specification
         """
-        try:
-            jsonschema.validate(instance=params, schema=self._form_spec_raw)
-        except jsonschema.ValidationError as e:
-            raise RuntimeError(f'Parameter at {e.json_path} error: {e.message}') from e
+        from jsonschema.exceptions import best_match
+
+        error = best_match(self.validator.iter_errors(params))
+        if error is not None:
+            raise RuntimeError(f'Parameter at {error.json_path} error: {error.message}') from error
+
+    def get_errors(self, params: Dict) -> List[str]:
+        """
+        Lists every way in which the parameters do not conform to the specification
+        """
+        return [
+            f'Parameter at {error.json_path} error: {error.message}'
+            for error in self.validator.iter_errors(params)
+        ]
+
+    def validate_many(self, params_list: List[Dict]):
+        """
+        Validates several sets of parameters, reporting the errors of all of them at once
+
+        Args:
+            params_list (List[Dict]): Sets of parameters, errors are reported by their position in the list
+        """
+        errors_by_index = {i: self.get_errors(params) for i, params in enumerate(params_list)}
+        errors = [f'[{i}] {error}' for i, index_errors in errors_by_index.items() for error in index_errors]
+        if errors:
+            invalid = sum(1 for index_errors in errors_by_index.values() if index_errors)
+            raise RuntimeError(f'{invalid} of {len(params_list)} sets of parameters are invalid:\n' + '\n'.join(errors))
 
     def print(self):
         """
@@ -0,0 +1,26 @@
+from typing import Any, Dict, Optional
+
+from attrs import define, field
+from cirro_api_client.v1.models import Sample
+
+
+@define
+class SampleUpdate:
+    """
+    Outcome of updating the metadata of one sample, see `cirro.services.MetadataService.update_samples`
+    """
+    name: str
+    " Name of the sample (or its ID if the sample could not be found)"
+    metadata: Dict[str, Any] = field(factory=dict)
+    " Metadata values requested for the sample"
+    sample_id: Optional[str] = None
+    changed: bool = False
+    " Whether the metadata of the sample differed from the requested values (unchanged samples are not sent)"
+    sample: Optional[Sample] = None
+    " Sample returned once it was updated"
+    error: Optional[Exception] = None
+    " Reason the sample was not updated"
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
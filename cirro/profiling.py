@@ -0,0 +1,155 @@
+"""
+Profiling of CLI commands, enabled with `cirro --profile` or the `CIRRO_PROFILE` environment variable.
+
+The code being profiled marks its phases with `profile_phase`, which does nothing unless a profile is running.
+"""
+import io
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from cirro.instrumentation import MetricsHook
+
+_active_profiler: Optional['Profiler'] = None
+
+
+class Profiler:
+    """
+    Captures a cProfile of the main thread, the time spent in each phase of a command,
+    and the API calls and S3 operations made, then writes them to a text report
+    """
+    def __init__(self, output_path: Path, command: List[str] = None):
+        self.output_path = output_path
+        self.command = command if command is not None else sys.argv
+        self._phases: Dict[str, List[float]] = {}
+        self._stack = threading.local()
+        self._lock = threading.Lock()
+        self._metrics = None
+        self._profile = None
+        self._start_time = None
+        self._started_at = None
+
+    @property
+    def metrics(self) -> 'MetricsHook':
+        """
+        Instrumentation hook which records the API calls and S3 operations of the command
+        """
+        if self._metrics is None:
+            from cirro.instrumentation import MetricsHook
+            self._metrics = MetricsHook()
+        return self._metrics
+
+    def start(self):
+        global _active_profiler
+        import cProfile
+        _active_profiler = self
+        self._started_at = datetime.now()
+        self._start_time = time.perf_counter()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> Path:
+        """
+        Stops profiling and writes the report, returns its path
+        """
+        global _active_profiler
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._start_time
+        if _active_profiler is self:
+            _active_profiler = None
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.output_path.write_text(self._format_report(elapsed))
+        return self.output_path
+
+    @contextmanager
+    def phase(self, name: str):
+        # Nested phases are recorded under their parent, e.g. "transfer > manifest listing"
+        stack = getattr(self._stack, 'names', None)
+        if stack is None:
+            stack = self._stack.names = []
+        stack.append(name)
+        key = ' > '.join(stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            with self._lock:
+                self._phases.setdefault(key, []).append(duration)
+
+    def _format_report(self, elapsed: float) -> str:
+        import pstats
+        from importlib.metadata import version, PackageNotFoundError
+
+        try:
+            cirro_version = version('cirro')
+        except PackageNotFoundError:
+            cirro_version = 'unknown'
+
+        lines = [
+            'Cirro CLI profile',
+            '=================',
+            f'Command:  {" ".join(["cirro", *self.command[1:]])}',
+            f'Started:  {self._started_at.isoformat(timespec="seconds")}',
+            f'Duration: {elapsed:.3f}s',
+            f'Version:  cirro {cirro_version}, Python {platform.python_version()}, {platform.platform()}',
+            '',
+            'Phases',
+            '------',
+        ]
+        with self._lock:
+            phases = dict(self._phases)
+        top_level_total = sum(sum(durations) for key, durations in phases.items() if ' > ' not in key)
+        for key, durations in phases.items():
+            lines.append(f'{key:<50} {sum(durations):9.3f}s  {len(durations):4d} call(s)')
+        lines.append(f'{"(outside of phases)":<50} {max(0.0, elapsed - top_level_total):9.3f}s')
+
+        if self._metrics is not None:
+            summary = self._metrics.summary()
+            for title, operations in [('API calls', summary['api']), ('S3 operations', summary['s3'])]:
+                lines += ['', title, '-' * len(title)]
+                for name, stats in sorted(operations.items(), key=lambda item: -item[1]['count']):
+                    lines.append(f'{name:<50} {stats["count"]:6d} calls  {stats["errors"]:4d} errors  '
+                                 f'p50 {stats["p50_ms"]:8.1f} ms  p99 {stats["p99_ms"]:8.1f} ms  '
+                                 f'{stats["bytes"]:12d} bytes')
+
+        for sort_key, title in [('cumulative', 'Profile by cumulative time (main thread)'),
+                                ('tottime', 'Profile by internal time (main thread)')]:
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=stream)
+            stats.sort_stats(sort_key).print_stats(40)
+            lines += ['', title, '-' * len(title), stream.getvalue()]
+
+        return '\n'.join(lines)
+
+
+def get_active_profiler() -> Optional[Profiler]:
+    """
+    Gets the profiler of the running command, if profiling is enabled
+    """
+    return _active_profiler
+
+
+@contextmanager
+def profile_phase(name: str):
+    """
+    Records the time spent in a phase of the command (e.g. "transfer") when profiling is enabled
+    """
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
+
+
+def default_profile_path() -> Path:
+    return Path(f'cirro-profile-{datetime.now().strftime("%Y%m%d-%H%M%S")}.txt').absolute()
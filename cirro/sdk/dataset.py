@@ -1,17 +1,18 @@
 import datetime
-from typing import Union, List, Optional
+from typing import Union, List, Optional, Callable, Dict
 
 from cirro_api_client.v1.models import Dataset, DatasetDetail, RunAnalysisRequest, ProcessDetail, Status, \
     DatasetDetailParams, RunAnalysisRequestParams, DatasetDetailInfo, \
-    Tag, ArtifactType
+    Tag, ArtifactType, ComputeEnvironmentConfiguration
 
 from cirro.cirro_client import CirroApi
+from cirro.models.analysis import AnalysisSubmission, ExecutionStatusChange
 from cirro.models.assets import DatasetAssets
 from cirro.sdk.asset import DataPortalAssets, DataPortalAsset
 from cirro.sdk.exceptions import DataPortalAssetNotFound
 from cirro.sdk.exceptions import DataPortalInputError
 from cirro.sdk.file import DataPortalFile, DataPortalFiles
-from cirro.sdk.helpers import parse_process_name_or_id
+from cirro.sdk.helpers import parse_process_name_or_id, get_compute_environment
 from cirro.sdk.process import DataPortalProcess
 
 
@@ -261,42 +262,181 @@ class DataPortalDataset(DataPortalAsset):
             raise DataPortalInputError("Must specify 'name' for run_analysis")
         if process is None:
             raise DataPortalInputError("Must specify 'process' for run_analysis")
-        if notifications_emails is None:
-            notifications_emails = []
-        if params is None:
-            params = {}
 
         # If the process is a string, try to parse it as a process name or ID
         process = parse_process_name_or_id(process, self._client)
 
         if compute_environment:
-            compute_environments = self._client.compute_environments.list_environments_for_project(
-                project_id=self.project_id
-            )
-            compute_environment = next(
-                (env for env in compute_environments
-                 if env.name == compute_environment or env.id == compute_environment),
-                None
-            )
-            if compute_environment is None:
-                raise DataPortalInputError(f"Compute environment '{compute_environment}' not found")
+            compute_environment = get_compute_environment(compute_environment, self.project_id, self._client)
 
         resp = self._client.execution.run_analysis(
             project_id=self.project_id,
-            request=RunAnalysisRequest(
-                name=name,
-                description=description,
-                process_id=process.id,
-                source_dataset_ids=[self.id],
-                params=RunAnalysisRequestParams.from_dict(params),
-                notification_emails=notifications_emails,
-                resume_dataset_id=resume_dataset_id,
-                compute_environment_id=compute_environment.id if compute_environment else None
-            )
+            request=self._analysis_request(name, description, process, params, notifications_emails,
+                                           compute_environment, resume_dataset_id)
         )
         return resp.id
 
+    def wait_for_completion(self, timeout: float = None, min_interval: float = 10,
+                            max_interval: float = 300) -> Status:
+        """
+        Waits until the analysis which creates the dataset has finished, returns its final status
+
+        Args:
+            timeout (float): Stop waiting after this many seconds, returning the current status
+            min_interval (float): Seconds between the first status checks
+            max_interval (float): Maximum seconds between status checks,
+             the interval grows while the status is unchanged
+        """
+        from cirro.services.execution_watcher import ExecutionWatcher
+
+        watcher = ExecutionWatcher(self._client, min_interval=min_interval, max_interval=max_interval)
+        watcher.add(self.project_id, self.id)
+        return watcher.wait(timeout=timeout)[self.id]
+
+    def _analysis_request(self, name: str, description: str, process: DataPortalProcess, params: Optional[dict],
+                          notifications_emails: Optional[List[str]],
+                          compute_environment: Optional[ComputeEnvironmentConfiguration],
+                          resume_dataset_id: Optional[str]) -> RunAnalysisRequest:
+        return RunAnalysisRequest(
+            name=name,
+            description=description,
+            process_id=process.id,
+            source_dataset_ids=[self.id],
+            params=RunAnalysisRequestParams.from_dict(params or {}),
+            notification_emails=notifications_emails or [],
+            resume_dataset_id=resume_dataset_id,
+            compute_environment_id=compute_environment.id if compute_environment else None
+        )
+
 
 class DataPortalDatasets(DataPortalAssets[DataPortalDataset]):
     """Collection of multiple DataPortalDataset objects."""
     asset_name = "dataset"
+
+    def run_analyses(
+            self,
+            name: Union[str, Callable[[DataPortalDataset], str]] = None,
+            description: str = "",
+            process: Union[DataPortalProcess, str] = None,
+            params: Union[dict, Callable[[DataPortalDataset], dict]] = None,
+            notifications_emails: List[str] = None,
+            compute_environment: str = None,
+            max_workers=4,
+            max_rate: float = 5
+    ) -> List[AnalysisSubmission]:
+        """
+        Runs an analysis on each of the datasets, e.g. one per sample.
+
+        The process and compute environment are looked up once for the whole batch,
+        and all the parameters are validated before the analyses are submitted concurrently
+        (see `cirro.services.ExecutionService.run_analyses`).
+        A dataset whose analysis fails to launch does not stop the others.
+
+        Args:
+            name (str or Callable): Name of each newly created dataset,
+             either a format string (e.g. "{dataset.name} - RNA-seq") or a function of the source dataset
+            description (str): Description of the newly created datasets
+            process (DataPortalProcess or str): Process to run
+            params (dict or Callable): Analysis parameters, or a function returning the parameters of a dataset
+            notifications_emails (List[str]): Notification email address(es)
+            compute_environment (str): Name or ID of compute environment to use,
+             if blank it will run in AWS
+            max_workers (int): Number of analyses submitted at the same time
+            max_rate (float): Maximum number of analyses submitted per second
+
+        Returns:
+            The outcome of the analysis of each dataset, in the same order.
+            `dataset_id` is the ID of the newly created dataset, or `error` the reason it was not launched.
+
+        ```python
+        from cirro import DataPortal
+
+        portal = DataPortal()
+        project = portal.get_project_by_name("Project Name")
+        samples = project.list_datasets().filter_by_pattern("Sample *")
+        results = samples.run_analyses(
+            name="{dataset.name} - Alignment",
+            process="Alignment Pipeline",
+            params={"genome": "GRCh38"}
+        )
+        print([r.error for r in results if not r.succeeded])
+        ```
+        """
+        if name is None:
+            raise DataPortalInputError("Must specify 'name' for run_analyses")
+        if process is None:
+            raise DataPortalInputError("Must specify 'process' for run_analyses")
+        if len(self) == 0:
+            return []
+
+        client = self[0]._client
+        process = parse_process_name_or_id(process, client)
+
+        # Datasets shared from other projects are analyzed in their own project
+        project_ids = list(dict.fromkeys(dataset.project_id for dataset in self))
+        environments = {
+            project_id: get_compute_environment(compute_environment, project_id, client)
+            if compute_environment else None
+            for project_id in project_ids
+        }
+
+        results: List[Optional[AnalysisSubmission]] = [None] * len(self)
+        for project_id in project_ids:
+            # A dataset whose request cannot be built is reported in its result, like a failed submission
+            indexes, requests = [], []
+            for i, dataset in enumerate(self):
+                if dataset.project_id != project_id:
+                    continue
+                try:
+                    requests.append(dataset._analysis_request(
+                        name=name(dataset) if callable(name) else name.format(dataset=dataset),
+                        description=description,
+                        process=process,
+                        params=params(dataset) if callable(params) else params,
+                        notifications_emails=notifications_emails,
+                        compute_environment=environments[project_id],
+                        resume_dataset_id=None
+                    ))
+                    indexes.append(i)
+                except Exception as e:
+                    results[i] = AnalysisSubmission(request=None, error=e)
+
+            if not requests:
+                continue
+            project_results = client.execution.run_analyses(project_id, requests,
+                                                            max_workers=max_workers, max_rate=max_rate)
+            for i, result in zip(indexes, project_results):
+                results[i] = result
+        return results
+
+    def wait_for_completion(self, timeout: float = None,
+                            on_change: Callable[[ExecutionStatusChange], None] = None,
+                            min_interval: float = 10, max_interval: float = 300) -> Dict[str, Status]:
+        """
+        Waits until the analyses which create the datasets have finished,
+        checking the status of many datasets of a project with a single listing.
+
+        Args:
+            timeout (float): Stop waiting after this many seconds, even if some analyses are still running
+            on_change: Called with each change of status (`cirro.models.analysis.ExecutionStatusChange`)
+            min_interval (float): Seconds between the first status checks of each dataset
+            max_interval (float): Maximum seconds between status checks,
+             the interval grows while the status is unchanged
+
+        Returns:
+            The status of each dataset, by ID
+
+        ```python
+        running = project.list_datasets().filter_by_pattern("* - Alignment")
+        statuses = running.wait_for_completion(on_change=print)
+        ```
+        """
+        from cirro.services.execution_watcher import ExecutionWatcher
+
+        if len(self) == 0:
+            return {}
+        watcher = ExecutionWatcher(self[0]._client, min_interval=min_interval, max_interval=max_interval,
+                                   on_change=on_change)
+        for dataset in self:
+            watcher.add(dataset.project_id, dataset.id)
+        return watcher.wait(timeout=timeout)
@@ -64,6 +64,11 @@ class DataPortalFile(DataPortalAsset):
         """Fully URI to file object in AWS S3"""
         return self._file.absolute_path
 
+    @property
+    def file(self) -> File:
+        """Record of the file and its location, used by the API client"""
+        return self._file
+
     @property
     def metadata(self) -> dict:
         """File metadata"""
@@ -1,13 +1,25 @@
+import re
 from typing import Union
 
 from cirro_api_client.v1.errors import UnexpectedStatus
-from cirro_api_client.v1.models import ProcessDetail
+from cirro_api_client.v1.models import ProcessDetail, ComputeEnvironmentConfiguration
 
 from cirro.cirro_client import CirroApi
 from cirro.sdk.exceptions import DataPortalInputError
 from cirro.sdk.process import DataPortalProcess
 
 
+_UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+
+def looks_like_id(value: str) -> bool:
+    """
+    Whether the value has the format of a project or dataset ID (a UUID),
+    used to look it up directly before falling back to a search by name
+    """
+    return isinstance(value, str) and bool(_UUID_PATTERN.match(value))
+
+
 def parse_process_name_or_id(process: Union[DataPortalProcess, str], client: CirroApi):
     """
     If the process is a string, try to parse it as a process name or ID.
@@ -43,3 +55,19 @@ def parse_process_name_or_id(process: Union[DataPortalProcess, str], client: Cir
 
     # If that didn't work, raise an error indicating that the process couldn't be parsed
     raise DataPortalInputError(f"Could not parse process name or id: '{process}'")
+
+
+def get_compute_environment(compute_environment: str, project_id: str,
+                            client: CirroApi) -> ComputeEnvironmentConfiguration:
+    """
+    Find a compute environment of the project by name or ID
+    """
+    compute_environments = client.compute_environments.list_environments_for_project(project_id=project_id)
+    match = next(
+        (env for env in compute_environments
+         if env.name == compute_environment or env.id == compute_environment),
+        None
+    )
+    if match is None:
+        raise DataPortalInputError(f"Compute environment '{compute_environment}' not found")
+    return match
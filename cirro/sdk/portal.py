@@ -1,8 +1,12 @@
+from typing import Dict
+
+from cirro_api_client.v1.errors import BadRequestException, ForbiddenException, NotFoundException
 from cirro_api_client.v1.models import Executor
 
 from cirro.cirro_client import CirroApi
 from cirro.sdk.dataset import DataPortalDataset
 from cirro.sdk.exceptions import DataPortalAssetNotFound
+from cirro.sdk.helpers import looks_like_id
 from cirro.sdk.process import DataPortalProcess, DataPortalProcesses
 from cirro.sdk.project import DataPortalProject, DataPortalProjects
 from cirro.sdk.reference_type import DataPortalReferenceType, DataPortalReferenceTypes
@@ -39,6 +43,10 @@ class DataPortal:
         else:
             self._client = CirroApi(base_url=base_url)
 
+        # Projects resolved during this session, by ID, and the IDs of projects resolved by name
+        self._projects: Dict[str, DataPortalProject] = {}
+        self._project_ids_by_name: Dict[str, str] = {}
+
     def list_projects(self) -> DataPortalProjects:
         """List all the projects available in the Data Portal."""
 
@@ -52,27 +60,64 @@ class DataPortal:
     def get_project_by_name(self, name: str = None) -> DataPortalProject:
         """Return the project with the specified name."""
 
-        return self.list_projects().get_by_name(name)
+        project_id = self._project_ids_by_name.get(name)
+        if project_id is not None and project_id in self._projects:
+            return self._projects[project_id]
+
+        project = self.list_projects().get_by_name(name)
+        self._projects[project.id] = project
+        self._project_ids_by_name[name] = project.id
+        return project
 
     def get_project_by_id(self, _id: str = None) -> DataPortalProject:
         """Return the project with the specified id."""
 
-        return self.list_projects().get_by_id(_id)
+        if _id in self._projects:
+            return self._projects[_id]
+
+        try:
+            project = self._client.projects.get(_id)
+        except (BadRequestException, ForbiddenException, NotFoundException):
+            project = None
+        if project is None:
+            raise DataPortalAssetNotFound(f"No project found with id '{_id}'.")
+
+        self._projects[_id] = DataPortalProject(project, self._client)
+        return self._projects[_id]
 
     def get_project(self, project: str = None) -> DataPortalProject:
         """
         Return a project identified by ID or name.
 
+        Values formatted as an ID are looked up directly,
+        otherwise the projects are listed to find the one with a matching name.
+
         Args:
             project (str): ID or name of project
 
         Returns:
             `from cirro.sdk.project import DataPortalProject`
         """
+        if project in self._project_ids_by_name:
+            return self.get_project_by_name(project)
+
+        if looks_like_id(project):
+            try:
+                return self.get_project_by_id(project)
+            except DataPortalAssetNotFound:
+                return self.get_project_by_name(project)
+
+        # Look for a matching name, then a matching ID, in a single listing
+        projects = self.list_projects()
         try:
-            return self.get_project_by_id(project)
+            match = projects.get_by_name(project)
+            self._project_ids_by_name[project] = match.id
         except DataPortalAssetNotFound:
-            return self.get_project_by_name(project)
+            match = next((p for p in projects if p.id == project), None)
+            if match is None:
+                raise
+        self._projects[match.id] = match
+        return match
 
     def get_dataset(self, project: str = None, dataset: str = None) -> DataPortalDataset:
         """
@@ -94,15 +139,7 @@ class DataPortal:
             )
             ```
         """
-        try:
-            project: DataPortalProject = self.get_project_by_id(project)
-        except DataPortalAssetNotFound:
-            project: DataPortalProject = self.get_project_by_name(project)
-
-        try:
-            return project.get_dataset_by_id(dataset)
-        except DataPortalAssetNotFound:
-            return project.get_dataset_by_name(dataset)
+        return self.get_project(project).get_dataset(dataset)
 
     def list_processes(self, ingest=False) -> DataPortalProcesses:
         """
@@ -1,20 +1,28 @@
 from functools import cache
 from time import sleep
-from typing import List, Union
+from typing import Dict, List, Union, Iterable, Any, Optional, TYPE_CHECKING
 
+from cirro_api_client.v1.errors import BadRequestException, ForbiddenException, NotFoundException
 from cirro_api_client.v1.models import Project, UploadDatasetRequest, Dataset, Sample, Tag
 
 from cirro.cirro_client import CirroApi
 from cirro.file_utils import get_files_in_directory
+from cirro.models.dataset import DatasetUpload
+from cirro.models.file import File
+from cirro.models.sample import SampleUpdate
 from cirro.sdk.asset import DataPortalAssets, DataPortalAsset
 from cirro.sdk.dataset import DataPortalDataset, DataPortalDatasets
 from cirro.sdk.exceptions import DataPortalAssetNotFound, DataPortalInputError
-from cirro.sdk.helpers import parse_process_name_or_id
+from cirro.sdk.file import DataPortalFile
+from cirro.sdk.helpers import parse_process_name_or_id, looks_like_id
 from cirro.sdk.process import DataPortalProcess
 from cirro.sdk.reference import DataPortalReference, DataPortalReferences
 from cirro.sdk.reference_type import DataPortalReferenceType, DataPortalReferenceTypes
 from cirro.services.service_helpers import list_all_datasets
 
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
 
 class DataPortalProject(DataPortalAsset):
     """
@@ -70,10 +78,21 @@ class DataPortalProject(DataPortalAsset):
         return list_all_datasets(project_id=self.id,
                                  client=self._client)
 
+    @cache
+    def _get_datasets_by_name(self) -> Dict[str, List[Dataset]]:
+        datasets_by_name = {}
+        for dataset in self._get_datasets():
+            datasets_by_name.setdefault(dataset.name, []).append(dataset)
+        return datasets_by_name
+
+    def _clear_dataset_cache(self):
+        self._get_datasets.cache_clear()
+        self._get_datasets_by_name.cache_clear()
+
     def list_datasets(self, force_refresh=False) -> DataPortalDatasets:
         """List all the datasets available in the project."""
         if force_refresh:
-            self._get_datasets.cache_clear()
+            self._clear_dataset_cache()
 
         return DataPortalDatasets(
             [
@@ -85,21 +104,54 @@ class DataPortalProject(DataPortalAsset):
     def get_dataset_by_name(self, name: str, force_refresh=False) -> DataPortalDataset:
         """Return the dataset with the specified name."""
         if force_refresh:
-            self._get_datasets.cache_clear()
+            self._clear_dataset_cache()
 
-        dataset = next((d for d in self._get_datasets() if d.name == name), None)
-        if dataset is None:
+        datasets = self._get_datasets_by_name().get(name, [])
+        if len(datasets) == 0:
             raise DataPortalAssetNotFound(f'Dataset with name {name} not found')
-        return self.get_dataset_by_id(dataset.id)
+        if len(datasets) > 1:
+            raise DataPortalAssetNotFound(f"Multiple datasets found with name '{name}', use ID instead")
+        return DataPortalDataset(datasets[0], self._client)
 
     def get_dataset_by_id(self, _id: str = None) -> DataPortalDataset:
         """Return the dataset with the specified id."""
 
-        dataset = self._client.datasets.get(project_id=self.id, dataset_id=_id)
+        try:
+            dataset = self._client.datasets.get(project_id=self.id, dataset_id=_id)
+        except (BadRequestException, ForbiddenException, NotFoundException):
+            dataset = None
         if dataset is None:
             raise DataPortalAssetNotFound(f'Dataset with ID {_id} not found')
         return DataPortalDataset(dataset, self._client)
 
+    def get_dataset(self, dataset: str) -> DataPortalDataset:
+        """
+        Return a dataset identified by ID or name.
+
+        Values formatted as an ID are looked up directly,
+        otherwise the datasets in the project (including shared datasets) are listed once
+        and searched by name, then by ID.
+
+        Args:
+            dataset (str): ID or name of dataset
+
+        Returns:
+            `cirro.sdk.dataset.DataPortalDataset`
+        """
+        if looks_like_id(dataset):
+            try:
+                return self.get_dataset_by_id(dataset)
+            except DataPortalAssetNotFound:
+                return self.get_dataset_by_name(dataset)
+
+        try:
+            return self.get_dataset_by_name(dataset)
+        except DataPortalAssetNotFound:
+            match = next((d for d in self._get_datasets() if d.id == dataset), None)
+            if match is None:
+                raise
+            return DataPortalDataset(match, self._client)
+
     def list_references(self, reference_type: str = None) -> DataPortalReferences:
         """
         List the references available in a project.
@@ -208,17 +260,133 @@ class DataPortalProject(DataPortalAsset):
             files=files
         )
 
+        return self._wait_for_dataset(create_response.id)
+
+    def create_dataset_from_files(
+        self,
+        name: str = None,
+        process: Union[DataPortalProcess, str] = None,
+        files: List[Union[DataPortalFile, File]] = None,
+        description='',
+        tags: List[str] = None,
+        file_path_map: Dict[str, str] = None,
+        max_workers=8
+    ) -> DataPortalDataset:
+        """
+        Create a new dataset from files already in the Data Portal (e.g. a subset of a large run),
+        which are copied within the cloud storage rather than downloaded and uploaded again.
+
+        The files must be readable from this project (e.g. files of its datasets).
+        If copying the files fails, the error includes the ID of the new dataset,
+        so the copy can be retried with `cirro.services.DatasetService.copy_files`.
+
+        Args:
+            name (str): Name of newly created dataset
+            process (str | DataPortalProcess): Process to run may be referenced by name, ID, or object
+            files (List[DataPortalFile]): Files to copy into the dataset, see `DataPortalDataset.list_files`
+            description (str): Description of newly created dataset
+            tags (List[str]): Optional list of tags to apply to the dataset
+            file_path_map (Dict[str, str]): Optional mapping of the absolute or relative path of the files
+             to their path within the new dataset (by default, the same path as in the source dataset)
+            max_workers (int): Number of files copied at the same time
+
+        ```python
+        run = project.get_dataset_by_name("Sequencing run 42")
+        files = run.list_files().filter_by_pattern("*/sample_1*")
+        subset = project.create_dataset_from_files(name="Sample 1", process="Paired DNAseq (FASTQ)", files=files)
+        ```
+        """
+        from cirro.services.dataset import get_copy_destinations
+
+        if name is None:
+            raise DataPortalInputError("Must provide name for new dataset")
+        if process is None:
+            raise DataPortalInputError("Must provide the process which is used for ingest")
+        if not files:
+            raise DataPortalInputError("Must provide the files to copy into the dataset")
+
+        process = parse_process_name_or_id(process, self._client)
+        files = [file.file if isinstance(file, DataPortalFile) else file for file in files]
+        destinations = get_copy_destinations(files, file_path_map)
+        expected_files = list(destinations.values())
+
+        # Make sure that the files match the expected pattern
+        self._client.processes.check_dataset_files(expected_files, process.id, None)
+
+        create_response = self._client.datasets.create(
+            project_id=self.id,
+            upload_request=UploadDatasetRequest(
+                process_id=process.id,
+                name=name,
+                description=description,
+                expected_files=expected_files,
+                tags=[Tag(value=value) for value in tags] if tags is not None else None
+            )
+        )
+        try:
+            self._client.datasets.copy_files(
+                project_id=self.id,
+                dataset_id=create_response.id,
+                files=files,
+                file_path_map=destinations,
+                max_workers=max_workers
+            )
+        except Exception as e:
+            raise RuntimeError(f"Dataset {create_response.id} was created but its files could not be copied, "
+                               f"retry with `cirro.datasets.copy_files('{self.id}', '{create_response.id}', files)` "
+                               f"or delete it: {e}") from e
+        return self._wait_for_dataset(create_response.id)
+
+    def _wait_for_dataset(self, dataset_id: str) -> DataPortalDataset:
         # Return the dataset which was created, which might take a second to update
         max_attempts = 5
         for attempt in range(max_attempts):
             try:
-                return self.get_dataset_by_id(create_response.id)
+                return self.get_dataset_by_id(dataset_id)
             except DataPortalAssetNotFound as e:
                 if attempt == max_attempts - 1:
                     raise e
                 else:
                     sleep(2)
 
+    def upload_datasets(
+        self,
+        uploads: List[DatasetUpload],
+        process: Union[DataPortalProcess, str] = None,
+        max_workers=4,
+        max_bytes_in_flight: Optional[int] = 2 * 1024 ** 3,
+        state_file: str = None
+    ) -> List[DatasetUpload]:
+        """
+        Upload many datasets to the Data Portal concurrently, one per directory.
+        See `cirro.services.batch_upload.BatchUploader`
+
+        Args:
+            uploads (List[cirro.models.dataset.DatasetUpload]): Datasets to create
+            process (str | DataPortalProcess): Ingest process of the datasets which do not specify one,
+             may be referenced by name, ID, or object
+            max_workers (int): Number of datasets uploaded at the same time
+            max_bytes_in_flight (int): Maximum bytes uploaded at the same time (None for no limit)
+            state_file (str): JSON file the status of each dataset is saved to, to resume the batch
+
+        Returns:
+            The datasets, with their ID and status
+
+        ```python
+        from cirro.models.dataset import DatasetUpload
+
+        uploads = [DatasetUpload(name=run.name, directory=str(run)) for run in Path("runs").iterdir()]
+        results = project.upload_datasets(uploads, process="Paired DNAseq (FASTQ)", state_file="runs.json")
+        ```
+        """
+        from cirro.services.batch_upload import BatchUploader
+
+        if isinstance(process, DataPortalProcess):
+            process = process.id
+        uploader = BatchUploader(self._client, self.id, process=process, max_workers=max_workers,
+                                 max_bytes_in_flight=max_bytes_in_flight, state_file=state_file)
+        return uploader.upload(uploads)
+
     def samples(self, max_items: int = 10000) -> List[Sample]:
         """
         Retrieves a list of samples associated with a project along with their metadata
@@ -228,6 +396,32 @@ class DataPortalProject(DataPortalAsset):
         """
         return self._client.metadata.get_project_samples(self.id, max_items)
 
+    def samples_dataframe(self, max_items: int = None) -> 'DataFrame':
+        """
+        Retrieves the samples of the project as a table, with one typed column per metadata field.
+        See `cirro.services.MetadataService.get_samples_dataframe`
+
+        Args:
+            max_items (int): Maximum number of records to get (default: all)
+        """
+        return self._client.metadata.get_samples_dataframe(self.id, max_items=max_items)
+
+    def update_samples(self, updates: Union['DataFrame', Iterable[Dict[str, Any]]],
+                       max_workers=8) -> List[SampleUpdate]:
+        """
+        Updates the metadata of many samples, sending only the samples whose metadata changes.
+        See `cirro.services.MetadataService.update_samples` for the format of the updates.
+
+        Args:
+            updates (DataFrame or Iterable[dict]): Metadata of the samples,
+             identified by an `id` or `name` column
+            max_workers (int): Number of samples updated at the same time
+
+        Returns:
+            The outcome of each update, in the same order
+        """
+        return self._client.metadata.update_samples(self.id, updates, max_workers=max_workers)
+
 
 class DataPortalProjects(DataPortalAssets[DataPortalProject]):
     """Collection of DataPortalProject objects"""
@@ -1,9 +1,13 @@
 from abc import ABC
-from typing import TypeVar, Callable, Generic, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TypeVar, Callable, Generic, Optional, List, Iterator, Type
 
 from attr import define
 from cirro_api_client import CirroApiClient
 
+from cirro.services.cache import MetadataCache
+
 D = TypeVar('D')
 
 
@@ -22,24 +26,56 @@ class PageArgs:
 T = TypeVar('T', bound=PageResp)
 
 
-def get_all_records(records_getter: Callable[[PageArgs], Optional[PageResp[D]]],
-                    batch_size=5000, max_items=None) -> List[D]:
-    next_token = None
-    items = []
-
-    while True:
-        resp = records_getter(PageArgs(next_token=next_token, limit=batch_size))
-        if not resp:
-            return items
+def iter_records(records_getter: Callable[[PageArgs], Optional[PageResp[D]]],
+                 batch_size=5000, max_items=None, prefetch=False) -> Iterator[D]:
+    """
+    Yields the records of a paginated endpoint page by page
 
-        items.extend(resp.data)
+    Args:
+        records_getter: Gets a page of records
+        batch_size (int): Number of records per page
+        max_items (int): Stop after this many records, the last page only requests the records still needed
+        prefetch (bool): Request the next page in the background while the current one is being consumed
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+    # Returns a function which waits for the page, it is only requested once called unless prefetching
+    def fetch(next_token: Optional[str], remaining: Optional[int]) -> Callable[[], Optional[PageResp[D]]]:
+        limit = min(batch_size, remaining) if remaining is not None else batch_size
+        page_args = PageArgs(next_token=next_token, limit=limit)
+        if executor:
+            return executor.submit(records_getter, page_args).result
+        return partial(records_getter, page_args)
+
+    try:
+        remaining = max_items if max_items else None
+        pending = fetch(None, remaining)
+        while True:
+            resp = pending()
+            if not resp:
+                return
+
+            data = resp.data if remaining is None else resp.data[:remaining]
+            if remaining is not None:
+                remaining -= len(data)
+
+            next_token = resp.next_token
+            has_next = bool(next_token) and (remaining is None or remaining > 0)
+            if has_next:
+                pending = fetch(next_token, remaining)
+
+            yield from data
+
+            if not has_next:
+                return
+    finally:
+        if executor:
+            executor.shutdown(wait=False)
 
-        next_token = resp.next_token
-        if not next_token:
-            return items
 
-        if max_items and len(items) >= max_items:
-            return items
+def get_all_records(records_getter: Callable[[PageArgs], Optional[PageResp[D]]],
+                    batch_size=5000, max_items=None) -> List[D]:
+    return list(iter_records(records_getter, batch_size=batch_size, max_items=max_items))
 
 
 @define
@@ -48,3 +84,16 @@ class BaseService(ABC):
     Not to be instantiated directly
     """
     _api_client: CirroApiClient
+    _cache: Optional[MetadataCache] = None
+
+    def _cached(self, key: str, fetch: Callable[[], D], model: Type = None) -> D:
+        """
+        Gets a value through the metadata cache, if enabled
+        """
+        if self._cache is None:
+            return fetch()
+        return self._cache.get(key, fetch, model=model)
+
+    def _invalidate_cache(self, prefix: str):
+        if self._cache is not None:
+            self._cache.invalidate(prefix)
@@ -0,0 +1,208 @@
+import csv
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cirro_api_client.v1.models import Process, Tag, UploadDatasetRequest
+
+from cirro import CirroApi
+from cirro.file_utils import get_files_in_directory
+from cirro.models.dataset import DatasetUpload, DatasetUploadStatus
+from cirro.models.file import PathLike
+from cirro.models.file_mapping import FileMappingValidator
+from cirro.utils import TransferLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class BatchUploader:
+    """
+    Creates many datasets in a project, one per directory, and uploads their files concurrently.
+
+    The processes are looked up and their file mapping rules compiled once for the whole batch.
+    Datasets are uploaded `max_workers` at a time, with at most `max_bytes_in_flight` bytes
+    being uploaded at the same time across all of them.
+
+    The status of each dataset is saved to `state_file` as the batch progresses.
+    Running the batch again with the same state file skips the datasets which were uploaded,
+    and uploads the files of those which were created again (without creating another dataset).
+
+    ```python
+    from cirro.cirro_client import CirroApi
+    from cirro.services.batch_upload import BatchUploader
+
+    cirro = CirroApi()
+    uploader = BatchUploader(cirro, "project-id", process="Paired DNAseq (FASTQ)", state_file="batch.json")
+    uploads = BatchUploader.read_manifest("manifest.csv")
+    for upload in uploader.upload(uploads):
+        print(upload.name, upload.status, upload.error or "")
+    ```
+    """
+    def __init__(self, client: CirroApi, project_id: str, process: str = None,
+                 max_workers=4, max_bytes_in_flight: Optional[int] = 2 * 1024 ** 3,
+                 state_file: PathLike = None):
+        """
+        Args:
+            client (cirro.CirroApi): Cirro API client
+            project_id (str): ID of the project
+            process (str): Name or ID of the ingest process of the datasets which do not specify one
+            max_workers (int): Number of datasets uploaded at the same time
+            max_bytes_in_flight (int): Maximum bytes uploaded at the same time (None for no limit)
+            state_file (str|Path): JSON file the status of each dataset is saved to, to resume the batch
+        """
+        self._client = client
+        self.project_id = project_id
+        self.process = process
+        self.max_workers = max_workers
+        self.state_file = Path(state_file) if state_file else None
+        self._transfer_limiter = TransferLimiter(max_bytes_in_flight)
+        self._state_lock = threading.Lock()
+        self._state: Dict[str, dict] = {}
+
+    @staticmethod
+    def read_manifest(manifest: PathLike) -> List[DatasetUpload]:
+        """
+        Reads the datasets to upload from a CSV file with the columns
+        `name`, `directory` and optionally `description`, `process` and `tags` (separated by `;`).
+        Relative directories are relative to the manifest.
+
+        Args:
+            manifest (str|Path): Path to the CSV file
+        """
+        manifest = Path(manifest)
+        uploads = []
+        with manifest.open(newline='') as handle:
+            for line, row in enumerate(csv.DictReader(handle), start=2):
+                if not row.get('name') or not row.get('directory'):
+                    raise ValueError(f"{manifest}, line {line}: the name and directory of the dataset are required")
+                uploads.append(DatasetUpload(
+                    name=row['name'],
+                    directory=str(Path(manifest.parent, row['directory'])),
+                    description=row.get('description') or '',
+                    process=row.get('process') or None,
+                    tags=[tag.strip() for tag in (row.get('tags') or '').split(';') if tag.strip()]
+                ))
+        return uploads
+
+    def upload(self, uploads: List[DatasetUpload]) -> List[DatasetUpload]:
+        """
+        Creates and uploads the datasets. A dataset which fails does not stop the others,
+        check the status and error of each one instead.
+
+        Args:
+            uploads (List[cirro.models.dataset.DatasetUpload]): Datasets to create
+
+        Returns:
+            The datasets, with their ID and status
+        """
+        self._load_state(uploads)
+        pending = [upload for upload in uploads if upload.status != DatasetUploadStatus.UPLOADED]
+        if len(pending) < len(uploads):
+            logger.info(f"Skipping {len(uploads) - len(pending)} datasets which were already uploaded")
+
+        # Processes are resolved and their file mapping rules compiled once for the batch
+        processes = self._resolve_processes(pending)
+        validators: Dict[str, FileMappingValidator] = {}
+        for process in {process.id: process for process in processes.values() if process}.values():
+            validators[process.id] = self._client.processes.get_file_mapping_validator(process.id)
+
+        def run(upload: DatasetUpload):
+            try:
+                self._upload(upload, processes.get(upload.process or self.process), validators)
+            except Exception as e:
+                logger.error(f"Failed to upload dataset {upload.name}: {e}")
+                upload.error = e
+                upload.status = DatasetUploadStatus.FAILED
+            self._save_state(upload)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(run, pending))
+
+        return uploads
+
+    def _upload(self, upload: DatasetUpload, process: Optional[Process],
+                validators: Dict[str, FileMappingValidator]):
+        if process is None:
+            raise ValueError(f"Ingest process {upload.process or self.process} not found")
+
+        files = upload.files if upload.files is not None else get_files_in_directory(upload.directory)
+        if not files:
+            raise ValueError(f"No files to upload in {upload.directory}")
+
+        if upload.dataset_id is None:
+            # The rules compiled for the batch give early warnings, the server check decides
+            report = validators[process.id].validate(files)
+            for error in report.errors:
+                logger.warning(f"{upload.name}: {error}")
+            self._client.processes.check_dataset_files(files, process.id, upload.directory, validate_locally=False)
+
+            create_response = self._client.datasets.create(
+                project_id=self.project_id,
+                upload_request=UploadDatasetRequest(
+                    process_id=process.id,
+                    name=upload.name,
+                    description=upload.description,
+                    expected_files=files,
+                    tags=[Tag(value=tag) for tag in upload.tags]
+                )
+            )
+            upload.dataset_id = create_response.id
+            upload.status = DatasetUploadStatus.CREATED
+            self._save_state(upload)
+
+        logger.info(f"Uploading {len(files)} files to dataset {upload.name} ({upload.dataset_id})")
+        self._client.datasets.upload_files(
+            project_id=self.project_id,
+            dataset_id=upload.dataset_id,
+            directory=upload.directory,
+            files=files,
+            transfer_limiter=self._transfer_limiter
+        )
+        upload.status = DatasetUploadStatus.UPLOADED
+        upload.error = None
+
+    def _resolve_processes(self, uploads: List[DatasetUpload]) -> Dict[str, Optional[Process]]:
+        names_or_ids = {upload.process or self.process for upload in uploads}
+        if None in names_or_ids:
+            raise ValueError("Specify the ingest process of the batch, or of each dataset")
+
+        processes = self._client.processes.list()
+        by_id = {process.id: process for process in processes}
+        by_name = {process.name: process for process in processes}
+        return {name_or_id: by_id.get(name_or_id) or by_name.get(name_or_id) for name_or_id in names_or_ids}
+
+    @staticmethod
+    def _key(upload: DatasetUpload) -> str:
+        return str(Path(upload.directory).absolute())
+
+    def _load_state(self, uploads: List[DatasetUpload]):
+        if self.state_file is None or not self.state_file.exists():
+            return
+        self._state = json.loads(self.state_file.read_text())
+        for upload in uploads:
+            saved = self._state.get(self._key(upload))
+            if saved and saved.get('dataset_id'):
+                upload.dataset_id = saved['dataset_id']
+                upload.status = DatasetUploadStatus(saved['status'])
+                if upload.status == DatasetUploadStatus.FAILED:
+                    # The dataset was created before failing, only its files are uploaded again
+                    upload.status = DatasetUploadStatus.CREATED
+
+    def _save_state(self, upload: DatasetUpload):
+        if self.state_file is None:
+            return
+        with self._state_lock:
+            self._state[self._key(upload)] = {
+                'name': upload.name,
+                'dataset_id': upload.dataset_id,
+                'status': upload.status.value,
+                'error': str(upload.error) if upload.error else None
+            }
+            # Written to a temporary file first, so that an interrupted batch never leaves a corrupted state
+            tmp_file = self.state_file.with_name(self.state_file.name + '.tmp')
+            tmp_file.write_text(json.dumps(self._state, indent=2))
+            os.replace(tmp_file, self.state_file)
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Any, TypeVar, Type
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    " Values returned from memory or disk"
+    misses: int
+    " Values fetched from the API"
+    disk_hits: int
+    " Hits which were loaded from the disk cache"
+    invalidations: int
+    " Entries removed after a write"
+
+
+class _CacheEntry(NamedTuple):
+    value: Any
+    expires_at: float
+
+
+class MetadataCache:
+    """
+    Time-based cache of metadata which rarely changes, such as the list of processes, projects and reference types.
+
+    Values are kept in memory for `ttl` seconds, and written to `cache_dir` when it is set
+    so that they are re-used by later sessions (e.g. successive CLI commands).
+    Writes made through the services (such as creating or archiving a process) invalidate the affected entries,
+    changes made elsewhere are picked up once the entries expire.
+
+    Enable it with the `metadata_cache_ttl` configuration property, or pass a `cirro.config.CacheConfig`
+    to the `CirroApi` client, then check its effectiveness with `cirro.metadata_cache.stats()`.
+    """
+    def __init__(self, ttl: float, cache_dir: Path = None):
+        """
+        Args:
+            ttl (float): Seconds a value is re-used before fetching it again
+            cache_dir (Path): Optional directory to persist the values in,
+             use a separate directory for each Cirro instance and user
+        """
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        self._invalidations = 0
+
+    def get(self, key: str, fetch: Callable[[], T], model: Type = None) -> T:
+        """
+        Gets a value from the cache, or fetches and caches it
+
+        Args:
+            key (str): Cache key, e.g. "processes/{process_id}", used as a prefix by `invalidate`
+            fetch: Gets the value from the API
+            model: API model class of the value (or of its items, for a list), needed to persist it to disk
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._hits += 1
+                return _copy(entry.value)
+
+        if model is not None and self.cache_dir is not None:
+            entry = self._load(key, model, now)
+            if entry is not None:
+                with self._lock:
+                    self._hits += 1
+                    self._disk_hits += 1
+                    self._entries[key] = entry
+                return _copy(entry.value)
+
+        value = fetch()
+        with self._lock:
+            self._misses += 1
+        if value is None:
+            return value
+
+        with self._lock:
+            self._entries[key] = _CacheEntry(value=value, expires_at=now + self.ttl)
+        if model is not None and self.cache_dir is not None:
+            self._save(key, value, now)
+        return _copy(value)
+
+    def invalidate(self, prefix: str = None):
+        """
+        Removes the entries whose key starts with the prefix, or all entries if not provided
+        """
+        with self._lock:
+            keys = [key for key in self._entries if prefix is None or key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            self._invalidations += len(keys)
+
+        if self.cache_dir is not None and self.cache_dir.exists():
+            file_prefix = _file_name(prefix) if prefix is not None else ''
+            for path in self.cache_dir.glob('*.json'):
+                if path.name.startswith(file_prefix):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        logger.debug(f'Unable to remove metadata cache entry {path}')
+
+    def clear(self):
+        """
+        Removes all entries
+        """
+        self.invalidate()
+
+    def stats(self) -> CacheStats:
+        """
+        Gets the number of cache hits and misses since the cache was created
+        """
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses,
+                              disk_hits=self._disk_hits, invalidations=self._invalidations)
+
+    def _path(self, key: str) -> Path:
+        return Path(self.cache_dir, f'{_file_name(key)}.json')
+
+    def _load(self, key: str, model: Type, now: float) -> Optional[_CacheEntry]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            cached = json.loads(path.read_text())
+            expires_at = cached['saved_at'] + self.ttl
+            if expires_at <= now:
+                return None
+            data = cached['value']
+            value = [model.from_dict(item) for item in data] if isinstance(data, list) else model.from_dict(data)
+            return _CacheEntry(value=value, expires_at=expires_at)
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.debug(f'Ignoring unreadable metadata cache entry {path}')
+            return None
+
+    def _save(self, key: str, value: Any, now: float):
+        path = self._path(key)
+        try:
+            data = [item.to_dict() for item in value] if isinstance(value, list) else value.to_dict()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so that concurrent readers never see a partial file
+            tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            tmp_path.write_text(json.dumps({'saved_at': now, 'value': data}))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            logger.debug(f'Unable to write metadata cache entry {path}')
+
+
+def _file_name(key: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]', '_', key)
+
+
+def _copy(value: T) -> T:
+    # Callers may modify the lists they receive, the cached list is left as it was
+    return list(value) if isinstance(value, list) else value
@@ -1,4 +1,4 @@
-from typing import List, Optional, Union, Dict
+from typing import List, Optional, Union, Dict, Iterator
 
 from cirro_api_client.v1.api.datasets import get_datasets, get_dataset, import_public_dataset, upload_dataset, \
     update_dataset, delete_dataset, get_dataset_manifest
@@ -8,8 +8,10 @@ from cirro_api_client.v1.models import ImportDataRequest, UploadDatasetRequest,
 
 from cirro.models.assets import DatasetAssets, Artifact
 from cirro.models.file import FileAccessContext, File, PathLike
-from cirro.services.base import get_all_records
+from cirro.profiling import profile_phase
+from cirro.services.base import iter_records
 from cirro.services.file import FileEnabledService
+from cirro.utils import TransferLimiter
 
 
 class DatasetService(FileEnabledService):
@@ -26,14 +28,34 @@ class DatasetService(FileEnabledService):
             project_id (str): ID of the Project
             max_items (int): Maximum number of records to get (default 10,000)
         """
-        return get_all_records(
+        return list(self.iter_datasets(project_id, max_items=max_items))
+
+    def iter_datasets(self, project_id: str, max_items: int = None, prefetch: bool = False) -> Iterator[Dataset]:
+        """
+        Iterates over the datasets of a project, requesting them page by page as the iterator is consumed
+
+        Args:
+            project_id (str): ID of the Project
+            max_items (int): Maximum number of records to get (default: all)
+            prefetch (bool): Request the next page in the background while the current one is processed
+
+        ```python
+        from cirro.cirro_client import CirroApi
+
+        cirro = CirroApi()
+        for dataset in cirro.datasets.iter_datasets("project-id", prefetch=True):
+            print(dataset.name)
+        ```
+        """
+        return iter_records(
             records_getter=lambda page_args: get_datasets.sync(
                 project_id=project_id,
                 client=self._api_client,
                 next_token=page_args.next_token,
                 limit=page_args.limit
             ),
-            max_items=max_items
+            max_items=max_items,
+            prefetch=prefetch
         )
 
     def list_shared(self, project_id: str, share_id: str, max_items: int = 10000) -> List[Dataset]:
@@ -57,7 +79,20 @@ class DatasetService(FileEnabledService):
         cirro.datasets.list_shared("project-id", subscribed_shares[0].id)
         ```
         """
-        return get_all_records(
+        return list(self.iter_shared_datasets(project_id, share_id, max_items=max_items))
+
+    def iter_shared_datasets(self, project_id: str, share_id: str,
+                             max_items: int = None, prefetch: bool = False) -> Iterator[Dataset]:
+        """
+        Iterates over the datasets of a share, requesting them page by page as the iterator is consumed
+
+        Args:
+            project_id (str): ID of the Project
+            share_id (str): ID of the Share
+            max_items (int): Maximum number of records to get (default: all)
+            prefetch (bool): Request the next page in the background while the current one is processed
+        """
+        return iter_records(
             records_getter=lambda page_args: get_shared_datasets.sync(
                 project_id=project_id,
                 share_id=share_id,
@@ -65,7 +100,8 @@ class DatasetService(FileEnabledService):
                 next_token=page_args.next_token,
                 limit=page_args.limit
             ),
-            max_items=max_items
+            max_items=max_items,
+            prefetch=prefetch
         )
 
     def import_public(self, project_id: str, import_request: ImportDataRequest) -> CreateResponse:
@@ -238,7 +274,8 @@ class DatasetService(FileEnabledService):
                      dataset_id: str,
                      directory: PathLike,
                      files: List[PathLike] = None,
-                     file_path_map: Dict[PathLike, str] = None) -> None:
+                     file_path_map: Dict[PathLike, str] = None,
+                     transfer_limiter: TransferLimiter = None) -> None:
         """
         Uploads files to a given dataset from the specified directory.
 
@@ -254,6 +291,8 @@ class DatasetService(FileEnabledService):
                 must be the same type as directory.
             file_path_map (typing.Dict[str|Path, str|Path]): Optional mapping of file paths to upload
              from source path to destination path, used to "re-write" paths within the dataset.
+            transfer_limiter (cirro.utils.TransferLimiter): Optional limit on the bytes uploaded at the same time,
+             shared with other uploads (see `cirro.services.batch_upload.BatchUploader`)
         ```python
         from cirro.cirro_client import CirroApi
         from cirro.file_utils import generate_flattened_file_map
@@ -296,7 +335,65 @@ class DatasetService(FileEnabledService):
             access_context=access_context,
             directory=directory,
             files=files,
-            file_path_map=file_path_map
+            file_path_map=file_path_map,
+            transfer_limiter=transfer_limiter
+        )
+
+    def copy_files(self,
+                   project_id: str,
+                   dataset_id: str,
+                   files: List[File],
+                   file_path_map: Dict[str, str] = None,
+                   max_workers=8) -> None:
+        """
+        Copies files of existing datasets to a dataset which was created to receive them (see `create`),
+        within S3, without downloading and uploading them again.
+        Large files are copied in parts, and several files are copied at the same time.
+
+        The files must be readable with the upload credentials of the dataset
+        (e.g. files of other datasets in the same project).
+
+        Args:
+            project_id (str): ID of the Project
+            dataset_id (str): ID of the Dataset
+            files (typing.List[cirro.models.file.File]): Files to copy, see `get_assets_listing`
+            file_path_map (typing.Dict[str, str]): Optional mapping of the absolute or relative path of the files
+             to their path within the dataset (by default, the same path as in the source dataset)
+            max_workers (int): Number of files copied at the same time
+
+        Raises:
+            ValueError: Several files would be copied to the same path, see `get_copy_destinations`
+
+        ```python
+        from cirro_api_client.v1.models import UploadDatasetRequest
+        from cirro.cirro_client import CirroApi
+        from cirro.services.dataset import get_copy_destinations
+
+        cirro = CirroApi()
+        files = [f for f in cirro.datasets.get_assets_listing("project-id", "dataset-id").files
+                 if f.relative_path.endswith(".fastq.gz")]
+        request = UploadDatasetRequest(
+            name="Subset of the run",
+            process_id="paired_dnaseq",
+            expected_files=list(get_copy_destinations(files).values())
+        )
+        create_response = cirro.datasets.create("project-id", request)
+        cirro.datasets.copy_files("project-id", create_response.id, files)
+        ```
+        """
+        dataset = self.get(project_id, dataset_id)
+
+        access_context = FileAccessContext.upload_dataset(
+            project_id=project_id,
+            dataset_id=dataset_id,
+            base_url=dataset.s3
+        )
+
+        self._file_service.copy_files(
+            files=files,
+            access_context=access_context,
+            file_path_map=get_copy_destinations(files, file_path_map),
+            max_workers=max_workers
         )
 
     def download_files(
@@ -319,7 +416,8 @@ class DatasetService(FileEnabledService):
             files (typing.List[str]): Optional list of files to download
         """
         if files is None:
-            files = self.get_assets_listing(project_id, dataset_id).files
+            with profile_phase('manifest listing'):
+                files = self.get_assets_listing(project_id, dataset_id).files
 
         if len(files) == 0:
             return
@@ -339,3 +437,34 @@ class DatasetService(FileEnabledService):
                                                             base_url=dataset.s3)
 
         self._file_service.download_files(access_context, download_location, files)
+
+
+def get_copy_destinations(files: List[File], file_path_map: Dict[str, str] = None) -> Dict[str, str]:
+    """
+    Gets the path of each file within a dataset it is copied to (by its absolute path),
+    see `DatasetService.copy_files`
+
+    Args:
+        files (typing.List[cirro.models.file.File]): Files to copy
+        file_path_map (typing.Dict[str, str]): Optional mapping of the absolute or relative path of the files
+         to their path within the dataset
+
+    Raises:
+        ValueError: Several files would be copied to the same path
+         (e.g. files with the same relative path in different datasets), use `file_path_map` to rename them
+    """
+    file_path_map = file_path_map or {}
+    destinations = {}
+    sources_by_destination: Dict[str, str] = {}
+    for file in files:
+        destination = file_path_map.get(file.absolute_path, file_path_map.get(file.relative_path))
+        if destination is None:
+            # Dataset files are stored under data/, which is also where the uploaded files go
+            destination = file.relative_path[len('data/'):] if file.relative_path.startswith('data/') \
+                else file.relative_path
+        if destination in sources_by_destination and sources_by_destination[destination] != file.absolute_path:
+            raise ValueError(f"{sources_by_destination[destination]} and {file.absolute_path} would both be "
+                             f"copied to {destination}, use file_path_map to give them different paths")
+        sources_by_destination[destination] = file.absolute_path
+        destinations[file.absolute_path] = destination
+    return destinations
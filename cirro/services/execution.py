@@ -1,18 +1,103 @@
-from typing import List, Optional, Dict
-
+import fnmatch
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Dict, Union, Iterator, Callable, TYPE_CHECKING
+
+from cirro_api_client import CirroApiClient
 from cirro_api_client.v1.api.execution import run_analysis, stop_analysis, get_project_summary, \
     get_tasks_for_execution, get_task_logs, get_execution_logs
+from cirro_api_client.v1.api.datasets import get_dataset
 from cirro_api_client.v1.api.processes import get_process_parameters
-from cirro_api_client.v1.models import RunAnalysisRequest, CreateResponse, Task
+from cirro_api_client.v1.errors import NotFoundException
+from cirro_api_client.v1.models import RunAnalysisRequest, CreateResponse, Task, LogEntry, GetExecutionLogsResponse
+from cirro_api_client.v1.types import Unset
 
+from cirro.models.analysis import AnalysisSubmission, TERMINAL_STATUSES, TaskLogs
+from cirro.models.file import PathLike
 from cirro.models.form_specification import ParameterSpecification
 from cirro.services.base import BaseService
+from cirro.services.cache import MetadataCache
+from cirro.utils import RateLimiter
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+
+class _LogCursor:
+    """
+    Position in a log, so that only the events after it are returned when the log is fetched again.
+    Only the last timestamp seen is kept (or the number of events, when they have no timestamp),
+    so the memory used does not depend on the length of the log.
+    """
+    def __init__(self):
+        self.timestamp: Optional[int] = None
+        self.seen_at_timestamp = 0
+        self.position = 0
+
+    def new_events(self, events: List[LogEntry]) -> Iterator[LogEntry]:
+        if self.timestamp is None and self.position > 0 or \
+                any(isinstance(event.timestamp, Unset) or event.timestamp is None for event in events):
+            # Without timestamps, the log is assumed to only grow
+            new_events = events[self.position:]
+            self.position = max(self.position, len(events))
+            yield from new_events
+            return
+
+        seen_at_timestamp = 0
+        for event in events:
+            if self.timestamp is not None and event.timestamp < self.timestamp:
+                continue
+            if event.timestamp == self.timestamp:
+                # Several events may share a timestamp, skip those already returned
+                seen_at_timestamp += 1
+                if seen_at_timestamp <= self.seen_at_timestamp:
+                    continue
+                self.seen_at_timestamp = seen_at_timestamp
+            else:
+                self.timestamp = event.timestamp
+                self.seen_at_timestamp = seen_at_timestamp = 1
+            yield event
+        self.position = max(self.position, len(events))
 
 
 class ExecutionService(BaseService):
     """
     Service for interacting with the Execution endpoints
     """
+    parameter_spec_ttl = 10 * 60
+    """ Seconds the parameter specification of a process is re-used for, when the metadata cache is not enabled """
+    _parameter_specs: MetadataCache
+
+    def __init__(self, api_client: CirroApiClient, cache: MetadataCache = None):
+        super().__init__(api_client, cache=cache)
+        # The metadata cache is shared with the process service, so that updating a process invalidates it
+        self._parameter_specs = cache if cache is not None else MetadataCache(ttl=self.parameter_spec_ttl)
+
+    def get_parameter_spec(self, process_id: str) -> ParameterSpecification:
+        """
+        Gets the specification of the parameters of a process, used to validate them before an analysis is run.
+        It is cached for each process, along with its compiled validator.
+
+        Args:
+            process_id (str): Process ID
+
+        ```python
+        spec = cirro.execution.get_parameter_spec("process-id")
+        # Reports the errors of every set of parameters at once
+        spec.validate_many([{"genome": "GRCh38"}, {"genome": "hg19"}])
+        ```
+        """
+        return self._parameter_specs.get(
+            f'processes/{process_id}/parameters',
+            lambda: ParameterSpecification(get_process_parameters.sync(process_id=process_id,
+                                                                       client=self._api_client))
+        )
+
     def run_analysis(self, project_id: str, request: RunAnalysisRequest) -> CreateResponse:
         """
         Launch an analysis job running a process on a set of inputs
@@ -50,14 +135,7 @@ class ExecutionService(BaseService):
         ```
         """
 
-        form_spec = get_process_parameters.sync(
-            process_id=request.process_id,
-            client=self._api_client
-        )
-
-        ParameterSpecification(
-            form_spec
-        ).validate_params(
+        self.get_parameter_spec(request.process_id).validate_params(
             request.params.to_dict() if request.params else {}
         )
 
@@ -67,6 +145,69 @@ class ExecutionService(BaseService):
             client=self._api_client
         )
 
+    def run_analyses(self, project_id: str, requests: List[RunAnalysisRequest],
+                     max_workers=4, max_rate: float = 5) -> List[AnalysisSubmission]:
+        """
+        Launches a batch of analysis jobs in a project.
+
+        The parameters of every request are validated before any analysis is launched
+        (fetching the parameter specification once per process),
+        then the valid requests are submitted concurrently, at most `max_rate` per second.
+        A request which is invalid or rejected does not stop the others,
+        check the result of each one instead.
+
+        Args:
+            project_id (str): ID of the Project
+            requests (List[cirro_api_client.v1.models.RunAnalysisRequest]): Analyses to launch
+            max_workers (int): Number of analyses submitted at the same time
+            max_rate (float): Maximum number of analyses submitted per second (None for no limit)
+
+        Returns:
+            The outcome of each request, in the same order
+
+        ```python
+        results = cirro.execution.run_analyses("project-id", requests)
+        failed = [result for result in results if not result.succeeded]
+        for result in failed:
+            print(f"{result.request.name}: {result.error}")
+        ```
+        """
+        results = [AnalysisSubmission(request=request) for request in requests]
+
+        # Each process is only looked up once, even if it cannot be found
+        specs: Dict[str, Union[ParameterSpecification, Exception]] = {}
+        for result in results:
+            process_id = result.request.process_id
+            if process_id not in specs:
+                try:
+                    specs[process_id] = self.get_parameter_spec(process_id)
+                except Exception as e:
+                    specs[process_id] = e
+            spec = specs[process_id]
+            if isinstance(spec, Exception):
+                result.error = spec
+                continue
+            try:
+                spec.validate_params(result.request.params.to_dict() if result.request.params else {})
+            except RuntimeError as e:
+                result.error = e
+
+        rate_limiter = RateLimiter(max_rate)
+
+        def submit(result: AnalysisSubmission):
+            rate_limiter.acquire()
+            try:
+                response = run_analysis.sync(project_id=project_id, body=result.request, client=self._api_client)
+                result.dataset_id = response.id
+            except Exception as e:
+                logger.debug(f"Failed to launch analysis '{result.request.name}': {e}")
+                result.error = e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(submit, [result for result in results if result.succeeded]))
+
+        return results
+
     def stop_analysis(self, project_id: str, dataset_id: str):
         """
         Terminates all jobs related to a running analysis
@@ -137,6 +278,31 @@ class ExecutionService(BaseService):
             client=self._api_client
         )
 
+    def get_tasks_dataframe(self, project_id: str, dataset_id: str, force_live=False) -> 'DataFrame':
+        """
+        Gets the tasks submitted by the workflow execution as a table, with parsed timestamps,
+        queue wait time and duration of each task.
+        See `cirro.helpers.task_analytics` for the columns and for aggregations of the table.
+
+        Args:
+            project_id (str): ID of the Project
+            dataset_id (str): ID of the Dataset
+            force_live (bool): If True, it will try to get the list of jobs
+                from the executor (i.e., AWS Batch), rather than the workflow report
+
+        ```python
+        from cirro.helpers.task_analytics import summarize_by_process, longest_tasks
+
+        tasks = cirro.execution.get_tasks_dataframe("project-id", "dataset-id")
+        print(summarize_by_process(tasks))
+        print(longest_tasks(tasks, n=5))
+        ```
+        """
+        from cirro.helpers.task_analytics import tasks_to_dataframe
+
+        tasks = self.get_tasks_for_execution(project_id, dataset_id, force_live=force_live)
+        return tasks_to_dataframe(tasks or [])
+
     def get_task_logs(self, project_id: str, dataset_id: str, task_id: str, force_live=False) -> str:
         """
         Gets the log output from an individual task
@@ -159,3 +325,148 @@ class ExecutionService(BaseService):
         )
 
         return '\n'.join(e.message for e in resp.events)
+
+    def collect_task_logs(self, project_id: str, dataset_id: str, status: Union[str, List[str]] = None,
+                          name_pattern: str = None, tasks: List[Task] = None, output_dir: PathLike = None,
+                          max_workers=8, force_live=False) -> Dict[str, TaskLogs]:
+        """
+        Fetches the logs of many tasks of an analysis concurrently, e.g. those of the failed tasks.
+        The logs of a task which cannot be fetched are reported in its result, without stopping the others.
+
+        Args:
+            project_id (str): ID of the Project
+            dataset_id (str): ID of the Dataset
+            status (str or List[str]): Only fetch the logs of tasks with this status (e.g. "FAILED")
+            name_pattern (str): Only fetch the logs of tasks whose name matches this pattern (e.g. "*ALIGN*")
+            tasks (List[cirro_api_client.v1.models.Task]): Tasks of the execution,
+             if already retrieved with `get_tasks_for_execution`
+            output_dir (str or Path): Write each log to a file in this directory rather than keeping it in memory
+            max_workers (int): Number of logs fetched at the same time
+            force_live (bool): If True, it will fetch logs from CloudWatch,
+                even if the execution is already completed
+
+        Returns:
+            The logs of each task, by task ID (`native_job_id`)
+
+        ```python
+        results = cirro.execution.collect_task_logs("project-id", "dataset-id", status="FAILED",
+                                                    output_dir="failed-task-logs")
+        for task_id, result in results.items():
+            print(result.task.name, result.path if result.succeeded else result.error)
+        ```
+        """
+        if tasks is None:
+            tasks = self.get_tasks_for_execution(project_id, dataset_id) or []
+        if status is not None:
+            statuses = {s.upper() for s in ([status] if isinstance(status, str) else status)}
+            tasks = [task for task in tasks if task.status.upper() in statuses]
+        if name_pattern is not None:
+            tasks = [task for task in tasks if fnmatch.fnmatch(task.name, name_pattern)]
+
+        if output_dir is not None:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+        def collect(task: Task) -> TaskLogs:
+            result = TaskLogs(task=task)
+            start = time.perf_counter()
+            try:
+                logs = self.get_task_logs(project_id, dataset_id, task.native_job_id, force_live=force_live)
+                if output_dir is not None:
+                    file_name = re.sub(r'[^A-Za-z0-9._-]+', '_', f'{task.name}-{task.native_job_id}')
+                    result.path = Path(output_dir, f'{file_name}.log')
+                    result.path.write_text(logs)
+                else:
+                    result.logs = logs
+            except Exception as e:
+                logger.debug(f"Failed to fetch the logs of task {task.name}: {e}")
+                result.error = e
+            result.elapsed = time.perf_counter() - start
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return {result.task.native_job_id: result for result in executor.map(collect, tasks)}
+
+    def tail_execution_logs(self, project_id: str, dataset_id: str, follow=True, poll_interval: float = 5,
+                            max_poll_interval: float = 60, force_live=False) -> Iterator[LogEntry]:
+        """
+        Yields the events of the main execution log as they are written.
+
+        Only the events which were not yet returned are yielded on each poll.
+        Each poll still fetches the whole log, only the position in it is kept between polls.
+        When following, the log is polled until the analysis has finished
+        (more often while new events arrive, less often while it is quiet).
+
+        Args:
+            project_id (str): ID of the Project
+            dataset_id (str): ID of the Dataset
+            follow (bool): Keep polling for new events until the analysis has finished,
+             otherwise only yield the current events
+            poll_interval (float): Seconds between polls while new events arrive
+            max_poll_interval (float): Maximum seconds between polls while the log is quiet
+            force_live (bool): If True, it will fetch logs from CloudWatch,
+                even if the execution is already completed
+
+        ```python
+        for event in cirro.execution.tail_execution_logs("project-id", "dataset-id"):
+            print(event.message)
+        ```
+        """
+        return self._tail_logs(
+            project_id, dataset_id,
+            fetch=lambda: get_execution_logs.sync(project_id=project_id, dataset_id=dataset_id,
+                                                  force_live=force_live, client=self._api_client),
+            follow=follow, poll_interval=poll_interval, max_poll_interval=max_poll_interval
+        )
+
+    def tail_task_logs(self, project_id: str, dataset_id: str, task_id: str, follow=True, poll_interval: float = 5,
+                       max_poll_interval: float = 60, force_live=False) -> Iterator[LogEntry]:
+        """
+        Yields the events of the log of an individual task as they are written,
+        see `tail_execution_logs`
+
+        Args:
+            project_id (str): ID of the Project
+            dataset_id (str): ID of the Dataset
+            task_id (str): ID of the task
+            follow (bool): Keep polling for new events until the analysis has finished,
+             otherwise only yield the current events
+            poll_interval (float): Seconds between polls while new events arrive
+            max_poll_interval (float): Maximum seconds between polls while the log is quiet
+            force_live (bool): If True, it will fetch logs from CloudWatch,
+                even if the execution is already completed
+        """
+        return self._tail_logs(
+            project_id, dataset_id,
+            fetch=lambda: get_task_logs.sync(project_id=project_id, dataset_id=dataset_id, task_id=task_id,
+                                             force_live=force_live, client=self._api_client),
+            follow=follow, poll_interval=poll_interval, max_poll_interval=max_poll_interval
+        )
+
+    def _tail_logs(self, project_id: str, dataset_id: str, fetch: Callable[[], Optional[GetExecutionLogsResponse]],
+                   follow: bool, poll_interval: float, max_poll_interval: float) -> Iterator[LogEntry]:
+        cursor = _LogCursor()
+        interval = poll_interval
+        while True:
+            # Check whether the analysis has finished before fetching,
+            # so that the last events written before it finished are not missed
+            finished = not follow or self._is_finished(project_id, dataset_id)
+
+            resp = fetch()
+            received = False
+            for event in cursor.new_events(resp.events if resp else []):
+                received = True
+                yield event
+
+            if finished:
+                return
+            interval = poll_interval if received else min(max_poll_interval, interval * 2)
+            time.sleep(interval)
+
+    def _is_finished(self, project_id: str, dataset_id: str) -> bool:
+        try:
+            dataset = get_dataset.sync(project_id=project_id, dataset_id=dataset_id, client=self._api_client)
+        except NotFoundException:
+            # The dataset was deleted, so its logs will not grow any further
+            return True
+        return dataset is None or dataset.status in TERMINAL_STATUSES
@@ -0,0 +1,236 @@
+import logging
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from attrs import define
+from cirro_api_client.v1.errors import NotFoundException
+from cirro_api_client.v1.models import Status
+
+from cirro import CirroApi
+from cirro.models.analysis import ExecutionStatusChange, TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+@define
+class _WatchedExecution:
+    project_id: str
+    dataset_id: str
+    status: Optional[Status] = None
+    interval: float = 0
+    next_check: float = 0
+    errors: int = 0
+    " Consecutive checks which failed"
+
+
+class ExecutionWatcher:
+    """
+    Waits on many analysis executions at once, reporting each change of status.
+
+    Each execution is checked with an adaptive interval: it starts at `min_interval`
+    and grows by `backoff` every time the status is unchanged, up to `max_interval`,
+    returning to `min_interval` as soon as the status changes.
+    A check which fails (e.g. a network error) is logged and retried later with the same backoff,
+    the error is only raised once `max_errors` checks of an execution have failed in a row.
+    When several executions of a project are due to be checked, their statuses are read from
+    the listing of the project's datasets (one or a few calls) rather than one call per dataset.
+
+    ```python
+    from cirro.cirro_client import CirroApi
+    from cirro.services.execution_watcher import ExecutionWatcher
+
+    cirro = CirroApi()
+    watcher = ExecutionWatcher(cirro, on_change=lambda change: print(change))
+    watcher.add_many("project-id", ["dataset-id-1", "dataset-id-2"])
+    statuses = watcher.wait(timeout=3600)
+    ```
+    """
+    def __init__(self, client: CirroApi,
+                 min_interval: float = 10, max_interval: float = 300, backoff: float = 1.5,
+                 group_threshold: int = 3, group_max_datasets: int = 1000, max_errors: int = 5,
+                 on_change: Callable[[ExecutionStatusChange], None] = None):
+        """
+        Args:
+            client (cirro.CirroApi): Cirro API client
+            min_interval (float): Seconds between checks of an execution whose status just changed
+            max_interval (float): Maximum seconds between checks of an execution
+            backoff (float): Factor the interval grows by while the status is unchanged
+            group_threshold (int): Minimum number of executions of a project due at the same time
+             for their statuses to be read from the dataset listing
+            group_max_datasets (int): Maximum number of the project's most recent datasets read from the listing,
+             the executions which are not among them are checked one by one
+            max_errors (int): Consecutive failed checks of an execution before giving up (raising the error)
+            on_change: Called with each change of status (including the first status seen)
+        """
+        self._client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.group_threshold = group_threshold
+        self.group_max_datasets = group_max_datasets
+        self.max_errors = max_errors
+        self._callbacks: List[Callable[[ExecutionStatusChange], None]] = [on_change] if on_change else []
+        self._executions: Dict[Tuple[str, str], _WatchedExecution] = {}
+        self._clock = time.monotonic
+        self._sleep = time.sleep
+
+    def add(self, project_id: str, dataset_id: str):
+        """
+        Starts watching the execution which creates the dataset
+        """
+        key = (project_id, dataset_id)
+        if key not in self._executions:
+            self._executions[key] = _WatchedExecution(project_id=project_id, dataset_id=dataset_id,
+                                                      interval=self.min_interval, next_check=self._clock())
+
+    def add_many(self, project_id: str, dataset_ids: List[str]):
+        """
+        Starts watching several executions of a project
+        """
+        for dataset_id in dataset_ids:
+            self.add(project_id, dataset_id)
+
+    def remove(self, project_id: str, dataset_id: str):
+        """
+        Stops watching an execution
+        """
+        self._executions.pop((project_id, dataset_id), None)
+
+    def add_callback(self, callback: Callable[[ExecutionStatusChange], None]):
+        """
+        Registers a function which is called with each change of status
+        """
+        self._callbacks.append(callback)
+
+    @property
+    def statuses(self) -> Dict[str, Optional[Status]]:
+        """
+        Last known status of each execution, by dataset ID (None until it is first checked)
+        """
+        return {execution.dataset_id: execution.status for execution in self._executions.values()}
+
+    @property
+    def pending(self) -> List[str]:
+        """
+        IDs of the datasets whose execution has not finished yet
+        """
+        return [execution.dataset_id for execution in self._executions.values()
+                if execution.status not in TERMINAL_STATUSES]
+
+    def poll(self) -> List[ExecutionStatusChange]:
+        """
+        Checks the executions which are due, returns the changes of status
+
+        Raises:
+            Exception: The last error, once `max_errors` checks of an execution have failed in a row
+        """
+        now = self._clock()
+        due_by_project: Dict[str, List[_WatchedExecution]] = {}
+        for execution in self._executions.values():
+            if execution.status not in TERMINAL_STATUSES and execution.next_check <= now:
+                due_by_project.setdefault(execution.project_id, []).append(execution)
+
+        changes = []
+        for project_id, due in due_by_project.items():
+            for execution, status in self._get_statuses(project_id, due):
+                change = self._observe(execution, status)
+                if change is not None:
+                    changes.append(change)
+        return changes
+
+    def watch(self, timeout: float = None) -> Iterator[ExecutionStatusChange]:
+        """
+        Yields the changes of status until every execution has finished
+
+        Args:
+            timeout (float): Stop after this many seconds, even if some executions are still running
+        """
+        deadline = self._clock() + timeout if timeout is not None else None
+        while self.pending:
+            yield from self.poll()
+            if not self.pending:
+                return
+
+            next_check = min(execution.next_check for execution in self._executions.values()
+                             if execution.status not in TERMINAL_STATUSES)
+            if deadline is not None:
+                if self._clock() >= deadline:
+                    return
+                next_check = min(next_check, deadline)
+            delay = next_check - self._clock()
+            if delay > 0:
+                self._sleep(delay)
+
+    def wait(self, timeout: float = None) -> Dict[str, Optional[Status]]:
+        """
+        Waits until every execution has finished, returns the status of each one by dataset ID
+
+        Args:
+            timeout (float): Stop waiting after this many seconds, even if some executions are still running
+        """
+        for _ in self.watch(timeout=timeout):
+            pass
+        return self.statuses
+
+    def _get_statuses(self, project_id: str,
+                      due: List[_WatchedExecution]) -> List[Tuple[_WatchedExecution, Optional[Status]]]:
+        # Executions whose check failed are left out, and will be checked again later
+        remaining = {execution.dataset_id: execution for execution in due}
+        statuses = []
+        if len(due) >= self.group_threshold:
+            # Stop reading pages once every execution due has been seen, recent datasets are usually
+            # on the first page. The listing is bounded, in case a dataset is missing from it
+            try:
+                for dataset in self._client.datasets.iter_datasets(project_id, max_items=self.group_max_datasets):
+                    execution = remaining.pop(dataset.id, None)
+                    if execution is not None:
+                        statuses.append((execution, dataset.status))
+                        if not remaining:
+                            break
+            except Exception as e:
+                logger.warning(f"Failed to list the datasets of project {project_id}: {e}")
+
+        for execution in remaining.values():
+            try:
+                statuses.append((execution, self._get_status(execution)))
+            except Exception as e:
+                self._on_error(execution, e)
+        return statuses
+
+    def _get_status(self, execution: _WatchedExecution) -> Optional[Status]:
+        # A dataset which cannot be found has been deleted
+        try:
+            dataset = self._client.datasets.get(project_id=execution.project_id, dataset_id=execution.dataset_id)
+        except NotFoundException:
+            return Status.DELETED
+        return dataset.status
+
+    def _on_error(self, execution: _WatchedExecution, error: Exception):
+        execution.errors += 1
+        if execution.errors >= self.max_errors:
+            raise error
+        execution.interval = min(self.max_interval, execution.interval * self.backoff)
+        execution.next_check = self._clock() + execution.interval
+        logger.warning(f"Failed to check the status of dataset {execution.dataset_id} "
+                       f"({execution.errors} of {self.max_errors} attempts), "
+                       f"retrying in {execution.interval:.0f}s: {error}")
+
+    def _observe(self, execution: _WatchedExecution, status: Status) -> Optional[ExecutionStatusChange]:
+        now = self._clock()
+        execution.errors = 0
+        if status == execution.status:
+            execution.interval = min(self.max_interval, execution.interval * self.backoff)
+            execution.next_check = now + execution.interval
+            return None
+
+        change = ExecutionStatusChange(project_id=execution.project_id, dataset_id=execution.dataset_id,
+                                       previous_status=execution.status, status=status)
+        execution.status = status
+        execution.interval = self.min_interval
+        execution.next_check = now + execution.interval
+        for callback in self._callbacks:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.warning(f"Execution watcher callback failed: {e}")
+        return change
@@ -1,18 +1,23 @@
 import logging
-import threading
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from typing import List, Dict
+from typing import List, Dict, TYPE_CHECKING
 
-from botocore.client import BaseClient
 from cirro_api_client import CirroApiClient
-from cirro_api_client.v1.api.file import generate_project_file_access_token
-from cirro_api_client.v1.models import AWSCredentials, ProjectAccessType
+from cirro_api_client.v1.models import AWSCredentials
 
-from cirro.clients.s3 import S3Client
 from cirro.file_utils import upload_directory, download_directory, get_checksum
+from cirro.instrumentation.base import HookDispatcher
 from cirro.models.file import FileAccessContext, File, PathLike
+from cirro.models.s3_path import S3Path
 from cirro.services.base import BaseService
+from cirro.services.cache import MetadataCache
+from cirro.services.file_credentials import FileCredentialManager
+from cirro.utils import TransferLimiter
+
+if TYPE_CHECKING:
+    from botocore.client import BaseClient
+    from cirro.clients.s3 import S3Client
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +28,26 @@ class FileService(BaseService):
     """
     checksum_method: str
     transfer_retries: int
-    _get_token_lock = threading.Lock()
-    _read_token_cache: Dict[str, AWSCredentials] = {}
+    credential_manager: FileCredentialManager
+    hooks: HookDispatcher
 
-    def __init__(self, api_client, checksum_method, transfer_retries):
+    def __init__(self, api_client, checksum_method, transfer_retries,
+                 credential_manager: FileCredentialManager = None,
+                 hooks: HookDispatcher = None):
         """
         Instantiates the file service class
+
+        Args:
+            credential_manager (cirro.services.file_credentials.FileCredentialManager): Optional cache
+             of file access credentials, may be shared with other file services
+            hooks (cirro.instrumentation.HookDispatcher): Optional instrumentation hooks
+             which receive an event for each S3 operation
         """
         self._api_client = api_client
         self.checksum_method = checksum_method
         self.transfer_retries = transfer_retries
+        self.credential_manager = credential_manager if credential_manager is not None else FileCredentialManager()
+        self.hooks = hooks if hooks is not None else HookDispatcher()
 
     def get_access_credentials(self, access_context: FileAccessContext) -> AWSCredentials:
         """
@@ -41,39 +56,9 @@ class FileService(BaseService):
         Args:
             access_context (cirro.models.file.FileAccessContext): File access context, use class methods to generate
         """
-        access_request = access_context.file_access_request
-
-        if access_request.access_type == ProjectAccessType.PROJECT_DOWNLOAD:
-            return self._get_project_read_credentials(access_context)
-
-        else:
-            return generate_project_file_access_token.sync(
-                client=self._api_client,
-                project_id=access_context.project_id,
-                body=access_context.file_access_request
-            )
+        return self.credential_manager.get_credentials(self._api_client, access_context)
 
-    def _get_project_read_credentials(self, access_context: FileAccessContext):
-        """
-        Retrieves credentials to read project data, this can be cached
-        """
-        access_request = access_context.file_access_request
-        project_id = access_context.project_id
-        with self._get_token_lock:
-            cached_token = self._read_token_cache.get(project_id)
-
-            if not cached_token or datetime.now(tz=timezone.utc) > cached_token.expiration:
-                new_token = generate_project_file_access_token.sync(
-                    client=self._api_client,
-                    project_id=project_id,
-                    body=access_request
-                )
-
-                self._read_token_cache[project_id] = new_token
-
-        return self._read_token_cache[project_id]
-
-    def get_aws_s3_client(self, access_context: FileAccessContext) -> BaseClient:
+    def get_aws_s3_client(self, access_context: FileAccessContext) -> 'BaseClient':
         """
         Gets the underlying AWS S3 client to perform operations on files
 
@@ -137,7 +122,8 @@ class FileService(BaseService):
                      access_context: FileAccessContext,
                      directory: PathLike,
                      files: List[PathLike],
-                     file_path_map: Dict[PathLike, str]) -> None:
+                     file_path_map: Dict[PathLike, str],
+                     transfer_limiter: TransferLimiter = None) -> None:
         """
         Uploads a list of files from the specified directory
 
@@ -148,6 +134,8 @@ class FileService(BaseService):
                 must be the same type as directory.
             file_path_map (typing.Dict[str|Path, str]): Optional mapping of file paths to upload
              from source path to destination path, used to "re-write" paths within the dataset.
+            transfer_limiter (cirro.utils.TransferLimiter): Optional limit on the bytes uploaded at the same time,
+             shared with other uploads
         """
         s3_client = self._generate_s3_client(access_context)
 
@@ -158,9 +146,60 @@ class FileService(BaseService):
             s3_client=s3_client,
             bucket=access_context.bucket,
             prefix=access_context.prefix,
-            max_retries=self.transfer_retries
+            max_retries=self.transfer_retries,
+            transfer_limiter=transfer_limiter
         )
 
+    def copy_files(self,
+                   files: List[File],
+                   access_context: FileAccessContext,
+                   file_path_map: Dict[str, str],
+                   max_workers=8) -> None:
+        """
+        Copies files already stored in Cirro to another location (e.g. the upload location of a new dataset)
+        within S3, the contents of the files are not transferred through this machine.
+
+        The copies are made with the credentials of the destination,
+        which must also be allowed to read the files (e.g. datasets of the same project).
+
+        Args:
+            files (typing.List[cirro.models.file.File]): Files to copy
+            access_context (cirro.models.file.FileAccessContext): File access context of the destination
+            file_path_map (typing.Dict[str, str]): Destination path of each file (by its absolute path),
+             relative to the destination, see `cirro.services.dataset.get_copy_destinations`
+            max_workers (int): Number of files copied at the same time
+        """
+        s3_client = self._generate_s3_client(access_context)
+
+        # Files from the same dataset share one client to read them
+        source_clients: Dict[tuple, 'S3Client'] = {}
+        for file in files:
+            key = self._get_source_key(file)
+            if key not in source_clients:
+                source_clients[key] = self._generate_s3_client(file.access_context)
+
+        def copy(file: File):
+            source = S3Path(file.absolute_path)
+            destination = file_path_map.get(file.absolute_path, file.relative_path)
+            try:
+                s3_client.copy_file(source_bucket=source.bucket, source_key=source.key,
+                                    bucket=access_context.bucket, key=f'{access_context.prefix}/{destination}',
+                                    source_client=source_clients[self._get_source_key(file)])
+            except Exception as e:
+                logger.debug(f"Failed to copy {file.absolute_path}: {e}")
+                return f'{file.relative_path}: {e}'
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            errors = [error for error in executor.map(copy, files) if error]
+        if errors:
+            raise RuntimeError(f"Failed to copy {len(errors)} of {len(files)} files:\n" + "\n".join(errors))
+
+    @staticmethod
+    def _get_source_key(file: File) -> tuple:
+        access_request = file.access_context.file_access_request
+        return (file.access_context.project_id, str(access_request.access_type),
+                str(access_request.dataset_id), file.access_context.bucket)
+
     def download_files(self, access_context: FileAccessContext, directory: str, files: List[str]) -> None:
         """
         Download a list of files to the specified directory
@@ -234,13 +273,16 @@ class FileService(BaseService):
         logger.debug(f"File stats for file {file.relative_path} is {stats}")
         return stats
 
-    def _generate_s3_client(self, access_context: FileAccessContext):
+    def _generate_s3_client(self, access_context: FileAccessContext) -> 'S3Client':
         """
         Generates the Cirro-S3 client to perform operations on files
         """
+        # boto3 is slow to import, so only load it once a transfer is needed
+        from cirro.clients.s3 import S3Client
         return S3Client(
             partial(self.get_access_credentials, access_context),
-            self.checksum_method
+            self.checksum_method,
+            hooks=self.hooks
         )
 
 
@@ -250,6 +292,6 @@ class FileEnabledService(BaseService):
     """
     _file_service: FileService
 
-    def __init__(self, api_client: CirroApiClient, file_service: FileService):
-        super().__init__(api_client)
+    def __init__(self, api_client: CirroApiClient, file_service: FileService, cache: MetadataCache = None):
+        super().__init__(api_client, cache=cache)
         self._file_service = file_service
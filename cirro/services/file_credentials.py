@@ -0,0 +1,169 @@
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Tuple, Optional, NamedTuple
+
+from cirro_api_client import CirroApiClient
+from cirro_api_client.v1.api.file import generate_project_file_access_token
+from cirro_api_client.v1.models import AWSCredentials
+
+from cirro.models.file import FileAccessContext
+
+logger = logging.getLogger(__name__)
+
+CredentialKey = Tuple[str, str, str, Optional[str], Optional[int]]
+
+
+class _CachedCredentials(NamedTuple):
+    credentials: AWSCredentials
+    refresh_at: Optional[datetime]
+
+
+class FileCredentialManager:
+    """
+    Caches the temporary AWS credentials used to access files, and refreshes them ahead of expiry.
+
+    Credentials are cached separately for each Cirro instance (base URL), project,
+    access type (download, shared dataset download, upload, etc.) and dataset.
+    Once a token is close to expiring, the cached value is still returned
+    while a new one is requested on a background thread, so transfers never wait on the API
+    unless the token has fully expired. Expired tokens are evicted from the cache.
+
+    Each `cirro.services.FileService` has its own manager by default. A manager is thread-safe and can be
+    shared between file services (including ones for different Cirro instances)
+    as long as they are authenticated as the same user.
+    """
+    refresh_margin = timedelta(minutes=20)
+    """ Refresh this long before expiry (greater than the 15 minute advisory refresh window of botocore) """
+    max_entries = 1000
+    """ Maximum number of credentials to cache, the ones expiring soonest are evicted first """
+
+    def __init__(self, refresh_margin: timedelta = None, max_entries: int = None):
+        if refresh_margin is not None:
+            self.refresh_margin = refresh_margin
+        if max_entries is not None:
+            self.max_entries = max_entries
+        self._cache: Dict[CredentialKey, _CachedCredentials] = {}
+        self._cache_lock = threading.Lock()
+        self._key_locks: Dict[CredentialKey, threading.Lock] = {}
+        self._refreshing = set()
+
+    def get_credentials(self, api_client: CirroApiClient, access_context: FileAccessContext) -> AWSCredentials:
+        """
+        Gets credentials for the access context, using the cache where possible
+
+        Args:
+            api_client (cirro_api_client.CirroApiClient): Client used to request new credentials
+            access_context (cirro.models.file.FileAccessContext): File access context
+        """
+        key = self._get_key(api_client, access_context)
+        cached = self._get_cached(key)
+        now = datetime.now(tz=timezone.utc)
+
+        if cached and not self._is_expired(cached.credentials, now):
+            if cached.refresh_at and now >= cached.refresh_at:
+                self._refresh_in_background(key, api_client, access_context)
+            return cached.credentials
+
+        # Only one thread requests a token for a given key, the others wait and re-use it
+        with self._get_key_lock(key):
+            cached = self._get_cached(key)
+            if cached and not self._is_expired(cached.credentials, datetime.now(tz=timezone.utc)):
+                return cached.credentials
+            return self._fetch(key, api_client, access_context)
+
+    def clear(self):
+        """
+        Removes all cached credentials
+        """
+        with self._cache_lock:
+            self._cache.clear()
+
+    def __len__(self):
+        with self._cache_lock:
+            return len(self._cache)
+
+    @staticmethod
+    def _get_key(api_client: CirroApiClient, access_context: FileAccessContext) -> CredentialKey:
+        access_request = access_context.file_access_request
+        dataset_id = access_request.dataset_id if isinstance(access_request.dataset_id, str) else None
+        token_lifetime = access_request.token_lifetime_hours \
+            if isinstance(access_request.token_lifetime_hours, int) else None
+        return (
+            str(api_client._base_url),
+            access_context.project_id,
+            str(access_request.access_type),
+            dataset_id,
+            token_lifetime
+        )
+
+    @staticmethod
+    def _is_expired(credentials: AWSCredentials, now: datetime) -> bool:
+        return bool(credentials.expiration) and now >= credentials.expiration
+
+    def _get_cached(self, key: CredentialKey) -> Optional[_CachedCredentials]:
+        with self._cache_lock:
+            return self._cache.get(key)
+
+    def _get_key_lock(self, key: CredentialKey) -> threading.Lock:
+        with self._cache_lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _fetch(self, key: CredentialKey, api_client: CirroApiClient,
+               access_context: FileAccessContext) -> AWSCredentials:
+        fetched_at = datetime.now(tz=timezone.utc)
+        credentials = generate_project_file_access_token.sync(
+            client=api_client,
+            project_id=access_context.project_id,
+            body=access_context.file_access_request
+        )
+
+        refresh_at = None
+        if credentials.expiration:
+            # Short-lived tokens are refreshed half-way through their lifetime
+            margin = min(self.refresh_margin, (credentials.expiration - fetched_at) / 2)
+            refresh_at = credentials.expiration - margin
+
+        with self._cache_lock:
+            self._cache[key] = _CachedCredentials(credentials=credentials, refresh_at=refresh_at)
+            self._evict(datetime.now(tz=timezone.utc))
+        return credentials
+
+    def _evict(self, now: datetime):
+        # precondition: self._cache_lock is held
+        expired = [key for key, cached in self._cache.items() if self._is_expired(cached.credentials, now)]
+        for key in expired:
+            del self._cache[key]
+
+        overflow = len(self._cache) - self.max_entries
+        if overflow > 0:
+            max_datetime = datetime.max.replace(tzinfo=timezone.utc)
+            by_expiry = sorted(self._cache.items(),
+                               key=lambda item: item[1].credentials.expiration or max_datetime)
+            for key, _ in by_expiry[:overflow]:
+                del self._cache[key]
+
+        # Drop the locks of evicted keys, unless a fetch is currently using them
+        for key in list(self._key_locks.keys()):
+            if key not in self._cache and key not in self._refreshing and not self._key_locks[key].locked():
+                del self._key_locks[key]
+
+    def _refresh_in_background(self, key: CredentialKey, api_client: CirroApiClient,
+                               access_context: FileAccessContext):
+        with self._cache_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                with self._get_key_lock(key):
+                    self._fetch(key, api_client, access_context)
+            except Exception as e:
+                # The current credentials are still valid, a synchronous fetch happens once they expire
+                logger.warning(f"Failed to refresh file access credentials: {e}")
+            finally:
+                with self._cache_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
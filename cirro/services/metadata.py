@@ -1,10 +1,27 @@
-from typing import List
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import List, Iterator, Iterable, Union, Dict, Any, Optional, TYPE_CHECKING
 
 from cirro_api_client.v1.api.metadata import get_project_samples, get_project_schema, update_project_schema, \
     update_sample
-from cirro_api_client.v1.models import FormSchema, SampleRequest, Sample
+from cirro_api_client.v1 import errors
+from cirro_api_client.v1.models import FormSchema, SampleRequest, Sample, SampleRequestMetadata
+from cirro_api_client.v1.types import Unset
 
-from cirro.services.base import BaseService, get_all_records
+from cirro.models.sample import SampleUpdate
+from cirro.services.base import BaseService, iter_records, PageArgs, PageResp
+from cirro.utils import RateLimiter
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+_ID_KEYS = ('id', 'sample_id')
+_NAME_KEYS = ('name', 'sample')
+_SAMPLE_COLUMNS = {'id': 'id', 'name': 'name', 'datasetIds': 'dataset_ids',
+                   'createdAt': 'created_at', 'updatedAt': 'updated_at'}
 
 
 class MetadataService(BaseService):
@@ -19,14 +36,114 @@ class MetadataService(BaseService):
             project_id (str): ID of the Project
             max_items (int): Maximum number of records to get (default 10,000)
         """
-        return get_all_records(
+        return list(self.iter_project_samples(project_id, max_items=max_items))
+
+    def iter_project_samples(self, project_id: str, max_items: int = None,
+                             prefetch: bool = False) -> Iterator[Sample]:
+        """
+        Iterates over the samples of a project along with their metadata,
+        requesting them page by page as the iterator is consumed
+
+        Args:
+            project_id (str): ID of the Project
+            max_items (int): Maximum number of records to get (default: all)
+            prefetch (bool): Request the next page in the background while the current one is processed
+        """
+        return iter_records(
             records_getter=lambda page_args: get_project_samples.sync(project_id=project_id,
                                                                       client=self._api_client,
                                                                       next_token=page_args.next_token,
                                                                       limit=page_args.limit),
-            max_items=max_items
+            max_items=max_items,
+            prefetch=prefetch
         )
 
+    def get_samples_dataframe(self, project_id: str, max_items: int = None) -> 'DataFrame':
+        """
+        Retrieves the samples of a project as a table, with one row per sample
+        and one column per metadata field (besides `id`, `name`, `dataset_ids`, `created_at` and `updated_at`).
+
+        The columns are typed according to the metadata schema of the project
+        (text, integer, number, boolean, categorical for fields with a list of allowed values, dates),
+        and inferred from the values for fields which are not in the schema.
+        The pages of samples are read directly into columns, without creating a `Sample` object for each one.
+        Metadata fields with the same name as a built-in column are renamed `metadata_<field>`
+        (with as many `metadata_` prefixes as needed for the name to be unique).
+        Values which are not among the allowed values of a field are kept, as text.
+        Use `DataFrame.to_parquet` to save it in a columnar (Arrow) format.
+
+        Args:
+            project_id (str): ID of the Project
+            max_items (int): Maximum number of records to get (default: all)
+        """
+        import pandas as pd
+
+        schema = self.get_project_schema(project_id)
+        columns: Dict[str, list] = {column: [] for column in _SAMPLE_COLUMNS.values()}
+        # Column of each metadata field, and field of each metadata column (they differ if it was renamed)
+        field_columns: Dict[str, str] = {}
+        fields: Dict[str, str] = {}
+        rows = 0
+        for record in iter_records(lambda page_args: self._get_samples_page(project_id, page_args),
+                                   max_items=max_items, prefetch=True):
+            for key, column in _SAMPLE_COLUMNS.items():
+                columns[column].append(record.get(key))
+            for key, value in (record.get('metadata') or {}).items():
+                column = field_columns.get(key)
+                if column is None:
+                    column = key
+                    while column in columns:
+                        column = f'metadata_{column}'
+                    field_columns[key] = column
+                    fields[column] = key
+                # Metadata fields only set on some samples are missing in the previous rows
+                columns.setdefault(column, [None] * rows).append(value)
+            rows += 1
+            for values in columns.values():
+                if len(values) < rows:
+                    values.append(None)
+
+        df = pd.DataFrame(columns)
+        for column in ('created_at', 'updated_at'):
+            df[column] = pd.to_datetime(df[column], utc=True, format='ISO8601')
+
+        properties = _get_schema_properties(schema)
+        for column in df.columns[len(_SAMPLE_COLUMNS):]:
+            dtype = _get_dtype(properties.get(fields[column]))
+            try:
+                if isinstance(dtype, pd.CategoricalDtype):
+                    # Converting to the categories would silently replace the other values by missing values
+                    values = df[column]
+                    unknown = values[values.notna() & ~values.isin(dtype.categories)]
+                    if not unknown.empty:
+                        logger.warning(f"Metadata field {column} has values which are not allowed by the schema "
+                                       f"(e.g. {unknown.iloc[0]}), it is read as text")
+                        dtype = 'string'
+                if dtype == 'datetime':
+                    df[column] = pd.to_datetime(df[column], utc=True, format='ISO8601')
+                elif dtype is not None:
+                    df[column] = df[column].astype(dtype)
+                else:
+                    df[column] = df[column].convert_dtypes()
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Could not convert metadata field {column} to {dtype}: {e}")
+        return df
+
+    def _get_samples_page(self, project_id: str, page_args: PageArgs) -> PageResp:
+        # Reads the JSON of the page rather than parsing every sample into a model
+        client = self._api_client
+        response = client.get_httpx_client().request(
+            auth=client.get_auth(),
+            **get_project_samples._get_kwargs(project_id=project_id,
+                                              limit=page_args.limit,
+                                              next_token=page_args.next_token)
+        )
+        if response.status_code != HTTPStatus.OK:
+            # There is no page to return, so unexpected statuses are raised too
+            errors.handle_error_response(response, raise_on_unexpected_status=True)
+        page = response.json()
+        return PageResp(data=page['data'], next_token=page.get('nextToken'))
+
     def get_project_schema(self, project_id: str) -> FormSchema:
         """
         Get project metadata schema
@@ -61,3 +178,141 @@ class MetadataService(BaseService):
             body=sample,
             client=self._api_client
         )
+
+    def update_samples(self, project_id: str,
+                       updates: Union['DataFrame', Iterable[Union[Dict[str, Any], SampleRequest]]],
+                       max_workers=8, max_rate: float = None) -> List[SampleUpdate]:
+        """
+        Updates the metadata of many samples.
+
+        Each update identifies a sample by its ID (an `id` or `sample_id` column/key)
+        or its name (a `name` or `sample` column/key), and the other columns/keys are metadata values.
+        The values are merged into the current metadata of the sample, missing values (`NaN` / `None`) are ignored.
+        The current metadata of the project's samples is fetched once,
+        and only the samples whose metadata would change are sent, concurrently.
+        An update which fails does not stop the others, check the result of each one instead.
+
+        Args:
+            project_id (str): ID of the Project
+            updates (DataFrame or Iterable[dict or cirro_api_client.v1.models.SampleRequest]): Metadata of the samples,
+             e.g. a metadata sheet read with `pandas.read_csv`
+            max_workers (int): Number of samples updated at the same time
+            max_rate (float): Maximum number of samples updated per second (None for no limit)
+
+        Returns:
+            The outcome of each update, in the same order
+
+        ```python
+        import pandas as pd
+
+        sheet = pd.read_csv("samplesheet.csv")  # columns: sample, tissue, timepoint
+        results = cirro.metadata.update_samples("project-id", sheet)
+        print(sum(result.changed for result in results), "samples updated")
+        for result in results:
+            if not result.succeeded:
+                print(f"{result.name}: {result.error}")
+        ```
+        """
+        samples = list(self.iter_project_samples(project_id))
+        samples_by_id = {sample.id: sample for sample in samples}
+        samples_by_name: Dict[str, List[Sample]] = {}
+        for sample in samples:
+            samples_by_name.setdefault(sample.name, []).append(sample)
+
+        results = []
+        pending = []
+        for update in _iter_updates(updates):
+            sample_id = next((update.pop(key) for key in _ID_KEYS if key in update), None)
+            name = next((update.pop(key) for key in _NAME_KEYS if key in update), None)
+            result = SampleUpdate(name=str(name or sample_id), metadata=update)
+            results.append(result)
+
+            if sample_id is not None:
+                sample = samples_by_id.get(sample_id)
+            else:
+                matches = samples_by_name.get(name, [])
+                if len(matches) > 1:
+                    result.error = ValueError(f"Multiple samples are named {name}, update them by ID")
+                    continue
+                sample = matches[0] if matches else None
+            if sample is None:
+                result.error = ValueError(f"Sample {name or sample_id} not found in project {project_id}")
+                continue
+
+            result.name = sample.name
+            result.sample_id = sample.id
+            current = _get_metadata(sample)
+            merged = {**current, **update}
+            if merged != current:
+                result.changed = True
+                pending.append((result, SampleRequest(name=sample.name,
+                                                      metadata=SampleRequestMetadata.from_dict(merged))))
+
+        rate_limiter = RateLimiter(max_rate)
+
+        def send(item):
+            result, request = item
+            rate_limiter.acquire()
+            try:
+                result.sample = self.update_sample(project_id, result.sample_id, request)
+            except Exception as e:
+                logger.debug(f"Failed to update sample {result.name}: {e}")
+                result.error = e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(send, pending))
+
+        return results
+
+
+def _get_schema_properties(schema: Optional[FormSchema]) -> Dict[str, Dict[str, Any]]:
+    if schema is None or isinstance(schema.form, Unset):
+        return {}
+    return schema.form.to_dict().get('properties') or {}
+
+
+def _get_dtype(field_schema: Optional[Dict[str, Any]]):
+    """
+    Gets the pandas type of a metadata field from its JSON schema (None to infer it from the values)
+    """
+    import pandas as pd
+
+    if not field_schema:
+        return None
+    field_type = field_schema.get('type')
+    if field_schema.get('enum'):
+        return pd.CategoricalDtype(field_schema['enum'])
+    if field_type == 'integer':
+        return 'Int64'
+    if field_type == 'number':
+        return 'Float64'
+    if field_type == 'boolean':
+        return 'boolean'
+    if field_type == 'string':
+        return 'datetime' if field_schema.get('format') in ('date', 'date-time') else 'string'
+    return None
+
+
+def _iter_updates(updates) -> Iterator[Dict[str, Any]]:
+    if hasattr(updates, 'to_dict') and hasattr(updates, 'columns'):
+        updates = updates.to_dict(orient='records')
+    for update in updates:
+        if isinstance(update, SampleRequest):
+            update = {'name': update.name, **update.metadata.to_dict()}
+        yield {key: _to_python(value) for key, value in update.items() if not _is_missing(value)}
+
+
+def _is_missing(value) -> bool:
+    # NaN is the only value which is not equal to itself
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _to_python(value):
+    # Numpy scalars from a DataFrame are converted to be serialized as JSON
+    return value.item() if hasattr(value, 'item') and not isinstance(value, (str, bytes)) else value
+
+
+def _get_metadata(sample: Sample) -> Dict[str, Any]:
+    if sample.metadata is None or isinstance(sample.metadata, Unset):
+        return {}
+    return sample.metadata.to_dict()
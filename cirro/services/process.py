@@ -1,3 +1,4 @@
+import logging
 from pathlib import Path
 from typing import List, Optional
 
@@ -7,9 +8,12 @@ from cirro_api_client.v1.api.processes import get_processes, get_process, get_pr
 from cirro_api_client.v1.models import ValidateFileRequirementsRequest, Executor, Process, ProcessDetail, \
     CustomPipelineSettings, CustomProcessInput, CreateResponse
 
+from cirro.models.file_mapping import FileMappingValidator, FileMappingReport
 from cirro.models.form_specification import ParameterSpecification
 from cirro.services.base import BaseService
 
+logger = logging.getLogger(__name__)
+
 
 class ProcessService(BaseService):
     """
@@ -22,7 +26,7 @@ class ProcessService(BaseService):
         Args:
             process_type (`cirro_api_client.v1.models.Executor`): Optional process type (INGEST, CROMWELL, or NEXTFLOW)
         """
-        processes = get_processes.sync(client=self._api_client)
+        processes = self._cached('processes', lambda: get_processes.sync(client=self._api_client), model=Process)
         return [p for p in processes if not process_type or process_type == p.executor]
 
     def get(self, process_id: str) -> ProcessDetail:
@@ -32,7 +36,9 @@ class ProcessService(BaseService):
         Args:
             process_id (str): Process ID
         """
-        return get_process.sync(process_id=process_id, client=self._api_client)
+        return self._cached(f'processes/{process_id}',
+                            lambda: get_process.sync(process_id=process_id, client=self._api_client),
+                            model=ProcessDetail)
 
     def archive(self, process_id: str):
         """
@@ -45,6 +51,7 @@ class ProcessService(BaseService):
             process_id (str): Process ID
         """
         archive_custom_process.sync_detailed(process_id=process_id, client=self._api_client)
+        self._invalidate_cache('processes')
 
     def find_by_name(self, name: str) -> Optional[ProcessDetail]:
         """
@@ -69,7 +76,28 @@ class ProcessService(BaseService):
         form_spec = get_process_parameters.sync(process_id=process_id, client=self._api_client)
         return ParameterSpecification(form_spec)
 
-    def check_dataset_files(self, files: List[str], process_id: str, directory: str):
+    def get_file_mapping_validator(self, process_id: str) -> FileMappingValidator:
+        """
+        Gets a validator which checks files against the file mapping rules of a process locally
+
+        Args:
+            process_id (str): Process ID
+        """
+        return FileMappingValidator(self.get(process_id).file_mapping_rules)
+
+    def validate_dataset_files(self, files: List[str], process_id: str) -> FileMappingReport:
+        """
+        Checks the list of files against the file mapping rules of a process without sending them to the server,
+        reporting the files which do not match any rule and the samples inferred from the file names
+
+        Args:
+            files (List[str]): File names to check
+            process_id (str): ID for the process containing the file mapping rules
+        """
+        return self.get_file_mapping_validator(process_id).validate(files)
+
+    def check_dataset_files(self, files: List[str], process_id: str, directory: Optional[str],
+                            validate_locally=True):
         """
         Checks if the file mapping rules for a process are met by the list of files
 
@@ -78,13 +106,23 @@ class ProcessService(BaseService):
 
         Args:
             process_id (str): ID for the process containing the file mapping rules
-            directory: path to directory containing files
+            directory: path to directory containing files (None if the files are not local)
             files (List[str]): File names to check
+            validate_locally (bool): Also check the files against the rules locally (see `validate_dataset_files`),
+             logging the problems found as warnings. The server check decides whether the files are valid
         """
+        if validate_locally:
+            report = self.validate_dataset_files(files, process_id)
+            if report.unmatched_files:
+                logger.warning(f"{len(report.unmatched_files)} file(s) do not match the naming conventions "
+                               f"of the data type, e.g. {report.unmatched_files[0]}")
+            for error in report.errors:
+                logger.warning(error)
+
         # Parse sample sheet file if present
         sample_sheet = None
-        sample_sheet_file = Path(directory, 'samplesheet.csv')
-        if sample_sheet_file.exists():
+        sample_sheet_file = Path(directory, 'samplesheet.csv') if directory is not None else None
+        if sample_sheet_file is not None and sample_sheet_file.exists():
             sample_sheet = sample_sheet_file.read_text()
 
         request = ValidateFileRequirementsRequest(
@@ -210,7 +248,9 @@ class ProcessService(BaseService):
         cirro.processes.create_custom_process(new_data_type)
         ```
         """
-        return create_custom_process.sync(client=self._api_client, body=process)
+        response = create_custom_process.sync(client=self._api_client, body=process)
+        self._invalidate_cache('processes')
+        return response
 
     def update_custom_process(self, process_id: str, process: CustomProcessInput):
         """
@@ -225,6 +265,7 @@ class ProcessService(BaseService):
         update_custom_process.sync_detailed(client=self._api_client,
                                             process_id=process_id,
                                             body=process)
+        self._invalidate_cache('processes')
 
     def sync_custom_process(self, process_id: str) -> CustomPipelineSettings:
         """
@@ -237,4 +278,6 @@ class ProcessService(BaseService):
         Args:
             process_id (str): ID of the process to sync
         """
-        return sync_custom_process.sync(client=self._api_client, process_id=process_id)
+        settings = sync_custom_process.sync(client=self._api_client, process_id=process_id)
+        self._invalidate_cache('processes')
+        return settings
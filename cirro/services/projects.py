@@ -3,7 +3,7 @@ from typing import List, Optional
 from cirro_api_client.v1.api.projects import get_projects, create_project, get_project, set_user_project_role, \
     update_project, update_project_tags, get_project_users, archive_project, unarchive_project
 from cirro_api_client.v1.models import SetUserProjectRoleRequest, Tag, ProjectRole, ProjectDetail, \
-    CreateResponse, ProjectUser, ProjectInput
+    CreateResponse, ProjectUser, ProjectInput, Project
 
 from cirro.services.base import BaseService
 
@@ -12,11 +12,11 @@ class ProjectService(BaseService):
     """
     Service for interacting with the Project endpoints
     """
-    def list(self):
+    def list(self) -> List[Project]:
         """
         Retrieve a list of projects
         """
-        return get_projects.sync(client=self._api_client)
+        return self._cached('projects', lambda: get_projects.sync(client=self._api_client), model=Project)
 
     def get(self, project_id: str) -> ProjectDetail:
         """
@@ -101,7 +101,9 @@ class ProjectService(BaseService):
         cirro.projects.create(byoa_project)
         ```
         """
-        return create_project.sync(client=self._api_client, body=request)
+        response = create_project.sync(client=self._api_client, body=request)
+        self._invalidate_cache('projects')
+        return response
 
     def update(self, project_id: str, request: ProjectInput) -> ProjectDetail:
         """
@@ -111,7 +113,9 @@ class ProjectService(BaseService):
             project_id (str): ID of project to update
             request (`cirro_api_client.v1.models.ProjectInput`): New details for the project
         """
-        return update_project.sync(project_id=project_id, body=request, client=self._api_client)
+        project = update_project.sync(project_id=project_id, body=request, client=self._api_client)
+        self._invalidate_cache('projects')
+        return project
 
     def update_tags(self, project_id: str, tags: List[Tag]):
         """
@@ -122,6 +126,7 @@ class ProjectService(BaseService):
             tags (List[Tag]): List of tags to apply
         """
         update_project_tags.sync_detailed(project_id=project_id, body=tags, client=self._api_client)
+        self._invalidate_cache('projects')
 
     def get_users(self, project_id: str) -> Optional[List[ProjectUser]]:
         """
@@ -150,6 +155,7 @@ class ProjectService(BaseService):
             suppress_notification=suppress_notification
         )
         set_user_project_role.sync_detailed(project_id=project_id, body=request_body, client=self._api_client)
+        self._invalidate_cache('projects')
 
     def archive(self, project_id: str):
         """
@@ -159,6 +165,7 @@ class ProjectService(BaseService):
             project_id (str): Project ID
         """
         archive_project.sync_detailed(project_id=project_id, client=self._api_client)
+        self._invalidate_cache('projects')
 
     def unarchive(self, project_id: str):
         """
@@ -168,3 +175,4 @@ class ProjectService(BaseService):
             project_id (str): Project ID
         """
         unarchive_project.sync_detailed(project_id=project_id, client=self._api_client)
+        self._invalidate_cache('projects')
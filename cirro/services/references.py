@@ -18,7 +18,8 @@ class ReferenceService(FileEnabledService):
         """
         List available reference types
         """
-        return get_reference_types.sync(client=self._api_client)
+        return self._cached('reference-types', lambda: get_reference_types.sync(client=self._api_client),
+                            model=ReferenceType)
 
     def get_type(self, reference_type_name: str) -> Optional[ReferenceType]:
         """
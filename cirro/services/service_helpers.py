@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from cirro_api_client.v1.models import ShareType
@@ -6,23 +7,30 @@ from cirro import CirroApi
 from cirro.models.dataset import DatasetWithShare
 
 
-def list_all_datasets(project_id: str, client: CirroApi) -> List[DatasetWithShare]:
+def list_all_datasets(project_id: str, client: CirroApi, max_workers: int = 8) -> List[DatasetWithShare]:
     """
     List all datasets for a given project, including those shared with the project
 
+    The datasets of the project and of each subscribed share are listed concurrently.
+
     Args:
         project_id (str): ID of the Project
         client (cirro.CirroApi): Cirro API client
+        max_workers (int): Maximum number of listings to run at the same time
 
     Returns:
-        List of datasets
+        List of datasets, those of the project first followed by those of each share
     """
-    datasets = client.datasets.list(project_id=project_id)
-    datasets = [DatasetWithShare.from_dataset(d, share=None) for d in datasets]
-    # Pull datasets from subscribed shares
-    subscribed_shares = client.shares.list(project_id=project_id, share_type=ShareType.SUBSCRIBER)
-    for share in subscribed_shares:
-        datasets_in_share = client.datasets.list_shared(project_id, share.id)
-        datasets_in_share = [DatasetWithShare.from_dataset(d, share=share) for d in datasets_in_share]
-        datasets += datasets_in_share
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        project_datasets = executor.submit(client.datasets.list, project_id=project_id)
+        # Pull datasets from subscribed shares
+        subscribed_shares = client.shares.list(project_id=project_id, share_type=ShareType.SUBSCRIBER)
+        shared_datasets = [
+            (share, executor.submit(client.datasets.list_shared, project_id, share.id))
+            for share in subscribed_shares
+        ]
+
+        datasets = [DatasetWithShare.from_dataset(d, share=None) for d in project_datasets.result()]
+        for share, datasets_in_share in shared_datasets:
+            datasets += [DatasetWithShare.from_dataset(d, share=share) for d in datasets_in_share.result()]
     return datasets
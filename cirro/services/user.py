@@ -1,9 +1,9 @@
-from typing import List
+from typing import List, Iterator
 
 from cirro_api_client.v1.api.users import invite_user, list_users, get_user
 from cirro_api_client.v1.models import InviteUserRequest, User, UserDetail
 
-from cirro.services.base import BaseService, get_all_records
+from cirro.services.base import BaseService, iter_records
 
 
 class UserService(BaseService):
@@ -11,13 +11,24 @@ class UserService(BaseService):
         """
         List users in the system
         """
-        return get_all_records(
+        return list(self.iter_users(max_items=max_items))
+
+    def iter_users(self, max_items: int = None, prefetch: bool = False) -> Iterator[User]:
+        """
+        Iterates over the users in the system, requesting them page by page as the iterator is consumed
+
+        Args:
+            max_items (int): Maximum number of records to get (default: all)
+            prefetch (bool): Request the next page in the background while the current one is processed
+        """
+        return iter_records(
             records_getter=lambda page_args: list_users.sync(
                 client=self._api_client,
                 next_token=page_args.next_token,
                 limit=page_args.limit
             ),
-            max_items=max_items
+            max_items=max_items,
+            prefetch=prefetch
         )
 
     def get(self, username: str) -> UserDetail:
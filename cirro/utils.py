@@ -1,5 +1,8 @@
 import json
 import math
+import threading
+import time
+from contextlib import contextmanager
 from datetime import timezone, datetime
 from typing import Optional, Union
 
@@ -51,3 +54,67 @@ def convert_size(size: int):
     p = math.pow(1024, i)
     s = round(size/p, 2)
     return '%.2f %s' % (s, size_name[i])
+
+
+class RateLimiter:
+    """
+    Spaces out calls made from several threads to at most `max_rate` per second
+    """
+    def __init__(self, max_rate: Optional[float]):
+        self.interval = 1 / max_rate if max_rate else 0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Waits until the next call is allowed
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_until = max(now, self._next_time)
+            self._next_time = wait_until + self.interval
+        if wait_until > now:
+            time.sleep(wait_until - now)
+
+
+class TransferLimiter:
+    """
+    Limits the number of bytes transferred at the same time by several threads to `max_bytes`.
+    A transfer larger than the limit is allowed once no other transfer is in progress.
+    Transfers start in the order they were requested, so that a large transfer waiting for room
+    is not overtaken indefinitely by smaller ones.
+    """
+    def __init__(self, max_bytes: Optional[int]):
+        self.max_bytes = max_bytes
+        self._in_flight = 0
+        self._next_ticket = 0
+        self._serving = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, size: int):
+        """
+        Waits until `size` bytes can be transferred, and holds them until the end of the block
+        """
+        if not self.max_bytes:
+            yield
+            return
+        with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._condition.wait_for(
+                lambda: self._serving == ticket and
+                (self._in_flight == 0 or self._in_flight + size <= self.max_bytes)
+            )
+            self._serving += 1
+            self._in_flight += size
+            # The next transfer in line may fit as well
+            self._condition.notify_all()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= size
+                self._condition.notify_all()
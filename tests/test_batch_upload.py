@@ -0,0 +1,163 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from cirro_api_client.v1.models import FileMappingRule, FileNamePattern, Process, Executor
+
+from cirro.models.dataset import DatasetUpload, DatasetUploadStatus
+from cirro.models.file_mapping import FileMappingValidator
+from cirro.services.batch_upload import BatchUploader
+from cirro.utils import TransferLimiter
+
+RULES = [FileMappingRule(description='FASTQ', min_=1, file_name_patterns=[
+    FileNamePattern(example_name='sample_R1.fastq.gz', description='',
+                    sample_matching_pattern=r'(?P<sampleName>\S+)_R[12]\.fastq\.gz')
+])]
+
+
+class TestBatchUploader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for name, files in [('run1', ['a_R1.fastq.gz', 'a_R2.fastq.gz']),
+                            ('run2', ['b_R1.fastq.gz']),
+                            ('run3', ['notes.txt'])]:
+            Path(self.root, name).mkdir()
+            for file in files:
+                Path(self.root, name, file).write_text('ACGT')
+        Path(self.root, 'manifest.csv').write_text(
+            'name,directory,description,tags\n'
+            'Run 1,run1,First run,a;b\n'
+            'Run 2,run2,,\n'
+            'Run 3,run3,,\n'
+        )
+
+        self.client = Mock()
+        self.client.processes.list.return_value = [
+            Process(id='fastq', name='Paired FASTQ', description='', data_type='', executor=Executor.INGEST,
+                    child_process_ids=[], parent_process_ids=[], linked_project_ids=[], is_tenant_wide=True,
+                    allow_multiple_sources=False, uses_sample_sheet=False, is_archived=False)
+        ]
+        self.client.processes.get_file_mapping_validator.return_value = FileMappingValidator(RULES)
+        self.client.datasets.create.side_effect = \
+            lambda project_id, upload_request: Mock(id=f'dataset-{upload_request.name}')
+        self.uploaded = []
+        self.client.datasets.upload_files.side_effect = \
+            lambda project_id, dataset_id, directory, files, transfer_limiter: self.uploaded.append(dataset_id)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def _check_dataset_files(files, process_id, directory, validate_locally):
+        if not any(file.endswith('.fastq.gz') for file in files):
+            raise ValueError('Files do not match the dataset type')
+
+    def test_read_manifest(self):
+        uploads = BatchUploader.read_manifest(Path(self.root, 'manifest.csv'))
+
+        self.assertEqual([u.name for u in uploads], ['Run 1', 'Run 2', 'Run 3'])
+        self.assertEqual(uploads[0].directory, str(Path(self.root, 'run1')))
+        self.assertEqual(uploads[0].tags, ['a', 'b'])
+        self.assertEqual(uploads[1].description, '')
+
+    def test_upload_and_resume(self):
+        state_file = Path(self.root, 'state.json')
+        uploads = BatchUploader.read_manifest(Path(self.root, 'manifest.csv'))
+        self.client.datasets.upload_files.side_effect = [None, RuntimeError('Connection reset')]
+        self.client.processes.check_dataset_files.side_effect = self._check_dataset_files
+
+        uploader = BatchUploader(self.client, 'project-1', process='Paired FASTQ', max_workers=1,
+                                 state_file=state_file)
+        results = uploader.upload(uploads)
+
+        self.assertEqual([r.status for r in results], [DatasetUploadStatus.UPLOADED, DatasetUploadStatus.FAILED,
+                                                       DatasetUploadStatus.FAILED])
+        self.assertEqual(str(results[1].error), 'Connection reset')
+        self.assertEqual(str(results[2].error), 'Files do not match the dataset type')
+        # The process is resolved once for the batch
+        self.client.processes.list.assert_called_once()
+        self.client.processes.get_file_mapping_validator.assert_called_once_with('fastq')
+        self.assertEqual(self.client.datasets.create.call_count, 2)
+        state = json.loads(state_file.read_text())
+        self.assertEqual(state[str(Path(self.root, 'run2'))]['dataset_id'], 'dataset-Run 2')
+
+        # Resuming skips the uploaded dataset, and does not create the failed one again
+        self.client.datasets.upload_files.side_effect = None
+        resumed = BatchUploader(self.client, 'project-1', process='fastq', state_file=state_file)
+        results = resumed.upload(BatchUploader.read_manifest(Path(self.root, 'manifest.csv')))
+
+        self.assertEqual([r.status for r in results], [DatasetUploadStatus.UPLOADED, DatasetUploadStatus.UPLOADED,
+                                                       DatasetUploadStatus.FAILED])
+        self.assertEqual(self.client.datasets.create.call_count, 2)
+        self.assertEqual(self.client.datasets.upload_files.call_args.kwargs['dataset_id'], 'dataset-Run 2')
+
+    def test_unknown_process(self):
+        uploads = [DatasetUpload(name='Run 1', directory=str(Path(self.root, 'run1')), process='missing')]
+
+        results = BatchUploader(self.client, 'project-1').upload(uploads)
+
+        self.assertEqual(results[0].status, DatasetUploadStatus.FAILED)
+        self.assertIn('missing not found', str(results[0].error))
+        self.client.datasets.create.assert_not_called()
+
+
+class TestTransferLimiter(unittest.TestCase):
+    def test_limits_bytes_in_flight(self):
+        limiter = TransferLimiter(max_bytes=100)
+        lock = threading.Lock()
+        in_flight = []
+        max_in_flight = []
+
+        def transfer(size):
+            with limiter.reserve(size):
+                with lock:
+                    in_flight.append(size)
+                    max_in_flight.append(sum(in_flight))
+                time.sleep(0.01)
+                with lock:
+                    in_flight.remove(size)
+
+        threads = [threading.Thread(target=transfer, args=(size,)) for size in [60, 60, 30, 30, 150]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # A transfer larger than the limit runs on its own
+        self.assertLessEqual(max(m for m in max_in_flight if m != 150), 100)
+        self.assertIn(150, max_in_flight)
+
+    def test_large_transfer_is_not_starved(self):
+        limiter = TransferLimiter(max_bytes=100)
+        started = []
+        stop = threading.Event()
+
+        def transfer(name, size, duration):
+            with limiter.reserve(size):
+                started.append(name)
+                time.sleep(duration)
+
+        # Small transfers keep arriving, there is always one in progress
+        def small_transfers():
+            i = 0
+            while not stop.is_set():
+                threading.Thread(target=transfer, args=(f'small-{i}', 40, 0.02)).start()
+                i += 1
+                time.sleep(0.005)
+
+        producer = threading.Thread(target=small_transfers)
+        producer.start()
+        time.sleep(0.05)
+        large = threading.Thread(target=transfer, args=('large', 150, 0.01))
+        large.start()
+        large.join(timeout=2)
+        stop.set()
+        producer.join()
+
+        self.assertFalse(large.is_alive())
+        self.assertIn('large', started)
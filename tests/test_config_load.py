@@ -1,7 +1,14 @@
+import configparser
 import os
+import tempfile
+import threading
+import time
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
-from cirro.config import AppConfig, extract_base_url
+from cirro.config import AppConfig, Constants, TransportConfig, extract_base_url, load_cached_system_info, \
+    save_cached_system_info, _load_transport_config
 
 TEST_BASE_URL = "app.cirro.bio"
 
@@ -26,3 +33,105 @@ class TestConfigLoad(unittest.TestCase):
         for test_case in test_cases:
             with self.subTest(test_case):
                 self.assertEqual(TEST_BASE_URL, extract_base_url(test_case))
+
+
+SYSTEM_INFO = {
+    'auth': {'sdkAppId': 'client-id', 'userPoolId': 'user-pool-id'},
+    'referencesBucket': 'references-bucket',
+    'resourcesBucket': 'resources-bucket',
+    'region': 'us-west-2'
+}
+
+
+class TestSystemInfoCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir_patch = patch.object(Constants, 'system_info_cache_dir', Path(self.temp_dir.name))
+        self.cache_dir_patch.start()
+        self.env_patch = patch.dict(os.environ, {}, clear=False)
+        self.env_patch.start()
+        for env in ['CIRRO_OFFLINE', 'CIRRO_SYSTEM_INFO_TTL']:
+            os.environ.pop(env, None)
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.cache_dir_patch.stop()
+        self.temp_dir.cleanup()
+
+    @patch('cirro.config.fetch_system_info', return_value=SYSTEM_INFO)
+    def test_fetches_once_then_uses_cache(self, fetch_mock):
+        AppConfig(base_url=TEST_BASE_URL)
+        config = AppConfig(base_url=TEST_BASE_URL)
+        self.assertEqual(fetch_mock.call_count, 1)
+        self.assertEqual(config.client_id, 'client-id')
+        self.assertEqual(config.region, 'us-west-2')
+
+    @patch('cirro.config.fetch_system_info', return_value=SYSTEM_INFO)
+    def test_stale_cache_revalidates(self, fetch_mock):
+        save_cached_system_info(TEST_BASE_URL, {**SYSTEM_INFO, 'region': 'us-east-1'})
+        os.environ['CIRRO_SYSTEM_INFO_TTL'] = '1'
+        with patch('cirro.config.time.time', return_value=time.time() + 10):
+            config = AppConfig(base_url=TEST_BASE_URL)
+        # Stale value is served immediately
+        self.assertEqual(config.region, 'us-east-1')
+        for thread in threading.enumerate():
+            if thread is not threading.current_thread() and thread.daemon:
+                thread.join(timeout=5)
+        fetch_mock.assert_called_once()
+        self.assertEqual(load_cached_system_info(TEST_BASE_URL)['info']['region'], 'us-west-2')
+
+    @patch('cirro.config.fetch_system_info')
+    def test_offline(self, fetch_mock):
+        with self.assertRaises(RuntimeError):
+            AppConfig(base_url=TEST_BASE_URL, offline=True)
+
+        save_cached_system_info(TEST_BASE_URL, SYSTEM_INFO)
+        os.environ['CIRRO_OFFLINE'] = 'true'
+        os.environ['CIRRO_SYSTEM_INFO_TTL'] = '0'
+        config = AppConfig(base_url=TEST_BASE_URL)
+        self.assertEqual(config.client_id, 'client-id')
+        fetch_mock.assert_not_called()
+
+    @patch('cirro.config.fetch_system_info', return_value=SYSTEM_INFO)
+    def test_invalid_ttl(self, fetch_mock):
+        save_cached_system_info(TEST_BASE_URL, SYSTEM_INFO)
+        os.environ['CIRRO_SYSTEM_INFO_TTL'] = 'one day'
+
+        config = AppConfig(base_url=TEST_BASE_URL)
+
+        self.assertEqual(config.system_info_ttl, Constants.default_system_info_ttl)
+        fetch_mock.assert_not_called()
+
+    @patch('cirro.config.fetch_system_info', return_value=SYSTEM_INFO)
+    def test_corrupt_cache_is_fetched_again(self, fetch_mock):
+        cache_path = Path(self.temp_dir.name, f'{TEST_BASE_URL}.json')
+        for contents in ['{"saved_at": 1, "info": {"auth"', '[]', '{"saved_at": 1, "info": {"region": "x"}}']:
+            with self.subTest(contents):
+                cache_path.write_text(contents)
+                fetch_mock.reset_mock()
+
+                config = AppConfig(base_url=TEST_BASE_URL)
+
+                self.assertEqual(config.client_id, 'client-id')
+                fetch_mock.assert_called_once()
+
+
+class TestTransportConfig(unittest.TestCase):
+    def test_load_transport_config(self):
+        ini_config = configparser.ConfigParser()
+        ini_config.read_string('[General]\nhttp_max_connections = 200\nhttp_read_timeout = 30\n')
+        transport_config = _load_transport_config(ini_config['General'])
+        self.assertEqual(transport_config, TransportConfig(max_connections=200, read_timeout=30.0))
+
+    def test_httpx_args(self):
+        self.assertEqual(TransportConfig().httpx_args(), {})
+        self.assertIsNone(TransportConfig().httpx_timeout())
+
+        transport_config = TransportConfig(max_connections=200, keepalive_expiry=30, connect_timeout=5)
+        limits = transport_config.httpx_args()['limits']
+        self.assertEqual(limits.max_connections, 200)
+        self.assertEqual(limits.max_keepalive_connections, 20)
+        self.assertEqual(limits.keepalive_expiry, 30)
+        timeout = transport_config.httpx_timeout()
+        self.assertEqual(timeout.connect, 5)
+        self.assertIsNone(timeout.read)
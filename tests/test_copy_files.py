@@ -0,0 +1,174 @@
+import unittest
+import uuid
+from unittest.mock import Mock, patch
+
+import boto3
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+
+from cirro.clients.s3 import S3Client, COPY_MULTIPART_THRESHOLD
+from cirro.models.file import File, FileAccessContext
+from cirro.sdk.file import DataPortalFile
+from cirro.sdk.project import DataPortalProject
+from cirro.services.dataset import get_copy_destinations
+from cirro.services.file import FileService
+
+SOURCE_BASE = 's3://project-bucket/datasets/source-dataset'
+
+
+def _file(relative_path: str, project_id='project-1') -> File:
+    return File(relative_path=relative_path, size=100,
+                access_context=FileAccessContext.download(project_id=project_id, base_url=SOURCE_BASE))
+
+
+class TestCopyFiles(unittest.TestCase):
+    def test_copy_destinations(self):
+        files = [_file('data/sample1.fastq.gz'), _file('data/run/sample2.fastq.gz'), _file('other.txt')]
+
+        self.assertEqual(get_copy_destinations(files, {'data/run/sample2.fastq.gz': 'sample2.fastq.gz'}), {
+            f'{SOURCE_BASE}/data/sample1.fastq.gz': 'sample1.fastq.gz',
+            f'{SOURCE_BASE}/data/run/sample2.fastq.gz': 'sample2.fastq.gz',
+            f'{SOURCE_BASE}/other.txt': 'other.txt'
+        })
+
+    def test_duplicate_destinations(self):
+        other_run = File(relative_path='data/sample_R1.fastq.gz', size=100,
+                         access_context=FileAccessContext.download(project_id='project-1',
+                                                                   base_url='s3://project-bucket/datasets/run-2'))
+        files = [_file('data/sample_R1.fastq.gz'), other_run]
+
+        with self.assertRaisesRegex(ValueError, 'would both be copied to sample_R1.fastq.gz'):
+            get_copy_destinations(files)
+
+        # The files can be told apart by their absolute path
+        destinations = get_copy_destinations(files, {other_run.absolute_path: 'run2_R1.fastq.gz'})
+        self.assertEqual(sorted(destinations.values()), ['run2_R1.fastq.gz', 'sample_R1.fastq.gz'])
+
+    def test_file_service(self):
+        service = FileService(Mock(), checksum_method=None, transfer_retries=1)
+        clients = []
+
+        def generate_client(access_context):
+            client = Mock()
+            if access_context.file_access_request.dataset_id == 'new-dataset':
+                client.copy_file.side_effect = \
+                    lambda source_key, **kwargs: self._fail_if(source_key.endswith('bad.fastq.gz'))
+            clients.append(client)
+            return client
+        service._generate_s3_client = Mock(side_effect=generate_client)
+
+        destination = FileAccessContext.upload_dataset(project_id='project-1', dataset_id='new-dataset',
+                                                       base_url='s3://project-bucket/datasets/new-dataset')
+        files = [_file('data/a.fastq.gz'), _file('data/b.fastq.gz'), _file('data/bad.fastq.gz')]
+        with self.assertRaisesRegex(RuntimeError, 'Failed to copy 1 of 3 files:\\ndata/bad.fastq.gz: Access Denied'):
+            service.copy_files(files, destination, get_copy_destinations(files), max_workers=2)
+
+        destination_client, source_client = clients
+        # The files of a dataset share one source client
+        self.assertEqual(len(clients), 2)
+        copies = sorted(destination_client.copy_file.call_args_list, key=lambda c: c.kwargs['key'])
+        self.assertEqual(copies[0].kwargs, {
+            'source_bucket': 'project-bucket',
+            'source_key': 'datasets/source-dataset/data/a.fastq.gz',
+            'bucket': 'project-bucket',
+            'key': 'datasets/new-dataset/data/a.fastq.gz',
+            'source_client': source_client
+        })
+
+    @staticmethod
+    def _fail_if(condition: bool):
+        if condition:
+            raise PermissionError('Access Denied')
+
+    def test_s3_client_copy(self):
+        with patch.object(S3Client, '_build_session_client'):
+            client = S3Client(Mock(), checksum_method='CRC64NVME')
+            source_client = S3Client(Mock())
+
+        client.copy_file('source-bucket', 'source/key', 'bucket', 'key', source_client=source_client)
+
+        args, kwargs = client.get_aws_client().copy.call_args
+        self.assertEqual(args, ({'Bucket': 'source-bucket', 'Key': 'source/key'}, 'bucket', 'key'))
+        self.assertEqual(kwargs['ExtraArgs'], {'ChecksumAlgorithm': 'CRC64NVME'})
+        self.assertIs(kwargs['SourceClient'], source_client.get_aws_client())
+        self.assertEqual(kwargs['Config'].multipart_threshold, COPY_MULTIPART_THRESHOLD)
+
+
+class TestCreateDatasetFromFiles(unittest.TestCase):
+    def test_create(self):
+        client = Mock()
+        client.processes.get.return_value = None
+        project = DataPortalProject(Mock(id='project-1'), client)
+        project._wait_for_dataset = Mock()
+        files = [DataPortalFile(_file('data/sample1_R1.fastq.gz'), client), _file('data/sample1_R2.fastq.gz')]
+        new_dataset_id = str(uuid.uuid4())
+        client.datasets.create.return_value = Mock(id=new_dataset_id)
+
+        with patch('cirro.sdk.project.parse_process_name_or_id', return_value=Mock(id='paired_dnaseq')):
+            project.create_dataset_from_files(name='Sample 1', process='paired_dnaseq', files=files)
+
+        client.processes.check_dataset_files.assert_called_once_with(
+            ['sample1_R1.fastq.gz', 'sample1_R2.fastq.gz'], 'paired_dnaseq', None)
+        request = client.datasets.create.call_args.kwargs['upload_request']
+        self.assertEqual(request.expected_files, ['sample1_R1.fastq.gz', 'sample1_R2.fastq.gz'])
+        copy_args = client.datasets.copy_files.call_args.kwargs
+        self.assertEqual(copy_args['dataset_id'], new_dataset_id)
+        self.assertEqual([f.relative_path for f in copy_args['files']],
+                         ['data/sample1_R1.fastq.gz', 'data/sample1_R2.fastq.gz'])
+        project._wait_for_dataset.assert_called_once_with(new_dataset_id)
+
+    def test_copy_failure_reports_dataset(self):
+        client = Mock()
+        project = DataPortalProject(Mock(id='project-1'), client)
+        client.datasets.create.return_value = Mock(id='new-dataset')
+        client.datasets.copy_files.side_effect = RuntimeError('Failed to copy 1 of 1 files')
+
+        with patch('cirro.sdk.project.parse_process_name_or_id', return_value=Mock(id='paired_dnaseq')):
+            with self.assertRaisesRegex(RuntimeError, 'Dataset new-dataset was created'):
+                project.create_dataset_from_files(name='Sample 1', process='paired_dnaseq',
+                                                  files=[_file('data/sample1_R1.fastq.gz')])
+
+
+@unittest.skipIf(mock_aws is None, 'moto is not installed')
+class TestS3ClientCopy(unittest.TestCase):
+    """
+    Copies objects with a local S3 server (moto), which does not enforce IAM policies:
+    that the upload credentials of a dataset may read the source files is not verified here
+    """
+    def setUp(self):
+        self.mock = mock_aws()
+        self.mock.start()
+        self.s3 = boto3.client('s3', region_name='us-east-1', aws_access_key_id='key', aws_secret_access_key='secret')
+        for bucket in ['source-bucket', 'bucket']:
+            self.s3.create_bucket(Bucket=bucket)
+        self.operations = []
+        self.s3.meta.events.register('before-call.s3', lambda model, **kwargs: self.operations.append(model.name))
+
+    def tearDown(self):
+        self.mock.stop()
+
+    def _client(self) -> S3Client:
+        with patch.object(S3Client, '_build_session_client', return_value=self.s3):
+            return S3Client(Mock(), checksum_method='CRC64NVME')
+
+    def test_copy_object(self):
+        self.s3.put_object(Bucket='source-bucket', Key='source/key', Body=b'ACGT')
+
+        self._client().copy_file('source-bucket', 'source/key', 'bucket', 'key', source_client=self._client())
+
+        self.assertEqual(self.s3.get_object(Bucket='bucket', Key='key')['Body'].read(), b'ACGT')
+        self.assertIn('CopyObject', self.operations)
+
+    def test_copy_in_parts(self):
+        body = b'A' * (11 * 1024 ** 2)
+        self.s3.put_object(Bucket='source-bucket', Key='source/key', Body=body)
+
+        with patch('cirro.clients.s3.COPY_MULTIPART_THRESHOLD', 5 * 1024 ** 2), \
+                patch('cirro.clients.s3.COPY_MULTIPART_CHUNKSIZE', 5 * 1024 ** 2):
+            self._client().copy_file('source-bucket', 'source/key', 'bucket', 'key', source_client=self._client())
+
+        self.assertEqual(self.s3.get_object(Bucket='bucket', Key='key')['Body'].read(), body)
+        self.assertEqual(self.operations.count('UploadPartCopy'), 3)
@@ -0,0 +1,211 @@
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from cirro_api_client.v1.errors import NotFoundException
+from cirro_api_client.v1.models import FormSchema, RunAnalysisRequest, RunAnalysisRequestParams, CreateResponse, \
+    GetExecutionLogsResponse, LogEntry, Status, Task
+
+from cirro.services.execution import ExecutionService, _LogCursor
+from cirro.utils import RateLimiter
+
+FORM_SCHEMA = {
+    'form': {
+        'type': 'object',
+        'properties': {'genome': {'type': 'string', 'enum': ['GRCh38', 'GRCm39']}}
+    },
+    'ui': {}
+}
+
+
+def _request(name: str, genome: str) -> RunAnalysisRequest:
+    return RunAnalysisRequest(name=name, process_id='process-1', source_dataset_ids=[f'{name}-source'],
+                              params=RunAnalysisRequestParams.from_dict({'genome': genome}), notification_emails=[])
+
+
+@patch('cirro.services.execution.run_analysis')
+@patch('cirro.services.execution.get_process_parameters')
+class TestRunAnalyses(unittest.TestCase):
+    def test_results_and_errors(self, get_process_parameters, run_analysis):
+        get_process_parameters.sync.return_value = FormSchema.from_dict(FORM_SCHEMA)
+
+        def submit(project_id, body, client):
+            if body.name == 'rejected':
+                raise RuntimeError('Rejected by the API')
+            return CreateResponse(id=f'{body.name}-dataset', message='')
+        run_analysis.sync.side_effect = submit
+
+        results = ExecutionService(Mock()).run_analyses('project-1', [
+            _request('first', 'GRCh38'),
+            _request('invalid', 'hg19'),
+            _request('rejected', 'GRCh38'),
+            _request('last', 'GRCm39')
+        ], max_rate=None)
+
+        self.assertEqual([r.dataset_id for r in results], ['first-dataset', None, None, 'last-dataset'])
+        self.assertEqual([r.succeeded for r in results], [True, False, False, True])
+        self.assertIn('hg19', str(results[1].error))
+        self.assertEqual(str(results[2].error), 'Rejected by the API')
+        # Invalid requests are never submitted, and the parameter spec is fetched once
+        self.assertEqual(run_analysis.sync.call_count, 3)
+        self.assertEqual(get_process_parameters.sync.call_count, 1)
+
+    def test_bounded_concurrency(self, get_process_parameters, run_analysis):
+        get_process_parameters.sync.return_value = FormSchema.from_dict(FORM_SCHEMA)
+        lock = threading.Lock()
+        running = []
+        max_running = []
+
+        def submit(project_id, body, client):
+            with lock:
+                running.append(body.name)
+                max_running.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(body.name)
+            return CreateResponse(id=body.name, message='')
+        run_analysis.sync.side_effect = submit
+
+        requests = [_request(f'analysis-{i}', 'GRCh38') for i in range(12)]
+        results = ExecutionService(Mock()).run_analyses('project-1', requests, max_workers=3, max_rate=None)
+
+        self.assertTrue(all(r.succeeded for r in results))
+        self.assertLessEqual(max(max_running), 3)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_spaces_calls(self):
+        rate_limiter = RateLimiter(max_rate=100)
+        start = time.monotonic()
+        for _ in range(6):
+            rate_limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.05 - 0.001)
+
+    def test_unlimited(self):
+        rate_limiter = RateLimiter(max_rate=None)
+        start = time.monotonic()
+        for _ in range(1000):
+            rate_limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+def _logs(*events) -> GetExecutionLogsResponse:
+    return GetExecutionLogsResponse(events=[LogEntry(message=message, timestamp=timestamp)
+                                            for message, timestamp in events])
+
+
+class TestLogCursor(unittest.TestCase):
+    def test_only_new_events(self):
+        cursor = _LogCursor()
+        first = _logs(('a', 1), ('b', 2), ('c', 2))
+        second = _logs(('a', 1), ('b', 2), ('c', 2), ('d', 2), ('e', 3))
+
+        self.assertEqual([e.message for e in cursor.new_events(first.events)], ['a', 'b', 'c'])
+        self.assertEqual([e.message for e in cursor.new_events(first.events)], [])
+        self.assertEqual([e.message for e in cursor.new_events(second.events)], ['d', 'e'])
+
+    def test_without_timestamps(self):
+        cursor = _LogCursor()
+        first = GetExecutionLogsResponse(events=[LogEntry(message='a'), LogEntry(message='b')])
+        second = GetExecutionLogsResponse(events=[LogEntry(message='a'), LogEntry(message='b'), LogEntry(message='c')])
+
+        self.assertEqual([e.message for e in cursor.new_events(first.events)], ['a', 'b'])
+        self.assertEqual([e.message for e in cursor.new_events(second.events)], ['c'])
+
+
+@patch('cirro.services.execution.time.sleep')
+@patch('cirro.services.execution.get_dataset')
+@patch('cirro.services.execution.get_execution_logs')
+class TestTailLogs(unittest.TestCase):
+    def test_follow_until_finished(self, get_execution_logs, get_dataset, sleep):
+        get_execution_logs.sync.side_effect = [
+            _logs(('starting', 1)),
+            _logs(('starting', 1)),
+            _logs(('starting', 1), ('running', 2)),
+            _logs(('starting', 1), ('running', 2), ('done', 3))
+        ]
+        get_dataset.sync.side_effect = [Mock(status=status) for status in
+                                        [Status.RUNNING, Status.RUNNING, Status.RUNNING, Status.COMPLETED]]
+
+        events = ExecutionService(Mock()).tail_execution_logs('project-1', 'dataset-1', poll_interval=5)
+
+        self.assertEqual([e.message for e in events], ['starting', 'running', 'done'])
+        # Quiet polls back off, new events reset the interval
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [5, 10, 5])
+
+    def test_dataset_deleted_while_following(self, get_execution_logs, get_dataset, sleep):
+        get_execution_logs.sync.return_value = _logs(('starting', 1))
+        get_dataset.sync.side_effect = NotFoundException(
+            {'statusCode': 404, 'errorCode': 'NOT_FOUND', 'errorDetail': 'Dataset not found', 'errors': []})
+
+        events = ExecutionService(Mock()).tail_execution_logs('project-1', 'dataset-1')
+
+        self.assertEqual([e.message for e in events], ['starting'])
+
+    def test_no_follow(self, get_execution_logs, get_dataset, sleep):
+        get_execution_logs.sync.return_value = _logs(('a', 1), ('b', 2))
+
+        events = ExecutionService(Mock()).tail_execution_logs('project-1', 'dataset-1', follow=False)
+
+        self.assertEqual([e.message for e in events], ['a', 'b'])
+        get_dataset.sync.assert_not_called()
+        sleep.assert_not_called()
+
+
+def _task(name: str, status: str) -> Task:
+    return Task(name=name, native_job_id=f'job-{name}', status=status, requested_at=datetime.now())
+
+
+@patch('cirro.services.execution.get_task_logs')
+@patch('cirro.services.execution.get_tasks_for_execution')
+class TestCollectTaskLogs(unittest.TestCase):
+    def setUp(self):
+        self.tasks = [
+            _task('ALIGN (sample 1)', 'FAILED'),
+            _task('ALIGN (sample 2)', 'COMPLETED'),
+            _task('ALIGN (sample 3)', 'FAILED'),
+            _task('QC (sample 1)', 'FAILED')
+        ]
+
+    @staticmethod
+    def _get_task_logs(project_id, dataset_id, task_id, force_live, client):
+        if task_id == 'job-ALIGN (sample 3)':
+            raise RuntimeError('Log stream not found')
+        return _logs((f'{task_id} line 1', 1), (f'{task_id} line 2', 2))
+
+    def test_filtered_tasks(self, get_tasks_for_execution, get_task_logs):
+        get_tasks_for_execution.sync.return_value = self.tasks
+        get_task_logs.sync.side_effect = self._get_task_logs
+
+        results = ExecutionService(Mock()).collect_task_logs('project-1', 'dataset-1',
+                                                             status='failed', name_pattern='ALIGN*')
+
+        self.assertEqual(list(results), ['job-ALIGN (sample 1)', 'job-ALIGN (sample 3)'])
+        first, third = results.values()
+        self.assertEqual(first.logs, 'job-ALIGN (sample 1) line 1\njob-ALIGN (sample 1) line 2')
+        self.assertTrue(first.succeeded)
+        self.assertGreaterEqual(first.elapsed, 0)
+        self.assertFalse(third.succeeded)
+        self.assertEqual(str(third.error), 'Log stream not found')
+        self.assertEqual(get_task_logs.sync.call_count, 2)
+
+    def test_output_dir(self, get_tasks_for_execution, get_task_logs):
+        get_task_logs.sync.side_effect = self._get_task_logs
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = Path(tmp, 'logs')
+            results = ExecutionService(Mock()).collect_task_logs('project-1', 'dataset-1', tasks=self.tasks,
+                                                                 status=['FAILED'], output_dir=output_dir)
+
+            self.assertEqual(sorted(p.name for p in output_dir.iterdir()), [
+                'ALIGN_sample_1_-job-ALIGN_sample_1_.log',
+                'QC_sample_1_-job-QC_sample_1_.log'
+            ])
+            result = results['job-QC (sample 1)']
+            self.assertIsNone(result.logs)
+            self.assertEqual(result.path.read_text(), 'job-QC (sample 1) line 1\njob-QC (sample 1) line 2')
+        get_tasks_for_execution.sync.assert_not_called()
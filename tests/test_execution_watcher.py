@@ -0,0 +1,159 @@
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+
+from cirro_api_client.v1.errors import NotFoundException
+from cirro_api_client.v1.models import Dataset, Status
+
+from cirro.services.execution_watcher import ExecutionWatcher
+
+
+def _dataset(dataset_id: str, status: Status) -> Dataset:
+    return Dataset(id=dataset_id, name=dataset_id, description='', project_id='project-1',
+                   process_id='process-1', source_dataset_ids=[], status=status, tags=[],
+                   created_by='user', created_at=datetime.now(), updated_at=datetime.now())
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestExecutionWatcher(unittest.TestCase):
+    def setUp(self):
+        # Status of each dataset at each check, the last one is repeated
+        self.timelines = {}
+        self.checks = {}
+        self.client = Mock()
+        self.client.datasets.get.side_effect = lambda project_id, dataset_id: self._dataset(dataset_id)
+        self.client.datasets.iter_datasets.side_effect = \
+            lambda project_id, max_items: iter([self._dataset(dataset_id) for dataset_id in self.timelines][:max_items])
+
+    def _dataset(self, dataset_id: str) -> Dataset:
+        check = self.checks.get(dataset_id, 0)
+        self.checks[dataset_id] = check + 1
+        timeline = self.timelines[dataset_id]
+        return _dataset(dataset_id, timeline[min(check, len(timeline) - 1)])
+
+    def _watcher(self, **kwargs) -> ExecutionWatcher:
+        clock = FakeClock()
+        watcher = ExecutionWatcher(self.client, **kwargs)
+        watcher._clock = clock.time
+        watcher._sleep = clock.sleep
+        self.clock = clock
+        return watcher
+
+    def test_reports_changes(self):
+        self.timelines = {'a': [Status.PENDING, Status.RUNNING, Status.RUNNING, Status.COMPLETED]}
+        changes = []
+        watcher = self._watcher(on_change=changes.append, min_interval=10, group_threshold=10)
+        watcher.add('project-1', 'a')
+
+        statuses = watcher.wait()
+
+        self.assertEqual(statuses, {'a': Status.COMPLETED})
+        self.assertEqual([(c.previous_status, c.status) for c in changes], [
+            (None, Status.PENDING),
+            (Status.PENDING, Status.RUNNING),
+            (Status.RUNNING, Status.COMPLETED)
+        ])
+        self.assertTrue(changes[-1].is_finished)
+        self.assertEqual(watcher.pending, [])
+
+    def test_adaptive_backoff(self):
+        self.timelines = {'a': [Status.RUNNING] * 5 + [Status.FAILED]}
+        watcher = self._watcher(min_interval=10, max_interval=30, backoff=2, group_threshold=10)
+        watcher.add('project-1', 'a')
+
+        self.assertEqual(watcher.wait(), {'a': Status.FAILED})
+        # The interval grows while the status is unchanged, up to the maximum
+        self.assertEqual(self.clock.sleeps, [10, 20, 30, 30, 30])
+
+    def test_groups_checks_by_project(self):
+        self.timelines = {f'd{i}': [Status.RUNNING, Status.COMPLETED] for i in range(20)}
+        watcher = self._watcher(group_threshold=3)
+        watcher.add_many('project-1', list(self.timelines))
+
+        statuses = watcher.wait()
+
+        self.assertTrue(all(status == Status.COMPLETED for status in statuses.values()))
+        self.assertEqual(self.client.datasets.iter_datasets.call_count, 2)
+        self.client.datasets.get.assert_not_called()
+
+    def test_retries_failed_check(self):
+        self.timelines = {'a': [Status.RUNNING, Status.COMPLETED]}
+        errors = [ConnectionError('Connection reset')]
+
+        def get_dataset(project_id, dataset_id):
+            if errors:
+                raise errors.pop()
+            return self._dataset(dataset_id)
+        self.client.datasets.get.side_effect = get_dataset
+        watcher = self._watcher(min_interval=10, backoff=2, group_threshold=10)
+        watcher.add('project-1', 'a')
+
+        with self.assertLogs('cirro.services.execution_watcher', level='WARNING'):
+            statuses = watcher.wait()
+
+        self.assertEqual(statuses, {'a': Status.COMPLETED})
+        # The failed check is retried after the backoff
+        self.assertEqual(self.clock.sleeps, [20, 10])
+
+    def test_listing_failure_falls_back_to_each_dataset(self):
+        self.timelines = {f'd{i}': [Status.COMPLETED] for i in range(3)}
+        self.client.datasets.iter_datasets.side_effect = ConnectionError('Connection reset')
+        watcher = self._watcher(group_threshold=3)
+        watcher.add_many('project-1', list(self.timelines))
+
+        with self.assertLogs('cirro.services.execution_watcher', level='WARNING'):
+            statuses = watcher.wait()
+
+        self.assertTrue(all(status == Status.COMPLETED for status in statuses.values()))
+        self.assertEqual(self.client.datasets.get.call_count, 3)
+
+    def test_gives_up_after_repeated_errors(self):
+        self.client.datasets.get.side_effect = ConnectionError('Connection reset')
+        watcher = self._watcher(group_threshold=10, max_errors=3)
+        watcher.add('project-1', 'a')
+
+        with self.assertLogs('cirro.services.execution_watcher', level='WARNING'):
+            with self.assertRaises(ConnectionError):
+                watcher.wait()
+        self.assertEqual(self.client.datasets.get.call_count, 3)
+
+    def test_dataset_missing_from_listing(self):
+        self.timelines = {f'd{i}': [Status.COMPLETED] for i in range(5)}
+        watcher = self._watcher(group_threshold=3, group_max_datasets=4)
+        watcher.add_many('project-1', list(self.timelines))
+
+        statuses = watcher.wait()
+
+        self.assertTrue(all(status == Status.COMPLETED for status in statuses.values()))
+        # Only the most recent datasets are listed, the other one is read on its own
+        self.assertEqual(self.client.datasets.iter_datasets.call_args.kwargs['max_items'], 4)
+        self.client.datasets.get.assert_called_once_with(project_id='project-1', dataset_id='d4')
+
+    def test_deleted_dataset(self):
+        self.client.datasets.get.side_effect = NotFoundException(
+            {'statusCode': 404, 'errorCode': 'NOT_FOUND', 'errorDetail': 'Dataset not found', 'errors': []})
+        watcher = self._watcher(group_threshold=10)
+        watcher.add('project-1', 'missing')
+
+        self.assertEqual(watcher.wait(), {'missing': Status.DELETED})
+
+    def test_timeout(self):
+        self.timelines = {'a': [Status.RUNNING]}
+        watcher = self._watcher(min_interval=10, max_interval=10, group_threshold=10)
+        watcher.add('project-1', 'a')
+
+        self.assertEqual(watcher.wait(timeout=35), {'a': Status.RUNNING})
+        self.assertEqual(watcher.pending, ['a'])
+        self.assertLessEqual(self.clock.now, 35)
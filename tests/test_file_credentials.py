@@ -0,0 +1,114 @@
+import threading
+import unittest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import Mock, patch
+
+from cirro_api_client.v1.models import AWSCredentials
+
+from cirro.models.file import FileAccessContext
+from cirro.services.file import FileService
+from cirro.services.file_credentials import FileCredentialManager
+
+
+def _make_credentials(expires_in: timedelta, name='key'):
+    return AWSCredentials(
+        access_key_id=name,
+        secret_access_key='secret',
+        session_token='token',
+        region='us-west-2',
+        expiration=datetime.now(tz=timezone.utc) + expires_in
+    )
+
+
+def _wait_for_background_threads():
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(timeout=5)
+
+
+@patch('cirro.services.file_credentials.generate_project_file_access_token')
+class TestFileCredentialManager(unittest.TestCase):
+    def setUp(self):
+        self.api_client = Mock()
+        self.manager = FileCredentialManager()
+        self.download = FileAccessContext.download(project_id='project-1', base_url='s3://project-1/datasets/1')
+
+    def test_caches_per_access_type_and_dataset(self, token_api):
+        token_api.sync.side_effect = lambda **kwargs: _make_credentials(timedelta(hours=1))
+        upload_1 = FileAccessContext.upload_dataset('project-1', 'dataset-1', 's3://project-1/datasets/dataset-1')
+        upload_2 = FileAccessContext.upload_dataset('project-1', 'dataset-2', 's3://project-1/datasets/dataset-2')
+
+        for _ in range(3):
+            self.manager.get_credentials(self.api_client, self.download)
+            self.manager.get_credentials(self.api_client, upload_1)
+            self.manager.get_credentials(self.api_client, upload_2)
+
+        self.assertEqual(token_api.sync.call_count, 3)
+
+    def test_refreshes_ahead_of_expiry_in_background(self, token_api):
+        token_api.sync.return_value = _make_credentials(timedelta(minutes=10), name='old')
+        old = self.manager.get_credentials(self.api_client, self.download)
+        # Fast-forward past the refresh time
+        for key, cached in self.manager._cache.items():
+            self.manager._cache[key] = cached._replace(refresh_at=datetime.now(tz=timezone.utc))
+
+        token_api.sync.return_value = _make_credentials(timedelta(hours=1), name='new')
+        # Still valid, so the current credentials are returned without waiting
+        self.assertIs(self.manager.get_credentials(self.api_client, self.download), old)
+        _wait_for_background_threads()
+
+        self.assertEqual(self.manager.get_credentials(self.api_client, self.download).access_key_id, 'new')
+        self.assertEqual(token_api.sync.call_count, 2)
+
+    def test_expired_credentials_are_fetched(self, token_api):
+        token_api.sync.return_value = _make_credentials(timedelta(seconds=-1), name='expired')
+        self.manager.get_credentials(self.api_client, self.download)
+
+        token_api.sync.return_value = _make_credentials(timedelta(hours=1), name='new')
+        self.assertEqual(self.manager.get_credentials(self.api_client, self.download).access_key_id, 'new')
+
+    def test_shared_between_file_services(self, token_api):
+        token_api.sync.return_value = _make_credentials(timedelta(hours=1))
+        services = [
+            FileService(self.api_client, checksum_method='CRC64NVME', transfer_retries=1,
+                        credential_manager=self.manager)
+            for _ in range(2)
+        ]
+        for service in services:
+            service.get_access_credentials(self.download)
+        token_api.sync.assert_called_once()
+
+    def test_scoped_by_base_url(self, token_api):
+        token_api.sync.side_effect = lambda client, **kwargs: _make_credentials(
+            timedelta(hours=1), name=client._base_url
+        )
+        other_client = Mock()
+        other_client._base_url = 'https://other.cirro.bio/api'
+        self.api_client._base_url = 'https://app.cirro.bio/api'
+
+        self.assertEqual(self.manager.get_credentials(self.api_client, self.download).access_key_id,
+                         'https://app.cirro.bio/api')
+        self.assertEqual(self.manager.get_credentials(other_client, self.download).access_key_id,
+                         'https://other.cirro.bio/api')
+
+    def test_file_services_do_not_share_by_default(self, token_api):
+        token_api.sync.return_value = _make_credentials(timedelta(hours=1))
+        for _ in range(2):
+            FileService(self.api_client, checksum_method='CRC64NVME', transfer_retries=1)\
+                .get_access_credentials(self.download)
+        self.assertEqual(token_api.sync.call_count, 2)
+
+    def test_eviction(self, token_api):
+        manager = FileCredentialManager(max_entries=2)
+        token_api.sync.return_value = _make_credentials(timedelta(seconds=-1))
+        manager.get_credentials(self.api_client, self.download)
+        self.assertEqual(len(manager), 0)
+
+        for i, expires_in in enumerate([timedelta(hours=3), timedelta(hours=1), timedelta(hours=2)]):
+            token_api.sync.return_value = _make_credentials(expires_in, name=str(i))
+            manager.get_credentials(self.api_client,
+                                    FileAccessContext.upload_dataset('project-1', f'dataset-{i}', 's3://bucket'))
+
+        self.assertEqual(len(manager), 2)
+        cached_names = sorted(c.credentials.access_key_id for c in manager._cache.values())
+        self.assertEqual(cached_names, ['0', '2'])
@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from cirro_api_client.v1.models import FileMappingRule, FileNamePattern
+
+from cirro.models.file_mapping import FileMappingValidator
+from cirro.services.process import ProcessService
+
+RULES = [
+    FileMappingRule(
+        description='Paired FASTQ',
+        file_name_patterns=[
+            FileNamePattern(example_name='sample1_R1.fastq.gz', description='Read 1',
+                            sample_matching_pattern=r'(?<sampleName>[\S ]*)_R[12]\.fastq\.gz'),
+            FileNamePattern(example_name='runs/sample1_R1.fq.gz', description='Read 1',
+                            sample_matching_pattern=r'runs/(?P<sampleName>[\S ]*)_R[12]\.fq\.gz')
+        ],
+        min_=2,
+        is_sample=True
+    ),
+    FileMappingRule(
+        description='Report',
+        file_name_patterns=[
+            FileNamePattern(example_name='report.html', description='Report',
+                            sample_matching_pattern=r'report\.html')
+        ],
+        max_=1
+    )
+]
+
+
+class TestFileMappingValidator(unittest.TestCase):
+    def test_report(self):
+        report = FileMappingValidator(RULES).validate([
+            'S1_R1.fastq.gz', 'S1_R2.fastq.gz', 'runs\\S2_R1.fq.gz', 'report.html', 'notes.txt'
+        ])
+
+        self.assertTrue(report.valid)
+        self.assertEqual(report.samples, {'S1': ['S1_R1.fastq.gz', 'S1_R2.fastq.gz'], 'S2': ['runs\\S2_R1.fq.gz']})
+        self.assertEqual(report.files_by_rule['Report'], ['report.html'])
+        self.assertEqual(report.unmatched_files, ['notes.txt'])
+
+    def test_rules_not_met(self):
+        report = FileMappingValidator(RULES).validate(['S1_R1.fastq', 'report.html', 'report.html'])
+
+        self.assertFalse(report.valid)
+        self.assertEqual(len(report.errors), 2)
+        self.assertIn('Paired FASTQ: expected at least 2 file(s), found 0', report.errors[0])
+        self.assertIn('sample1_R1.fastq.gz', report.errors[0])
+        self.assertIn('Report: expected at most 1 file(s), found 2', report.errors[1])
+
+    def test_overlapping_rules(self):
+        rules = [
+            FileMappingRule(description='Read 1', min_=1, file_name_patterns=[
+                FileNamePattern(example_name='s_R1.fastq.gz', description='',
+                                sample_matching_pattern=r'(?<sampleName>.*)_R1\.fastq\.gz')
+            ]),
+            FileMappingRule(description='FASTQ', min_=1, file_name_patterns=[
+                FileNamePattern(example_name='s.fastq.gz', description='', sample_matching_pattern=r'.*\.fastq\.gz')
+            ])
+        ]
+
+        report = FileMappingValidator(rules).validate(['s_R1.fastq.gz'])
+
+        self.assertTrue(report.valid)
+        self.assertEqual(report.files_by_rule, {'Read 1': ['s_R1.fastq.gz'], 'FASTQ': ['s_R1.fastq.gz']})
+        self.assertEqual(report.samples, {'s': ['s_R1.fastq.gz']})
+
+    def test_unsupported_pattern(self):
+        rule = FileMappingRule(description='Other', file_name_patterns=[
+            FileNamePattern(example_name='a', description='', sample_matching_pattern=r'(?<sampleName>\p{L}+)')
+        ], min_=1)
+
+        report = FileMappingValidator([rule]).validate(['a'])
+
+        self.assertTrue(report.valid)
+        self.assertEqual(report.unchecked_rules, ['Other'])
+
+
+@patch('cirro.services.process.validate_file_requirements')
+class TestCheckDatasetFiles(unittest.TestCase):
+    def setUp(self):
+        self.service = ProcessService(Mock())
+        self.service.get = Mock(return_value=Mock(file_mapping_rules=RULES))
+
+    def test_local_errors_are_warnings(self, validate_file_requirements):
+        validate_file_requirements.sync.return_value = Mock(error_msg=None, allowed_data_types=[])
+
+        with self.assertLogs('cirro.services.process', level='WARNING') as logs:
+            self.service.check_dataset_files(['S1_R1.fastq.gz'], 'process-1', '/tmp/missing')
+
+        self.assertIn('Paired FASTQ: expected at least 2', logs.output[0])
+        # The server decides whether the files are valid
+        validate_file_requirements.sync.assert_called_once()
+
+    def test_server_check(self, validate_file_requirements):
+        validate_file_requirements.sync.return_value = Mock(error_msg=None, allowed_data_types=[])
+
+        self.service.check_dataset_files(['S1_R1.fastq.gz', 'S1_R2.fastq.gz'], 'process-1', '/tmp/missing')
+
+        validate_file_requirements.sync.assert_called_once()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from cirro_api_client.v1.models import FormSchema, RunAnalysisRequest, RunAnalysisRequestParams
+
+from cirro.models.form_specification import ParameterSpecification
+from cirro.services.cache import MetadataCache
+from cirro.services.execution import ExecutionService
+
+FORM_SCHEMA = {
+    'form': {
+        'type': 'object',
+        'properties': {
+            'genome': {'type': 'string', 'enum': ['GRCh38', 'GRCm39']},
+            'min_reads': {'type': 'integer', 'minimum': 0}
+        },
+        'required': ['genome']
+    },
+    'ui': {}
+}
+
+
+def _spec() -> ParameterSpecification:
+    return ParameterSpecification(FormSchema.from_dict(FORM_SCHEMA))
+
+
+def _request(process_id: str, params: dict) -> RunAnalysisRequest:
+    return RunAnalysisRequest(name='analysis', process_id=process_id, source_dataset_ids=['dataset-1'],
+                              params=RunAnalysisRequestParams.from_dict(params), notification_emails=[])
+
+
+class TestParameterSpecification(unittest.TestCase):
+    def test_validate_params(self):
+        spec = _spec()
+        spec.validate_params({'genome': 'GRCh38', 'min_reads': 10})
+
+        with self.assertRaisesRegex(RuntimeError, r'Parameter at \$.min_reads error'):
+            spec.validate_params({'genome': 'GRCh38', 'min_reads': -1})
+
+    def test_validator_is_reused(self):
+        spec = _spec()
+        self.assertIs(spec.validator, spec.validator)
+
+    def test_validate_many_reports_all_errors(self):
+        spec = _spec()
+
+        with self.assertRaises(RuntimeError) as context:
+            spec.validate_many([
+                {'genome': 'GRCh38'},
+                {'genome': 'hg19'},
+                {'min_reads': -1}
+            ])
+
+        message = str(context.exception)
+        self.assertIn('2 of 3 sets of parameters are invalid', message)
+        self.assertIn("[1] Parameter at $.genome error: 'hg19' is not one of", message)
+        self.assertIn("[2] Parameter at $ error: 'genome' is a required property", message)
+        self.assertIn('[2] Parameter at $.min_reads error', message)
+
+
+@patch('cirro.services.execution.get_process_parameters')
+class TestExecutionServiceValidation(unittest.TestCase):
+    def test_parameter_spec_is_cached(self, get_process_parameters):
+        get_process_parameters.sync.return_value = FormSchema.from_dict(FORM_SCHEMA)
+        service = ExecutionService(Mock())
+
+        with patch('cirro.services.execution.run_analysis'):
+            for _ in range(3):
+                service.run_analysis('project-1', _request('process-1', {'genome': 'GRCh38'}))
+
+        self.assertEqual(get_process_parameters.sync.call_count, 1)
+
+    def test_shared_cache(self, get_process_parameters):
+        get_process_parameters.sync.return_value = FormSchema.from_dict(FORM_SCHEMA)
+        cache = MetadataCache(ttl=60)
+        service = ExecutionService(Mock(), cache=cache)
+
+        spec = service.get_parameter_spec('process-1')
+
+        self.assertIs(service.get_parameter_spec('process-1'), spec)
+        # Updating the process (through the process service) invalidates the specification
+        cache.invalidate('processes/process-1')
+        self.assertIsNot(service.get_parameter_spec('process-1'), spec)
+        self.assertEqual(get_process_parameters.sync.call_count, 2)
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = ['boto3', 'pandas', 'jsonschema', 'awscrt', 'questionary']
+
+
+def _loaded_modules(statement: str, modules):
+    code = f'{statement}; import sys; print(",".join(m for m in {modules!r} if m in sys.modules))'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return [m for m in output.strip().split(',') if m]
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_cirro(self):
+        self.assertEqual(_loaded_modules('import cirro', HEAVY_MODULES + ['cirro_api_client']), [])
+
+    def test_import_cli(self):
+        self.assertEqual(_loaded_modules('import cirro.cli.cli', HEAVY_MODULES + ['cirro_api_client']), [])
+
+    def test_import_sdk(self):
+        self.assertEqual(_loaded_modules('from cirro import DataPortal, CirroApi', HEAVY_MODULES), [])
+
+    def test_public_api(self):
+        import cirro
+        from cirro.cirro_client import CirroApi
+        self.assertIs(cirro.CirroApi, CirroApi)
+        self.assertTrue(hasattr(cirro.file_utils, 'upload_directory'))
+        for name in cirro.__all__:
+            self.assertIn(name, dir(cirro))
+        with self.assertRaises(AttributeError):
+            getattr(cirro, 'does_not_exist')
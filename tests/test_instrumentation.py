@@ -0,0 +1,177 @@
+import io
+import time
+import unittest
+from unittest.mock import Mock
+
+import boto3
+import httpx
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from benchmarks.stub_server import StubApiServer
+from cirro.instrumentation import HookDispatcher, InstrumentationHook, MetricsHook
+from cirro.instrumentation.base import normalize_endpoint
+from cirro.instrumentation.http import InstrumentedTransport
+from cirro.instrumentation.s3 import register_s3_instrumentation
+
+PROJECT_ID = '8b6e1a2c-1111-2222-3333-444455556666'
+
+
+class RecordingHook(InstrumentationHook):
+    def __init__(self):
+        self.events = []
+
+    def on_api_call_start(self, event):
+        self.events.append(('api_start', event))
+
+    def on_api_call_end(self, event):
+        self.events.append(('api_end', event))
+
+    def on_s3_operation_start(self, event):
+        self.events.append(('s3_start', event))
+
+    def on_s3_operation_end(self, event):
+        self.events.append(('s3_end', event))
+
+
+class TestHookDispatcher(unittest.TestCase):
+    def test_normalize_endpoint(self):
+        self.assertEqual(normalize_endpoint(f'/api/projects/{PROJECT_ID}/datasets'), '/api/projects/{id}/datasets')
+        self.assertEqual(normalize_endpoint('/api/projects'), '/api/projects')
+
+    def test_failing_hook_does_not_stop_others(self):
+        dispatcher = HookDispatcher()
+        failing = Mock(spec=InstrumentationHook)
+        failing.on_api_call_end.side_effect = ValueError('boom')
+        recording = RecordingHook()
+        dispatcher.add(failing)
+        dispatcher.add(recording)
+
+        dispatcher.on_api_call_end(Mock())
+        self.assertEqual(len(recording.events), 1)
+
+        dispatcher.remove(recording)
+        self.assertEqual(dispatcher.hooks, [failing])
+
+
+class TestApiInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.server = StubApiServer().__enter__()
+        self.server.add_route('GET', r'/api/projects/([^/]+)', lambda match, query, body: (200, {'id': match[1]}))
+        self.server.add_route('GET', r'/api/missing', lambda match, query, body: (404, {'message': 'Not found'}))
+        self.dispatcher = HookDispatcher()
+        self.hook = RecordingHook()
+        self.dispatcher.add(self.hook)
+        self.client = httpx.Client(base_url=self.server.base_url,
+                                   transport=InstrumentedTransport(self.dispatcher))
+
+    def tearDown(self):
+        self.client.close()
+        self.server.__exit__(None, None, None)
+
+    def test_api_call_events(self):
+        response = self.client.get(f'/api/projects/{PROJECT_ID}')
+        self.assertEqual(response.json(), {'id': PROJECT_ID})
+
+        self.assertEqual([name for name, _ in self.hook.events], ['api_start', 'api_end'])
+        event = self.hook.events[1][1]
+        self.assertEqual(event.name, 'GET /api/projects/{id}')
+        self.assertEqual(event.status_code, 200)
+        self.assertEqual(event.bytes_received, len(response.content))
+        self.assertGreater(event.duration, 0)
+        self.assertIsNone(event.error)
+
+    def test_metrics_hook(self):
+        metrics = MetricsHook()
+        self.dispatcher.add(metrics)
+        for _ in range(3):
+            self.client.get(f'/api/projects/{PROJECT_ID}')
+        self.client.get('/api/missing')
+
+        summary = metrics.summary()['api']
+        self.assertEqual(summary['GET /api/projects/{id}']['count'], 3)
+        self.assertEqual(summary['GET /api/projects/{id}']['errors'], 0)
+        self.assertEqual(summary['GET /api/missing']['errors'], 1)
+        self.assertGreaterEqual(summary['GET /api/projects/{id}']['p99_ms'],
+                                summary['GET /api/projects/{id}']['p50_ms'])
+
+        metrics.reset()
+        self.assertEqual(metrics.summary(), {'api': {}, 's3': {}})
+
+    def test_connection_error(self):
+        client = httpx.Client(base_url='http://127.0.0.1:1', transport=InstrumentedTransport(self.dispatcher))
+        with self.assertRaises(httpx.ConnectError):
+            client.get('/api/projects')
+        event = self.hook.events[-1][1]
+        self.assertIsInstance(event.error, httpx.ConnectError)
+        self.assertIsNotNone(event.duration)
+
+
+class TestS3Instrumentation(unittest.TestCase):
+    def setUp(self):
+        self.s3_client = boto3.client('s3', region_name='us-west-2',
+                                      aws_access_key_id='key', aws_secret_access_key='secret')
+        self.dispatcher = HookDispatcher()
+        self.metrics = MetricsHook()
+        self.hook = RecordingHook()
+        self.dispatcher.add(self.hook)
+        self.dispatcher.add(self.metrics)
+        register_s3_instrumentation(self.s3_client, self.dispatcher)
+
+    def test_s3_operation_events(self):
+        with Stubber(self.s3_client) as stubber:
+            stubber.add_response('put_object', {}, {'Bucket': 'project-1', 'Key': 'data/file.txt', 'Body': b'hello'})
+            stubber.add_response('get_object', {'ContentLength': 42}, {'Bucket': 'project-1', 'Key': 'data/file.txt'})
+            self.s3_client.put_object(Bucket='project-1', Key='data/file.txt', Body=b'hello')
+            self.s3_client.get_object(Bucket='project-1', Key='data/file.txt')
+
+        ends = [event for name, event in self.hook.events if name == 's3_end']
+        self.assertEqual([event.operation for event in ends], ['PutObject', 'GetObject'])
+        self.assertEqual(ends[0].bucket, 'project-1')
+        self.assertEqual(ends[0].key, 'data/file.txt')
+        self.assertEqual(ends[0].bytes, 5)
+        self.assertEqual(ends[1].bytes, 42)
+        self.assertEqual(self.metrics.summary()['s3']['GetObject']['count'], 1)
+
+    def test_download_timed_until_body_read(self):
+        class SlowStream(io.BytesIO):
+            def read(self, *args):
+                time.sleep(0.05)
+                return super().read(*args)
+
+        with Stubber(self.s3_client) as stubber:
+            stubber.add_response('get_object', {'ContentLength': 5, 'Body': StreamingBody(SlowStream(b'hello'), 5)},
+                                 {'Bucket': 'project-1', 'Key': 'data/file.txt'})
+            response = self.s3_client.get_object(Bucket='project-1', Key='data/file.txt')
+
+        # The operation only ends once the body has been streamed
+        self.assertNotIn('s3_end', [name for name, _ in self.hook.events])
+        self.assertEqual(b''.join(response['Body'].iter_chunks(2)), b'hello')
+
+        ends = [event for name, event in self.hook.events if name == 's3_end']
+        self.assertEqual(len(ends), 1)
+        self.assertEqual(ends[0].bytes, 5)
+        self.assertGreaterEqual(ends[0].duration - ends[0].time_to_first_byte, 0.1)
+
+    def test_download_closed_before_read(self):
+        with Stubber(self.s3_client) as stubber:
+            stubber.add_response('get_object', {'ContentLength': 5, 'Body': StreamingBody(io.BytesIO(b'hello'), 5)},
+                                 {'Bucket': 'project-1', 'Key': 'data/file.txt'})
+            response = self.s3_client.get_object(Bucket='project-1', Key='data/file.txt')
+        response['Body'].read(2)
+        response['Body'].close()
+
+        ends = [event for name, event in self.hook.events if name == 's3_end']
+        self.assertEqual(len(ends), 1)
+        self.assertEqual(ends[0].bytes, 2)
+
+    def test_s3_operation_error(self):
+        with Stubber(self.s3_client) as stubber:
+            stubber.add_client_error('head_object', service_error_code='404', http_status_code=404)
+            with self.assertRaises(Exception):
+                self.s3_client.head_object(Bucket='project-1', Key='missing.txt')
+
+        event = self.hook.events[-1][1]
+        self.assertEqual(event.operation, 'HeadObject')
+        self.assertEqual(event.status_code, 404)
+        self.assertEqual(self.metrics.summary()['s3']['HeadObject']['errors'], 1)
@@ -0,0 +1,176 @@
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+import pandas as pd
+from cirro_api_client.v1.errors import UnexpectedStatus
+from cirro_api_client.v1.models import Sample, SampleMetadata, SampleRequest, SampleRequestMetadata, FormSchema
+
+from cirro.services.metadata import MetadataService
+
+
+def _sample(sample_id: str, name: str, **metadata) -> Sample:
+    return Sample(id=sample_id, name=name, metadata=SampleMetadata.from_dict(metadata))
+
+
+class TestUpdateSamples(unittest.TestCase):
+    def setUp(self):
+        self.service = MetadataService(Mock())
+        self.service.iter_project_samples = Mock(return_value=iter([
+            _sample('id-1', 'S1', tissue='liver', timepoint=1),
+            _sample('id-2', 'S2', tissue='lung', timepoint=1),
+            _sample('id-3', 'S3'),
+            _sample('id-4', 'DUP'),
+            _sample('id-5', 'DUP')
+        ]))
+        self.lock = threading.Lock()
+        self.sent = {}
+
+        def update_sample(project_id, sample_id, sample: SampleRequest):
+            if sample.name == 'S3':
+                raise RuntimeError('Invalid metadata')
+            with self.lock:
+                self.sent[sample_id] = sample.metadata.to_dict()
+            return Sample(id=sample_id, name=sample.name, metadata=SampleMetadata.from_dict(self.sent[sample_id]))
+        self.service.update_sample = Mock(side_effect=update_sample)
+
+    def test_dataframe(self):
+        sheet = pd.DataFrame({
+            'sample': ['S1', 'S2', 'S3', 'MISSING', 'DUP'],
+            'tissue': ['liver', 'lung', 'brain', 'brain', 'brain'],
+            'timepoint': [1, 2, None, 1, 1]
+        })
+
+        results = self.service.update_samples('project-1', sheet, max_workers=2)
+
+        self.assertEqual([r.changed for r in results], [False, True, True, False, False])
+        self.assertEqual([r.succeeded for r in results], [True, True, False, False, False])
+        self.assertEqual(str(results[2].error), 'Invalid metadata')
+        self.assertIn('not found', str(results[3].error))
+        self.assertIn('Multiple samples', str(results[4].error))
+        # Only changed samples are sent, merged into their current metadata
+        self.assertEqual(self.sent, {'id-2': {'tissue': 'lung', 'timepoint': 2}})
+        self.assertEqual(results[1].sample.id, 'id-2')
+        self.assertEqual(self.service.update_sample.call_count, 2)
+
+    def test_iterable(self):
+        results = self.service.update_samples('project-1', [
+            {'id': 'id-1', 'timepoint': 3},
+            SampleRequest(name='S2', metadata=SampleRequestMetadata.from_dict({'tissue': 'heart'}))
+        ])
+
+        self.assertTrue(all(r.succeeded and r.changed for r in results))
+        self.assertEqual([r.name for r in results], ['S1', 'S2'])
+        self.assertEqual(self.sent, {
+            'id-1': {'tissue': 'liver', 'timepoint': 3},
+            'id-2': {'tissue': 'heart', 'timepoint': 1}
+        })
+
+    @patch('cirro.services.metadata.update_sample')
+    def test_update_sample(self, update_sample):
+        service = MetadataService(Mock())
+        request = SampleRequest(name='S1', metadata=SampleRequestMetadata.from_dict({'tissue': 'liver'}))
+
+        service.update_sample('project-1', 'id-1', request)
+
+        update_sample.sync.assert_called_once_with(project_id='project-1', sample_id='id-1', body=request,
+                                                   client=service._api_client)
+
+
+SCHEMA = FormSchema.from_dict({
+    'form': {
+        'type': 'object',
+        'properties': {
+            'tissue': {'type': 'string', 'enum': ['liver', 'lung']},
+            'timepoint': {'type': 'integer'},
+            'collected': {'type': 'string', 'format': 'date'},
+            'treated': {'type': 'boolean'},
+            'name': {'type': 'string', 'enum': ['other', 'unknown']}
+        }
+    },
+    'ui': {}
+})
+
+
+def _page(samples, next_token=None) -> Mock:
+    return Mock(status_code=200, json=Mock(return_value={'data': samples, 'nextToken': next_token}))
+
+
+class TestSamplesDataframe(unittest.TestCase):
+    def setUp(self):
+        self.api_client = Mock()
+        self.service = MetadataService(self.api_client)
+        self.service.get_project_schema = Mock(return_value=SCHEMA)
+        self.request = self.api_client.get_httpx_client.return_value.request
+
+    def test_typed_columns(self):
+        self.request.side_effect = [
+            _page([
+                {'id': 'id-1', 'name': 'S1', 'datasetIds': ['d1'], 'createdAt': '2024-01-01T00:00:00Z',
+                 'metadata': {'tissue': 'liver', 'timepoint': 1, 'collected': '2024-01-01', 'treated': True}},
+                {'id': 'id-2', 'name': 'S2', 'metadata': {'tissue': 'lung', 'score': 0.5}}
+            ], next_token='page-2'),
+            _page([
+                {'id': 'id-3', 'name': 'S3', 'metadata': {'timepoint': 3, 'name': 'other', 'score': 1.5}}
+            ])
+        ]
+
+        df = self.service.get_samples_dataframe('project-1')
+
+        self.assertEqual(list(df.columns), ['id', 'name', 'dataset_ids', 'created_at', 'updated_at',
+                                            'tissue', 'timepoint', 'collected', 'treated', 'score',
+                                            'metadata_name'])
+        self.assertEqual(list(df['name']), ['S1', 'S2', 'S3'])
+        self.assertEqual(list(df['tissue'].cat.categories), ['liver', 'lung'])
+        self.assertEqual(str(df['timepoint'].dtype), 'Int64')
+        self.assertEqual(df['timepoint'].isna().tolist(), [False, True, False])
+        self.assertEqual(str(df['treated'].dtype), 'boolean')
+        self.assertIsInstance(df['collected'].dtype, pd.DatetimeTZDtype)
+        self.assertIsInstance(df['created_at'].dtype, pd.DatetimeTZDtype)
+        # Fields which are not in the schema are inferred
+        self.assertEqual(str(df['score'].dtype), 'Float64')
+        self.assertEqual(df['metadata_name'].tolist()[2], 'other')
+        # A renamed metadata field keeps the type of the field in the schema
+        self.assertEqual(list(df['metadata_name'].cat.categories), ['other', 'unknown'])
+
+        self.assertEqual(self.request.call_args_list[1].kwargs['params']['nextToken'], 'page-2')
+
+    def test_no_samples(self):
+        self.service.get_project_schema.return_value = None
+        self.request.return_value = _page([])
+
+        df = self.service.get_samples_dataframe('project-1')
+
+        self.assertTrue(df.empty)
+        self.assertIn('name', df.columns)
+
+    def test_unexpected_status(self):
+        self.request.return_value = Mock(status_code=500, content=b'Internal error')
+
+        with self.assertRaises(UnexpectedStatus):
+            self.service.get_samples_dataframe('project-1')
+
+    def test_values_not_in_schema(self):
+        self.request.return_value = _page([
+            {'id': 'id-1', 'name': 'S1', 'metadata': {'tissue': 'liver'}},
+            {'id': 'id-2', 'name': 'S2', 'metadata': {'tissue': 'kidney (legacy)'}}
+        ])
+
+        with self.assertLogs('cirro.services.metadata', level='WARNING'):
+            df = self.service.get_samples_dataframe('project-1')
+
+        # The values are kept as text rather than replaced by missing values
+        self.assertEqual(str(df['tissue'].dtype), 'string')
+        self.assertEqual(df['tissue'].tolist(), ['liver', 'kidney (legacy)'])
+
+    def test_renamed_column_collision(self):
+        self.request.return_value = _page([
+            {'id': 'id-1', 'name': 'S1', 'metadata': {'id': 'a', 'metadata_id': 'b'}},
+            {'id': 'id-2', 'name': 'S2', 'metadata': {'metadata_id': 'c'}}
+        ])
+
+        df = self.service.get_samples_dataframe('project-1')
+
+        self.assertEqual(df['metadata_id'].tolist()[0], 'a')
+        self.assertTrue(pd.isna(df['metadata_id'].tolist()[1]))
+        self.assertEqual(df['metadata_metadata_id'].tolist(), ['b', 'c'])
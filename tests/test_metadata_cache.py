@@ -0,0 +1,109 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from cirro_api_client.v1.models import Process, Executor
+
+from cirro.services.cache import MetadataCache
+from cirro.services.process import ProcessService
+
+
+def _process(process_id: str) -> Process:
+    return Process(id=process_id, name=f'Process {process_id}', description='', data_type='', executor=Executor.INGEST,
+                   child_process_ids=[], parent_process_ids=[], linked_project_ids=[], is_tenant_wide=True,
+                   allow_multiple_sources=False, uses_sample_sheet=False, is_archived=False)
+
+
+class TestMetadataCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = MetadataCache(ttl=60)
+        fetch = Mock(return_value=['a', 'b'])
+
+        self.assertEqual(cache.get('key', fetch), ['a', 'b'])
+        self.assertEqual(cache.get('key', fetch), ['a', 'b'])
+
+        self.assertEqual(fetch.call_count, 1)
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+
+    def test_expiry(self):
+        cache = MetadataCache(ttl=0.01)
+        fetch = Mock(return_value='value')
+
+        cache.get('key', fetch)
+        time.sleep(0.02)
+        cache.get('key', fetch)
+
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_none_is_not_cached(self):
+        cache = MetadataCache(ttl=60)
+        fetch = Mock(return_value=None)
+
+        cache.get('key', fetch)
+        cache.get('key', fetch)
+
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_invalidate_prefix(self):
+        cache = MetadataCache(ttl=60)
+        cache.get('processes', Mock(return_value=[]))
+        cache.get('processes/a', Mock(return_value='a'))
+        cache.get('projects', Mock(return_value=[]))
+
+        cache.invalidate('processes')
+
+        fetch = Mock(return_value=[])
+        cache.get('processes', fetch)
+        cache.get('projects', fetch)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(cache.stats().invalidations, 2)
+
+    def test_persist(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            processes = [_process('a'), _process('b')]
+            MetadataCache(ttl=60, cache_dir=Path(cache_dir)).get('processes', lambda: processes, model=Process)
+
+            # A new session loads the entry from disk
+            cache = MetadataCache(ttl=60, cache_dir=Path(cache_dir))
+            fetch = Mock(return_value=[])
+            self.assertEqual(cache.get('processes', fetch, model=Process), processes)
+            fetch.assert_not_called()
+            self.assertEqual(cache.stats().disk_hits, 1)
+
+            cache.invalidate('processes')
+            self.assertEqual(list(Path(cache_dir).glob('*.json')), [])
+
+
+@patch('cirro.services.process.get_processes')
+class TestProcessServiceCache(unittest.TestCase):
+    def test_list_is_cached(self, get_processes):
+        get_processes.sync.return_value = [_process('a')]
+        service = ProcessService(Mock(), cache=MetadataCache(ttl=60))
+
+        service.list()
+        service.list(process_type=Executor.INGEST)
+
+        self.assertEqual(get_processes.sync.call_count, 1)
+
+    @patch('cirro.services.process.archive_custom_process')
+    def test_archive_invalidates(self, _, get_processes):
+        get_processes.sync.return_value = [_process('a')]
+        service = ProcessService(Mock(), cache=MetadataCache(ttl=60))
+
+        service.list()
+        service.archive('a')
+        service.list()
+
+        self.assertEqual(get_processes.sync.call_count, 2)
+
+    def test_disabled_by_default(self, get_processes):
+        get_processes.sync.return_value = [_process('a')]
+        service = ProcessService(Mock())
+
+        service.list()
+        service.list()
+
+        self.assertEqual(get_processes.sync.call_count, 2)
@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+from typing import List
+
+from cirro.services.base import iter_records, get_all_records, PageArgs, PageResp
+
+
+class FakeEndpoint:
+    """
+    Serves the integers 0 to total - 1, with the next token being the offset of the next page
+    """
+    def __init__(self, total: int):
+        self.total = total
+        self.requests: List[PageArgs] = []
+        self.threads = set()
+
+    def __call__(self, page_args: PageArgs) -> PageResp:
+        self.requests.append(page_args)
+        self.threads.add(threading.current_thread().name)
+        offset = int(page_args.next_token or 0)
+        end = min(offset + page_args.limit, self.total)
+        return PageResp(data=list(range(offset, end)), next_token=str(end) if end < self.total else None)
+
+
+class TestIterRecords(unittest.TestCase):
+    def test_all_records(self):
+        endpoint = FakeEndpoint(12)
+        self.assertEqual(list(iter_records(endpoint, batch_size=5)), list(range(12)))
+        self.assertEqual([r.limit for r in endpoint.requests], [5, 5, 5])
+
+    def test_max_items_is_exact(self):
+        endpoint = FakeEndpoint(100)
+        self.assertEqual(list(iter_records(endpoint, batch_size=5, max_items=7)), list(range(7)))
+        # The last page only requests the records still needed
+        self.assertEqual([r.limit for r in endpoint.requests], [5, 2])
+
+        self.assertEqual(len(get_all_records(FakeEndpoint(100), batch_size=30, max_items=40)), 40)
+
+    def test_pages_are_requested_lazily(self):
+        endpoint = FakeEndpoint(20)
+        records = iter_records(endpoint, batch_size=5)
+        self.assertEqual(len(endpoint.requests), 0)
+
+        self.assertEqual([next(records) for _ in range(5)], list(range(5)))
+        self.assertEqual(len(endpoint.requests), 1)
+
+        next(records)
+        self.assertEqual(len(endpoint.requests), 2)
+
+    def test_prefetch(self):
+        endpoint = FakeEndpoint(20)
+        records = iter_records(endpoint, batch_size=5, prefetch=True)
+        self.assertEqual(next(records), 0)
+        # The second page is requested in the background before the first one was consumed
+        records.close()
+        deadline = time.time() + 5
+        while len(endpoint.requests) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(endpoint.requests), 2)
+        self.assertNotIn(threading.current_thread().name, endpoint.threads)
+
+        self.assertEqual(list(iter_records(FakeEndpoint(20), batch_size=5, prefetch=True)), list(range(20)))
+
+    def test_empty_response(self):
+        self.assertEqual(list(iter_records(lambda page_args: None)), [])
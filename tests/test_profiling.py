@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from cirro.cli.cli import run, _get_profile_output
+from cirro.profiling import Profiler, profile_phase, get_active_profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_phases_in_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = Profiler(Path(tmp, 'profile.txt'), command=['cirro', 'download'])
+            profiler.start()
+            self.assertIs(get_active_profiler(), profiler)
+            with profile_phase('transfer'):
+                with profile_phase('manifest listing'):
+                    pass
+            with profile_phase('transfer'):
+                pass
+            report = profiler.stop().read_text()
+
+        self.assertIsNone(get_active_profiler())
+        self.assertIn('Command:  cirro download', report)
+        self.assertRegex(report, r'transfer\s+[\d.]+s\s+2 call\(s\)')
+        self.assertRegex(report, r'transfer > manifest listing\s+[\d.]+s\s+1 call\(s\)')
+        self.assertIn('Profile by cumulative time', report)
+
+    def test_phase_without_profiler(self):
+        with profile_phase('transfer'):
+            self.assertIsNone(get_active_profiler())
+
+
+class TestProfileOption(unittest.TestCase):
+    def test_profile_output_path(self):
+        with patch.dict(os.environ, {'CIRRO_PROFILE': ''}):
+            self.assertIsNone(_get_profile_output(False, None))
+            self.assertEqual(_get_profile_output(False, 'out.txt'), Path('out.txt'))
+            self.assertRegex(_get_profile_output(True, None).name, r'^cirro-profile-\d{8}-\d{6}\.txt$')
+        with patch.dict(os.environ, {'CIRRO_PROFILE': 'true'}):
+            self.assertIsNotNone(_get_profile_output(False, None))
+        with patch.dict(os.environ, {'CIRRO_PROFILE': 'false'}):
+            self.assertIsNone(_get_profile_output(False, None))
+        with patch.dict(os.environ, {'CIRRO_PROFILE': '/tmp/cirro.txt'}):
+            self.assertEqual(_get_profile_output(False, None), Path('/tmp/cirro.txt'))
+
+    def test_cli_writes_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp, 'profile.txt')
+            # Without arguments the command prints its help, the report is still written when it exits
+            CliRunner().invoke(run, ['--profile-output', str(output), 'list-datasets'])
+            self.assertTrue(output.exists())
+            self.assertIn('Cirro CLI profile', output.read_text())
@@ -0,0 +1,192 @@
+import unittest
+import uuid
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from cirro_api_client.v1.errors import NotFoundException
+from cirro_api_client.v1.models import Dataset, Project, Status, Process, Executor
+
+from cirro.models.analysis import AnalysisSubmission
+from cirro.sdk.dataset import DataPortalDatasets, DataPortalDataset
+from cirro.sdk.exceptions import DataPortalAssetNotFound
+from cirro.sdk.portal import DataPortal
+from cirro.sdk.process import DataPortalProcess
+
+PROJECT_ID = str(uuid.uuid4())
+DATASET_ID = str(uuid.uuid4())
+
+
+def _project(project_id: str, name: str) -> Project:
+    return Project(id=project_id, name=name, description='', status=Status.COMPLETED, tags=[],
+                   organization='org', classification_ids=[], billing_account_id='billing')
+
+
+def _dataset(dataset_id: str, name: str) -> Dataset:
+    return Dataset(id=dataset_id, name=name, description='', project_id=PROJECT_ID,
+                   process_id='process-1', source_dataset_ids=[], status=Status.COMPLETED, tags=[],
+                   created_by='user', created_at=datetime.now(), updated_at=datetime.now())
+
+
+def _mock_client() -> Mock:
+    project = _project(PROJECT_ID, 'Project 1')
+    datasets = [_dataset(DATASET_ID, 'Dataset 1'), _dataset('legacy-id', 'Dataset 2')]
+    client = Mock()
+    client.projects.list.return_value = [project, _project(str(uuid.uuid4()), 'Project 2')]
+
+    # The generated client raises on a 404, it never returns None
+    def not_found(detail):
+        return NotFoundException({'statusCode': 404, 'errorCode': 'NOT_FOUND', 'errorDetail': detail, 'errors': []})
+
+    def get_project(project_id):
+        if project_id != PROJECT_ID:
+            raise not_found('Project not found')
+        return project
+
+    def get_dataset(project_id, dataset_id):
+        dataset = next((d for d in datasets if d.id == dataset_id), None)
+        if dataset is None:
+            raise not_found('Dataset not found')
+        return dataset
+
+    client.projects.get.side_effect = get_project
+    client.datasets.list.return_value = datasets
+    client.datasets.get.side_effect = get_dataset
+    client.shares.list.return_value = []
+    return client
+
+
+class TestDataPortalResolution(unittest.TestCase):
+    def test_get_project_by_id_does_not_list(self):
+        client = _mock_client()
+        portal = DataPortal(client=client)
+
+        self.assertEqual(portal.get_project(PROJECT_ID).name, 'Project 1')
+        self.assertEqual(portal.get_project_by_id(PROJECT_ID).name, 'Project 1')
+
+        client.projects.list.assert_not_called()
+        self.assertEqual(client.projects.get.call_count, 1)
+
+    def test_get_project_by_name_is_cached(self):
+        client = _mock_client()
+        portal = DataPortal(client=client)
+
+        for _ in range(3):
+            self.assertEqual(portal.get_project('Project 1').id, PROJECT_ID)
+
+        client.projects.get.assert_not_called()
+        self.assertEqual(client.projects.list.call_count, 1)
+
+    def test_get_project_not_found(self):
+        portal = DataPortal(client=_mock_client())
+
+        with self.assertRaises(DataPortalAssetNotFound):
+            portal.get_project(str(uuid.uuid4()))
+        with self.assertRaises(DataPortalAssetNotFound):
+            portal.get_project('Missing project')
+
+    def test_get_project_named_like_an_id(self):
+        client = _mock_client()
+        name = str(uuid.uuid4())
+        client.projects.list.return_value.append(_project(str(uuid.uuid4()), name))
+        portal = DataPortal(client=client)
+
+        # The name is looked up as an ID first, then as a name
+        self.assertEqual(portal.get_project(name).name, name)
+        client.projects.get.assert_called_once_with(name)
+
+    def test_wait_for_new_dataset(self):
+        client = _mock_client()
+        project = DataPortal(client=client).get_project_by_id(PROJECT_ID)
+        get_dataset = client.datasets.get.side_effect
+        new_dataset = _dataset(str(uuid.uuid4()), 'New dataset')
+        attempts = []
+
+        # The new dataset is not found until it has been registered
+        def get(project_id, dataset_id):
+            attempts.append(dataset_id)
+            return get_dataset(project_id, dataset_id) if len(attempts) == 1 else new_dataset
+        client.datasets.get.side_effect = get
+
+        with patch('cirro.sdk.project.sleep') as sleep:
+            self.assertEqual(project._wait_for_dataset(new_dataset.id).name, 'New dataset')
+        sleep.assert_called_once()
+
+    def test_get_dataset_by_id(self):
+        client = _mock_client()
+        portal = DataPortal(client=client)
+
+        for _ in range(3):
+            self.assertEqual(portal.get_dataset(PROJECT_ID, DATASET_ID).name, 'Dataset 1')
+
+        client.projects.list.assert_not_called()
+        client.datasets.list.assert_not_called()
+        self.assertEqual(client.projects.get.call_count, 1)
+        self.assertEqual(client.datasets.get.call_count, 3)
+
+    def test_get_dataset_by_name_lists_once(self):
+        client = _mock_client()
+        project = DataPortal(client=client).get_project(PROJECT_ID)
+
+        self.assertEqual(project.get_dataset('Dataset 1').id, DATASET_ID)
+        self.assertEqual(project.get_dataset('Dataset 2').id, 'legacy-id')
+        # IDs which are not formatted as UUIDs are matched in the listing
+        self.assertEqual(project.get_dataset('legacy-id').name, 'Dataset 2')
+
+        self.assertEqual(client.datasets.list.call_count, 1)
+        client.datasets.get.assert_not_called()
+
+        with self.assertRaises(DataPortalAssetNotFound):
+            project.get_dataset('Missing dataset')
+
+    def test_get_dataset_by_name_duplicates(self):
+        client = _mock_client()
+        client.datasets.list.return_value = [_dataset(str(uuid.uuid4()), 'Dataset 1') for _ in range(2)]
+        project = DataPortal(client=client).get_project(PROJECT_ID)
+
+        with self.assertRaises(DataPortalAssetNotFound):
+            project.get_dataset_by_name('Dataset 1')
+
+
+class TestRunAnalyses(unittest.TestCase):
+    def test_run_analyses(self):
+        client = Mock()
+        client.execution.run_analyses.side_effect = lambda project_id, requests, **kwargs: [
+            AnalysisSubmission(request=request, dataset_id=f'{request.name}-id') for request in requests
+        ]
+        datasets = DataPortalDatasets([DataPortalDataset(_dataset(f'dataset-{i}', f'Sample {i}'), client)
+                                       for i in range(3)])
+        process = DataPortalProcess(Process(id='process-1', name='Process', description='', data_type='',
+                                            executor=Executor.NEXTFLOW, child_process_ids=[], parent_process_ids=[],
+                                            linked_project_ids=[], is_tenant_wide=True, allow_multiple_sources=False,
+                                            uses_sample_sheet=False, is_archived=False), client)
+
+        results = datasets.run_analyses(name='{dataset.name} - Alignment', process=process,
+                                        params=lambda dataset: {'sample': dataset.name})
+
+        self.assertEqual([r.dataset_id for r in results],
+                         ['Sample 0 - Alignment-id', 'Sample 1 - Alignment-id', 'Sample 2 - Alignment-id'])
+        requests = client.execution.run_analyses.call_args.args[1]
+        self.assertEqual(requests[1].source_dataset_ids, ['dataset-1'])
+        self.assertEqual(requests[1].params.to_dict(), {'sample': 'Sample 1'})
+        client.compute_environments.list_environments_for_project.assert_not_called()
+
+    def test_run_analyses_request_error(self):
+        client = Mock()
+        client.execution.run_analyses.side_effect = lambda project_id, requests, **kwargs: [
+            AnalysisSubmission(request=request, dataset_id=f'{request.name}-id') for request in requests
+        ]
+        datasets = DataPortalDatasets([DataPortalDataset(_dataset(f'dataset-{i}', f'Sample {i}'), client)
+                                       for i in range(3)])
+
+        def params(dataset):
+            if dataset.name == 'Sample 1':
+                raise KeyError('sample')
+            return {}
+
+        with patch('cirro.sdk.dataset.parse_process_name_or_id', return_value=Mock(id='process-1')):
+            results = datasets.run_analyses(name='{dataset.name}', process='process-1', params=params)
+
+        self.assertEqual([r.succeeded for r in results], [True, False, True])
+        self.assertIsInstance(results[1].error, KeyError)
+        self.assertIsNone(results[1].request)
+        self.assertEqual(len(client.execution.run_analyses.call_args.args[1]), 2)
@@ -0,0 +1,76 @@
+import copy
+import pickle
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+
+from cirro_api_client.v1.models import Dataset, Status, Share, ShareType
+
+from cirro.models.dataset import DatasetWithShare
+from cirro.services.service_helpers import list_all_datasets
+
+
+def _dataset(dataset_id: str) -> Dataset:
+    return Dataset(id=dataset_id, name=f'Dataset {dataset_id}', description='', project_id='project-1',
+                   process_id='process-1', source_dataset_ids=[], status=Status.COMPLETED, tags=[],
+                   created_by='user', created_at=datetime.now(), updated_at=datetime.now())
+
+
+def _share(share_id: str) -> Share:
+    return Share(id=share_id, name=f'Share {share_id}', description='', originating_project_id='project-2',
+                 share_type=ShareType.SUBSCRIBER, conditions=[], classification_ids=[], keywords=[],
+                 created_by='user', created_at=datetime.now(), updated_at=datetime.now())
+
+
+class TestListAllDatasets(unittest.TestCase):
+    def test_lists_shares_concurrently(self):
+        shares = [_share(f'share-{i}') for i in range(3)]
+        # Each share listing waits until all of them have started, which only succeeds if they run concurrently
+        barrier = threading.Barrier(len(shares), timeout=5)
+
+        def list_shared(project_id, share_id):
+            barrier.wait()
+            return [_dataset(f'{share_id}-dataset')]
+
+        client = Mock()
+        client.datasets.list.return_value = [_dataset('own-1'), _dataset('own-2')]
+        client.shares.list.return_value = shares
+        client.datasets.list_shared.side_effect = list_shared
+
+        datasets = list_all_datasets('project-1', client)
+
+        self.assertEqual([d.id for d in datasets],
+                         ['own-1', 'own-2', 'share-0-dataset', 'share-1-dataset', 'share-2-dataset'])
+        self.assertIsNone(datasets[0].share)
+        self.assertEqual(datasets[3].share.id, 'share-1')
+        self.assertTrue(all(isinstance(d, DatasetWithShare) for d in datasets))
+
+
+class TestDatasetWithShare(unittest.TestCase):
+    def test_from_dataset(self):
+        dataset = _dataset('dataset-1')
+        share = _share('share-1')
+        with_share = DatasetWithShare.from_dataset(dataset, share=share)
+
+        self.assertIsInstance(with_share, Dataset)
+        self.assertEqual(with_share.name, 'Dataset dataset-1')
+        self.assertEqual(with_share.to_dict()['id'], 'dataset-1')
+        self.assertIs(with_share.share, share)
+
+        # The record is a copy, changing it leaves the original dataset unchanged
+        with_share.name = 'Renamed'
+        self.assertEqual(dataset.name, 'Dataset dataset-1')
+
+    def test_construct_from_fields(self):
+        dataset = _dataset('dataset-1')
+        names = ['id', 'name', 'description', 'project_id', 'process_id', 'source_dataset_ids',
+                 'status', 'tags', 'created_by', 'created_at', 'updated_at']
+        fields = {name: getattr(dataset, name) for name in names}
+        self.assertEqual(DatasetWithShare(**fields, share=None), DatasetWithShare.from_dataset(dataset, share=None))
+
+    def test_copy_and_pickle(self):
+        with_share = DatasetWithShare.from_dataset(_dataset('dataset-1'), share=_share('share-1'))
+
+        self.assertEqual(copy.copy(with_share), with_share)
+        self.assertEqual(pickle.loads(pickle.dumps(with_share)), with_share)
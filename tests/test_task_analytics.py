@@ -0,0 +1,60 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from cirro_api_client.v1.models import Task
+
+from cirro.helpers.task_analytics import tasks_to_dataframe, summarize_by_process, queue_wait_statistics, \
+    longest_tasks
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _task(name: str, status: str, queued: int, ran: int = None, **extra) -> Task:
+    task = Task(name=name, native_job_id=f'job-{name}', status=status, requested_at=START,
+                started_at=START + timedelta(seconds=queued))
+    if ran is not None:
+        task.stopped_at = task.started_at + timedelta(seconds=ran)
+    task.additional_properties.update(extra)
+    return task
+
+
+class TestTaskAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.df = tasks_to_dataframe([
+            _task('ALIGN (sample1)', 'COMPLETED', queued=60, ran=3600, cpus=8),
+            _task('ALIGN (sample2)', 'FAILED', queued=120, ran=1800, cpus=8),
+            _task('QC (sample1)', 'COMPLETED', queued=30, ran=600, cpus=2),
+            _task('REPORT', 'RUNNING', queued=10)
+        ])
+
+    def test_dataframe(self):
+        self.assertEqual(list(self.df['process']), ['ALIGN', 'ALIGN', 'QC', 'REPORT'])
+        self.assertEqual(list(self.df['tag'].fillna('')), ['sample1', 'sample2', 'sample1', ''])
+        self.assertEqual(list(self.df['queue_wait']), [60, 120, 30, 10])
+        self.assertEqual(list(self.df['duration'].fillna(-1)), [3600, 1800, 600, -1])
+        self.assertIsInstance(self.df['requested_at'].dtype, pd.DatetimeTZDtype)
+        self.assertEqual(list(self.df['cpus'].fillna(0)), [8, 8, 2, 0])
+
+    def test_summarize_by_process(self):
+        summary = summarize_by_process(self.df)
+
+        self.assertEqual(list(summary.index), ['ALIGN', 'QC', 'REPORT'])
+        self.assertEqual(list(summary['tasks']), [2, 1, 1])
+        self.assertEqual(list(summary['failed']), [1, 0, 0])
+        self.assertAlmostEqual(summary.loc['ALIGN', 'total_hours'], 1.5)
+        self.assertAlmostEqual(summary.loc['ALIGN', 'cpu_hours'], 12)
+        self.assertEqual(summary.loc['ALIGN', 'mean_queue_wait'], 90)
+
+    def test_queue_wait_and_longest_tasks(self):
+        wait = queue_wait_statistics(self.df)
+        self.assertEqual(wait['count'], 4)
+        self.assertEqual(wait['max'], 120)
+        self.assertEqual(wait['median'], 45)
+
+        self.assertEqual(list(longest_tasks(self.df, n=2)['name']), ['ALIGN (sample1)', 'ALIGN (sample2)'])
+
+    def test_no_tasks(self):
+        df = tasks_to_dataframe([])
+        self.assertTrue(df.empty)
+        self.assertTrue(summarize_by_process(df).empty)
@@ -0,0 +1,84 @@
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from cirro.cli.controller import _check_version, _refresh_version_check
+from cirro.config import Constants
+
+
+@patch('cirro.cli.controller.importlib.metadata.version', return_value='1.2.0')
+@patch('cirro.cli.controller.threading.Thread')
+class TestVersionCheck(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name, 'version_check.json')
+        self.path_patch = patch.object(Constants, 'version_check_path', self.path)
+        self.path_patch.start()
+        self.env_patch = patch.dict(os.environ, {}, clear=False)
+        self.env_patch.start()
+        for env in ['CIRRO_DISABLE_VERSION_CHECK', 'CIRRO_OFFLINE']:
+            os.environ.pop(env, None)
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.path_patch.stop()
+        self.temp_dir.cleanup()
+
+    def _save(self, latest_version, age=0):
+        self.path.write_text(json.dumps({'checked_at': time.time() - age, 'latest_version': latest_version}))
+
+    def _check(self) -> str:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            _check_version()
+        return output.getvalue()
+
+    def test_newer_version(self, thread, version):
+        self._save('1.10.0')
+
+        self.assertIn('Update to 1.10.0', self._check())
+        # The cache is fresh, PyPI is not contacted
+        thread.assert_not_called()
+
+    def test_cached_version_older_than_installed(self, thread, version):
+        self._save('1.1.0')
+
+        self.assertEqual(self._check(), '')
+
+    def test_expired_cache_is_refreshed(self, thread, version):
+        self._save('1.2.0', age=Constants.version_check_ttl + 1)
+
+        self._check()
+
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+    def test_opt_out(self, thread, version):
+        for env in ['CIRRO_DISABLE_VERSION_CHECK', 'CIRRO_OFFLINE']:
+            with self.subTest(env), patch.dict(os.environ, {env: 'true'}):
+                self._save('9.0.0', age=Constants.version_check_ttl + 1)
+
+                self.assertEqual(self._check(), '')
+                thread.assert_not_called()
+
+    @patch('cirro.cli.controller.requests.get', side_effect=ConnectionError('No network'))
+    def test_failed_lookup_is_cached(self, get, thread, version):
+        _refresh_version_check()
+
+        self.assertIsNone(json.loads(self.path.read_text())['latest_version'])
+        self.assertEqual(self._check(), '')
+        thread.assert_not_called()
+
+    @patch('cirro.cli.controller.requests.get')
+    def test_refresh(self, get, thread, version):
+        get.return_value = Mock(json=Mock(return_value={'info': {'version': '2.0.0'}}))
+
+        _refresh_version_check()
+
+        self.assertEqual(json.loads(self.path.read_text())['latest_version'], '2.0.0')